@@ -0,0 +1,110 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from time import perf_counter
+
+from dataclasses import dataclass
+from typing import List, Optional
+
+from src.Graph import Graph
+from src.Drivers import AutoDriver
+from src.Mapper import Mapper, RunStatistics, VectorMapper, create_environment
+from src.ClosestPointsCalculator import ClosestPointsCalculator
+
+
+__all__ = ['Job', 'JobResult', 'BatchResult', 'run_job', 'run_job_group', 'run_jobs']
+
+
+@dataclass
+class Job:
+    map_name: str
+    seed: int
+    steps: int
+    driving_type: str='auto'
+
+
+@dataclass
+class JobResult:
+    job: Job
+    graph: Graph
+    statistics: RunStatistics
+
+
+@dataclass
+class BatchResult:
+    results: List[JobResult]
+    seconds: float
+
+    @property
+    def total_steps(self) -> int:
+        return sum(result.statistics.steps for result in self.results)
+
+    @property
+    def steps_per_second(self) -> float:
+        return self.total_steps / self.seconds if self.seconds > 0 else 0
+
+
+def run_job(job: Job, min_distance: float) -> JobResult:
+    if job.driving_type != 'auto':
+        raise ValueError(f'Batch jobs support only "auto" driving type, got "{job.driving_type}"')
+
+    environment = create_environment(map_name=job.map_name, seed=job.seed, headless=True)
+
+    mapper = Mapper(
+        environment=environment,
+        driver=AutoDriver(environment=environment),
+        graph=Graph(min_distance=min_distance),
+        calculator=ClosestPointsCalculator(),
+    )
+
+    statistics = mapper.run(steps=job.steps)
+
+    environment.close()
+
+    return JobResult(job=job, graph=mapper.graph, statistics=statistics)
+
+
+def run_job_group(jobs: List[Job], min_distance: float) -> List[JobResult]:
+    for job in jobs:
+        if job.driving_type != 'auto':
+            raise ValueError(f'Batch jobs support only "auto" driving type, got "{job.driving_type}"')
+
+    environments = [create_environment(map_name=job.map_name, seed=job.seed, headless=True) for job in jobs]
+
+    mapper = VectorMapper(
+        environments=environments,
+        graphs=[Graph(min_distance=min_distance) for _ in jobs],
+        calculator=ClosestPointsCalculator(),
+    )
+
+    statistics = mapper.run(steps=[job.steps for job in jobs])
+
+    for environment in environments:
+        environment.close()
+
+    return [
+        JobResult(job=job, graph=graph, statistics=job_statistics)
+        for job, graph, job_statistics in zip(jobs, mapper.graphs, statistics)
+    ]
+
+
+def run_jobs(jobs: List[Job], min_distance: float, workers: Optional[int]=None,
+             environments_per_worker: int=1) -> BatchResult:
+    context = multiprocessing.get_context('spawn')
+
+    start = perf_counter()
+
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+        if environments_per_worker > 1:
+            groups = [jobs[index:index + environments_per_worker] for index in range(0, len(jobs), environments_per_worker)]
+
+            results = [
+                result
+                for group_results in executor.map(run_job_group, groups, [min_distance] * len(groups))
+                for result in group_results
+            ]
+        else:
+            results = list(executor.map(run_job, jobs, [min_distance] * len(jobs)))
+
+    finish = perf_counter()
+
+    return BatchResult(results=results, seconds=finish - start)
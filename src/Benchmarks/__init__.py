@@ -0,0 +1,644 @@
+import gc
+import os
+import sys
+import json
+import numpy
+import subprocess
+import tracemalloc
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from math import atan2, ceil, pi, cos, sin
+from random import Random
+from time import perf_counter, perf_counter_ns
+
+from dataclasses import asdict, dataclass
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from src.Graph import Graph
+from src.Point import Point
+from src.Routing import RouteEngine
+from src.GraphDrawer import GraphDrawer, GraphDrawerSettings
+from src.ClosestPointsCalculator import CalculatorInputData, ClosestPointsCalculator
+
+
+__all__ = [
+    'GraphCheckSample',
+    'RoutingSample',
+    'BenchmarkResult',
+    'ImportSample',
+    'SamplingSample',
+    'EngineComparison',
+    'SCENARIOS',
+    'OPERATIONS',
+    'synthetic_trajectory',
+    'straight_trajectory',
+    'loop_trajectory',
+    'grid_trajectory',
+    'calculator_inputs',
+    'random_calculator_inputs',
+    'synthetic_road_grid',
+    'benchmark_graph_check',
+    'benchmark_routing',
+    'benchmark_import',
+    'benchmark_sampling',
+    'compare_calculator_engines',
+    'check_graph_round_trip',
+    'run_benchmark',
+    'run_benchmark_suite',
+    'save_baseline',
+    'load_baseline',
+    'compare_with_baseline',
+]
+
+
+PERCENTILES = (50, 90, 99)
+
+COMPARED_METRICS = ('p50', 'p90', 'peak_memory')
+
+# distance between points of the trajectories in min distances of the graph, so that each new point is a new node
+STEP = 1.5
+
+HEAVY_MODULES = ('cv2', 'pyglet', 'gym_duckietown')
+
+IMPORT_SCRIPT = '''
+import sys, json
+from time import perf_counter
+start = perf_counter()
+import {module}
+finish = perf_counter()
+print(json.dumps([finish - start, [name for name in {heavy_modules} if name in sys.modules]]))
+'''
+
+# length of a block of the grid city in steps of the trajectory
+GRID_BLOCK_LENGTH = 100
+
+# the graph is uploaded to the drawer once per this number of checks, as the live viewer does not draw every frame
+UPLOAD_PERIOD = 10
+
+
+@dataclass
+class GraphCheckSample:
+    number_of_nodes: int
+    microseconds_per_check: float
+
+
+@dataclass
+class RoutingSample:
+    name: str
+    number_of_nodes: int
+    number_of_key_nodes: int
+    milliseconds_to_build: float
+    microseconds_per_route: float
+
+
+@dataclass
+class ImportSample:
+    module: str
+    milliseconds: float
+    heavy_modules: List[str]
+
+    def __repr__(self) -> str:
+        return f'{self.module:<28} {self.milliseconds:>8.1f} ms, heavy modules: {", ".join(self.heavy_modules) or "none"}'
+
+
+@dataclass
+class SamplingSample:
+    scenario: str
+    sampling: str
+    number_of_nodes: int
+    number_of_stretches: int
+    microseconds_per_check: float
+    max_deviation: float
+
+    def __repr__(self) -> str:
+        return (f'{self.scenario:>8} {self.sampling:>8} nodes: {self.number_of_nodes:>7}, '
+                f'stretches: {self.number_of_stretches:>7}, check: {self.microseconds_per_check:>6.2f} us, '
+                f'max deviation: {self.max_deviation:.4f}')
+
+
+@dataclass
+class EngineComparison:
+    number_of_inputs: int
+    number_of_compared_points: int
+    number_of_mismatches: int
+    max_distance: float
+    microseconds_per_point: Dict[str, float]
+
+    def __repr__(self) -> str:
+        timings = ', '.join(f'{engine}: {value:.2f} us' for engine, value in self.microseconds_per_point.items())
+
+        return (f'inputs: {self.number_of_inputs}, compared points: {self.number_of_compared_points}, '
+                f'mismatches: {self.number_of_mismatches}, max distance: {self.max_distance:.2e}, {timings}')
+
+
+@dataclass
+class BenchmarkResult:
+    operation: str
+    scenario: str
+    size: int
+    number_of_nodes: int
+    calls: int
+    p50: float
+    p90: float
+    p99: float
+    max: float
+    peak_memory: int
+
+    @property
+    def key(self) -> str:
+        return f'{self.operation}/{self.scenario}/{self.size}'
+
+    def __repr__(self) -> str:
+        return (f'{self.key:<28} nodes: {self.number_of_nodes:>7}, calls: {self.calls:>7}, '
+                f'p50: {self.p50:>8.1f} us, p90: {self.p90:>8.1f} us, p99: {self.p99:>8.1f} us, '
+                f'max: {self.max:>9.1f} us, peak memory: {self.peak_memory / 2 ** 20:>7.2f} MiB')
+
+
+def synthetic_trajectory(number_of_points: int, step: float, noise: float=0, seed: int=0) -> Iterator[Point]:
+    random = Random(seed)
+
+    radius = step
+    angle = 0
+
+    for _ in range(number_of_points):
+        x = radius * cos(angle) + random.uniform(-noise, noise)
+        y = radius * sin(angle) + random.uniform(-noise, noise)
+
+        yield Point(x, y)
+
+        delta_angle = step / radius
+
+        angle += delta_angle
+        radius += 3 * step * delta_angle / (2 * pi)
+
+
+def straight_trajectory(number_of_points: int, step: float) -> Iterator[Point]:
+    for index in range(number_of_points):
+        yield Point(index * step, 0)
+
+
+def loop_trajectory(number_of_points: int, step: float, laps: int=2) -> Iterator[Point]:
+    points_per_lap = max(3, ceil(number_of_points / laps))
+    radius = points_per_lap * step / (2 * pi)
+
+    for index in range(number_of_points):
+        angle = 2 * pi * index / points_per_lap
+
+        yield Point(radius * cos(angle), radius * sin(angle))
+
+
+def grid_trajectory(number_of_points: int, step: float, block_length: float) -> Iterator[Point]:
+    blocks = 1
+
+    while 2 * (blocks + 1) * blocks * block_length < number_of_points * step:
+        blocks += 1
+
+    side = blocks * block_length
+
+    waypoints = []
+
+    for row in range(blocks + 1):
+        xs = (0, side) if row % 2 == 0 else (side, 0)
+        waypoints.extend((x, row * block_length) for x in xs)
+
+    for column in range(blocks, -1, -1):
+        ys = (side, 0) if (blocks - column) % 2 == 0 else (0, side)
+        waypoints.extend((column * block_length, y) for y in ys)
+
+    produced = 0
+    x, y = waypoints[0]
+    rest = 0
+
+    for next_x, next_y in waypoints[1:]:
+        length = ((next_x - x) ** 2 + (next_y - y) ** 2) ** 0.5
+        distance = rest
+
+        while distance < length and produced < number_of_points:
+            t = distance / length
+
+            yield Point(x + t * (next_x - x), y + t * (next_y - y))
+
+            produced += 1
+            distance += step
+
+        rest = distance - length
+        x, y = next_x, next_y
+
+        if produced == number_of_points:
+            return
+
+
+def calculator_inputs(trajectory: Sequence[Point], lane_offset: float=0.1, angle_to_road: float=0.05) -> List[CalculatorInputData]:
+    result = []
+    prev_pos = None
+
+    for prev_point, point in zip(trajectory[:-1], trajectory[1:]):
+        heading = atan2(point.y - prev_point.y, point.x - prev_point.x)
+
+        cur_pos = Point(point.x - lane_offset * sin(heading), point.y + lane_offset * cos(heading))
+
+        result.append(CalculatorInputData(
+            cur_pos=cur_pos,
+            prev_pos=prev_pos,
+            abs_angle=heading + angle_to_road,
+            angle_to_road=-angle_to_road,
+            dist=-lane_offset,
+        ))
+
+        prev_pos = cur_pos
+
+    return result
+
+
+def random_calculator_inputs(number_of_inputs: int, seed: int=0) -> List[CalculatorInputData]:
+    random = Random(seed)
+    result = []
+
+    for _ in range(number_of_inputs):
+        prev_pos = Point(random.uniform(-5, 5), random.uniform(-5, 5))
+
+        heading = random.choice([random.uniform(-pi, pi), pi / 2 + random.uniform(-1e-7, 1e-7), -pi / 2, 0, pi])
+        moving_angle = heading + random.uniform(-0.3, 0.3)
+        step = random.uniform(0.001, 0.05)
+
+        angle_to_road = random.choice([random.uniform(-0.5, 0.5), 0])
+
+        result.append(CalculatorInputData(
+            cur_pos=Point(prev_pos.x + step * cos(moving_angle), prev_pos.y + step * sin(moving_angle)),
+            prev_pos=prev_pos,
+            abs_angle=heading - angle_to_road,
+            angle_to_road=angle_to_road,
+            dist=random.choice([random.uniform(-0.2, 0.2), 0]),
+        ))
+
+    return result
+
+
+def synthetic_road_grid(blocks: int, block_length: float, min_distance: float) -> Graph:
+    graph = Graph(min_distance=min_distance)
+
+    intersections = [[graph.add_node(Point(i * block_length, j * block_length)) for j in range(blocks + 1)]
+                     for i in range(blocks + 1)]
+
+    steps = max(1, round(block_length / min_distance))
+
+    def add_road(index_1: int, index_2: int) -> None:
+        x1, y1 = graph.coordinates[index_1].tolist()
+        x2, y2 = graph.coordinates[index_2].tolist()
+
+        prev_index = index_1
+
+        for step in range(1, steps):
+            t = step / steps
+            cur_index = graph.add_node(Point(x1 + t * (x2 - x1), y1 + t * (y2 - y1)))
+
+            graph.add_stretch(prev_index, cur_index)
+            prev_index = cur_index
+
+        graph.add_stretch(prev_index, index_2)
+
+    for i in range(blocks + 1):
+        for j in range(blocks + 1):
+            if i < blocks:
+                add_road(intersections[i][j], intersections[i + 1][j])
+            if j < blocks:
+                add_road(intersections[i][j], intersections[i][j + 1])
+
+    return graph
+
+
+def benchmark_routing(graph: Graph, number_of_queries: int, max_table_size: int, name: str, seed: int=0) -> RoutingSample:
+    random = Random(seed)
+    min_x, max_x, min_y, max_y = graph.bounds
+
+    queries = [
+        (Point(random.uniform(min_x, max_x), random.uniform(min_y, max_y)),
+         Point(random.uniform(min_x, max_x), random.uniform(min_y, max_y)))
+        for _ in range(number_of_queries)
+    ]
+
+    start = perf_counter()
+
+    engine = RouteEngine(
+        coordinates=graph.coordinates,
+        edges=graph.edges,
+        lengths=graph.lengths,
+        max_table_size=max_table_size,
+    )
+
+    built = perf_counter()
+
+    for query_start, query_finish in queries:
+        engine.route(query_start, query_finish)
+
+    finish = perf_counter()
+
+    return RoutingSample(
+        name=name,
+        number_of_nodes=engine.number_of_nodes,
+        number_of_key_nodes=engine.number_of_key_nodes,
+        milliseconds_to_build=(built - start) * 1e3,
+        microseconds_per_route=(finish - built) / number_of_queries * 1e6,
+    )
+
+
+def benchmark_import(module: str, repeats: int=5) -> ImportSample:
+    root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    script = IMPORT_SCRIPT.format(module=module, heavy_modules=HEAVY_MODULES)
+
+    samples = []
+
+    for _ in range(repeats):
+        output = subprocess.run(
+            [sys.executable, '-c', script],
+            cwd=root,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+
+        samples.append(json.loads(output.splitlines()[-1]))
+
+    seconds, heavy_modules = min(samples)
+
+    return ImportSample(module=module, milliseconds=seconds * 1e3, heavy_modules=heavy_modules)
+
+
+def benchmark_graph_check(number_of_points: int, index_type: str, min_distance: float, window: int=1000) -> List[GraphCheckSample]:
+    graph = Graph(min_distance=min_distance, index_type=index_type)
+    result = []
+
+    start = perf_counter()
+
+    for number, point in enumerate(synthetic_trajectory(number_of_points=number_of_points, step=min_distance), start=1):
+        graph.check(point)
+
+        if number % window == 0:
+            finish = perf_counter()
+
+            result.append(GraphCheckSample(
+                number_of_nodes=graph.number_of_nodes,
+                microseconds_per_check=(finish - start) / window * 1e6,
+            ))
+
+            start = perf_counter()
+
+    return result
+
+
+def benchmark_sampling(scenario: str, size: int, sampling: str, min_distance: float) -> SamplingSample:
+    trajectory = _get_trajectory(scenario=scenario, size=size, step=min_distance)
+    graph = Graph(min_distance=min_distance, sampling=sampling)
+
+    start = perf_counter()
+
+    for point in trajectory:
+        graph.check(point)
+
+    graph.flush()
+
+    finish = perf_counter()
+
+    return SamplingSample(
+        scenario=scenario,
+        sampling=sampling,
+        number_of_nodes=graph.number_of_nodes,
+        number_of_stretches=graph.number_of_stretches,
+        microseconds_per_check=(finish - start) / len(trajectory) * 1e6,
+        max_deviation=_get_max_deviation(graph=graph, trajectory=trajectory),
+    )
+
+
+def compare_calculator_engines(inputs: Sequence[CalculatorInputData],
+                               engines: Sequence[str]=('lines', 'vectors')) -> EngineComparison:
+    points = {}
+    microseconds_per_point = {}
+
+    for engine in engines:
+        calculator = ClosestPointsCalculator(engine=engine)
+
+        start = perf_counter()
+        points[engine] = [calculator.get_closest_point(input_data) for input_data in inputs]
+        finish = perf_counter()
+
+        microseconds_per_point[engine] = (finish - start) / len(inputs) * 1e6
+
+    number_of_compared_points = 0
+    number_of_mismatches = 0
+    max_distance = 0.0
+
+    for reference, *others in zip(*points.values()):
+        for other in others:
+            if (reference is None) != (other is None):
+                number_of_mismatches += 1
+            elif reference is not None:
+                number_of_compared_points += 1
+                max_distance = max(max_distance, ((reference.x - other.x) ** 2 + (reference.y - other.y) ** 2) ** 0.5)
+
+    return EngineComparison(
+        number_of_inputs=len(inputs),
+        number_of_compared_points=number_of_compared_points,
+        number_of_mismatches=number_of_mismatches,
+        max_distance=max_distance,
+        microseconds_per_point=microseconds_per_point,
+    )
+
+
+def check_graph_round_trip(scenario: str, size: int, min_distance: float) -> bool:
+    trajectory = _get_trajectory(scenario=scenario, size=size, step=min_distance)
+    middle = len(trajectory) // 2
+
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn')) as executor:
+        graph = executor.submit(_build_graph, trajectory[:middle], min_distance).result()
+
+    for point in trajectory[middle:]:
+        graph.check(point)
+
+    graph.flush()
+
+    reference = _build_graph(trajectory=trajectory, min_distance=min_distance)
+
+    return (numpy.array_equal(graph.coordinates, reference.coordinates)
+            and numpy.array_equal(graph.edges, reference.edges)
+            and numpy.array_equal(graph.lengths, reference.lengths, equal_nan=True))
+
+
+def run_benchmark(operation: str, scenario: str, size: int, min_distance: float) -> BenchmarkResult:
+    trajectory = _get_trajectory(scenario=scenario, size=size, step=STEP * min_distance)
+    benchmark = OPERATIONS[operation]
+
+    gc.collect()
+
+    times, number_of_nodes = benchmark(trajectory, min_distance)
+
+    gc.collect()
+    tracemalloc.start()
+
+    try:
+        benchmark(trajectory, min_distance)
+
+        _, peak_memory = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    microseconds = times / 1e3
+    p50, p90, p99 = numpy.percentile(microseconds, PERCENTILES).tolist()
+
+    return BenchmarkResult(
+        operation=operation,
+        scenario=scenario,
+        size=size,
+        number_of_nodes=number_of_nodes,
+        calls=len(times),
+        p50=p50,
+        p90=p90,
+        p99=p99,
+        max=float(microseconds.max()),
+        peak_memory=peak_memory,
+    )
+
+
+def run_benchmark_suite(sizes: Sequence[int], min_distance: float, operations: Optional[Sequence[str]]=None,
+                        scenarios: Optional[Sequence[str]]=None) -> Iterator[BenchmarkResult]:
+    for operation in operations or OPERATIONS:
+        for scenario in scenarios or SCENARIOS:
+            for size in sizes:
+                yield run_benchmark(operation=operation, scenario=scenario, size=size, min_distance=min_distance)
+
+
+def save_baseline(path: str, results: Sequence[BenchmarkResult]) -> None:
+    with open(path, 'w') as file:
+        json.dump({result.key: asdict(result) for result in results}, file, indent=4)
+
+
+def load_baseline(path: str) -> Dict[str, BenchmarkResult]:
+    with open(path) as file:
+        return {key: BenchmarkResult(**value) for key, value in json.load(file).items()}
+
+
+def compare_with_baseline(results: Sequence[BenchmarkResult], baseline: Dict[str, BenchmarkResult],
+                          tolerance: float) -> List[str]:
+    regressions = []
+
+    for result in results:
+        if result.key not in baseline:
+            continue
+
+        for metric in COMPARED_METRICS:
+            value = getattr(result, metric)
+            base_value = getattr(baseline[result.key], metric)
+
+            if value > base_value * (1 + tolerance):
+                regressions.append(f'{result.key} {metric}: {base_value:.1f} -> {value:.1f} '
+                                   f'(+{(value / base_value - 1) * 100 if base_value > 0 else float("inf"):.0f}%)')
+
+    return regressions
+
+
+def _get_trajectory(scenario: str, size: int, step: float) -> List[Point]:
+    if scenario == 'straight':
+        return list(straight_trajectory(number_of_points=size, step=step))
+    if scenario == 'loop':
+        return list(loop_trajectory(number_of_points=2 * size, step=step, laps=2))
+    if scenario == 'grid':
+        return list(grid_trajectory(number_of_points=size, step=step, block_length=GRID_BLOCK_LENGTH * step))
+
+    raise ValueError(f'Unknown scenario: {scenario}')
+
+
+def _build_graph(trajectory: List[Point], min_distance: float) -> Graph:
+    graph = Graph(min_distance=min_distance)
+
+    for point in trajectory:
+        graph.check(point)
+
+    return graph
+
+
+def _get_max_deviation(graph: Graph, trajectory: List[Point], chunk_size: int=1000) -> float:
+    coordinates = graph.coordinates
+    starts = coordinates[graph.edges[:, 0]]
+    deltas = coordinates[graph.edges[:, 1]] - starts
+    squared_lengths = numpy.maximum((deltas ** 2).sum(axis=1), 1e-300)
+
+    points = numpy.array([[point.x, point.y] for point in trajectory])
+    result = 0.0
+
+    for chunk_start in range(0, len(points), chunk_size):
+        chunk = points[chunk_start:chunk_start + chunk_size, numpy.newaxis, :]
+
+        t = numpy.clip(((chunk - starts) * deltas).sum(axis=2) / squared_lengths, 0, 1)
+        offsets = chunk - starts - t[..., numpy.newaxis] * deltas
+
+        distances = numpy.hypot(chunk[..., 0] - coordinates[:, 0], chunk[..., 1] - coordinates[:, 1]).min(axis=1)
+
+        if len(deltas) != 0:
+            distances = numpy.minimum(distances, numpy.hypot(offsets[..., 0], offsets[..., 1]).min(axis=1))
+
+        result = max(result, float(distances.max()))
+
+    return result
+
+
+def _benchmark_calculator(trajectory: List[Point], min_distance: float) -> Tuple[numpy.ndarray, int]:
+    calculator = ClosestPointsCalculator()
+    inputs = calculator_inputs(trajectory)
+
+    times = numpy.empty(shape=len(inputs), dtype=numpy.int64)
+
+    _reset_peak_memory()
+
+    for index, input_data in enumerate(inputs):
+        start = perf_counter_ns()
+        calculator.get_closest_point(input_data)
+        times[index] = perf_counter_ns() - start
+
+    return times, 0
+
+
+def _benchmark_graph_check(trajectory: List[Point], min_distance: float) -> Tuple[numpy.ndarray, int]:
+    graph = Graph(min_distance=min_distance)
+
+    times = numpy.empty(shape=len(trajectory), dtype=numpy.int64)
+
+    _reset_peak_memory()
+
+    for index, point in enumerate(trajectory):
+        start = perf_counter_ns()
+        graph.check(point)
+        times[index] = perf_counter_ns() - start
+
+    return times, graph.number_of_nodes
+
+
+def _benchmark_upload_graph(trajectory: List[Point], min_distance: float) -> Tuple[numpy.ndarray, int]:
+    graph = Graph(min_distance=min_distance)
+    drawer = GraphDrawer(GraphDrawerSettings())
+
+    times = numpy.empty(shape=len(trajectory) // UPLOAD_PERIOD, dtype=numpy.int64)
+
+    _reset_peak_memory()
+
+    for index, point in enumerate(trajectory):
+        graph.check(point)
+
+        if (index + 1) % UPLOAD_PERIOD == 0:
+            start = perf_counter_ns()
+            drawer.upload_graph(graph)
+            times[index // UPLOAD_PERIOD] = perf_counter_ns() - start
+
+    return times, graph.number_of_nodes
+
+
+def _reset_peak_memory() -> None:
+    if tracemalloc.is_tracing():
+        tracemalloc.reset_peak()
+
+
+SCENARIOS = ('straight', 'loop', 'grid')
+
+OPERATIONS: Dict[str, Callable[[List[Point], float], Tuple[numpy.ndarray, int]]] = {
+    'calculator': _benchmark_calculator,
+    'graph_check': _benchmark_graph_check,
+    'upload_graph': _benchmark_upload_graph,
+}
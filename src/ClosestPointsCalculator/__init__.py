@@ -1,10 +1,11 @@
 import numpy
-from math import pi, inf, isinf, sqrt, cos, tan
+from math import pi, inf, nan, isinf, sqrt, cos, sin, tan
 
 from dataclasses import dataclass
-from typing import List, Optional
+from typing import List, Optional, Tuple
 
 from src.Point import *
+from src.config import CALCULATOR_ENGINE
 
 
 __all__ = ['CalculatorInputData', 'ClosestPointsCalculator']
@@ -59,9 +60,23 @@ class ClosestPointsCalculator:
     __bot_line: Optional[Line]
     __road_lines: List[Line]
     __closest_point: Optional[Point]
+    __is_vector_engine: bool
+
+    def __init__(self, engine: str=CALCULATOR_ENGINE) -> None:
+        if engine not in ('lines', 'vectors'):
+            raise ValueError(f'Unknown engine of closest points calculator: {engine}')
+
+        self.__is_vector_engine = engine == 'vectors'
+
+    @property
+    def engine(self) -> str:
+        return 'vectors' if self.__is_vector_engine else 'lines'
 
     def get_closest_point(self, input_data: CalculatorInputData) -> Optional[Point]:
         if input_data.prev_pos is not None:
+            if self.__is_vector_engine:
+                return self.__get_closest_point_by_vectors(input_data)
+
             self.__input_data = input_data
 
             self.__bot_line = None
@@ -76,6 +91,90 @@ class ClosestPointsCalculator:
 
         return None
 
+    def get_closest_points(self, positions: numpy.ndarray, abs_angles: numpy.ndarray, angles_to_road: numpy.ndarray,
+                           distances: numpy.ndarray,
+                           prev_positions: Optional[numpy.ndarray]=None) -> Tuple[numpy.ndarray, numpy.ndarray]:
+        positions = numpy.asarray(positions, dtype=numpy.float64)
+        abs_angles = numpy.asarray(abs_angles, dtype=numpy.float64)
+        angles_to_road = numpy.asarray(angles_to_road, dtype=numpy.float64)
+        distances = numpy.asarray(distances, dtype=numpy.float64)
+
+        if prev_positions is None:
+            prev_positions = numpy.full_like(positions, nan)
+            prev_positions[1:] = positions[:-1]
+        else:
+            prev_positions = numpy.asarray(prev_positions, dtype=numpy.float64)
+
+        if self.__is_vector_engine:
+            return self.__get_closest_points_by_vectors(
+                positions=positions,
+                prev_positions=prev_positions,
+                directions_of_road=abs_angles + angles_to_road,
+                distances=distances,
+            )
+
+        with numpy.errstate(divide='ignore', invalid='ignore', over='ignore'):
+            slopes = self.__get_slopes_of_road_lines(abs_angles=abs_angles, angles_to_road=angles_to_road)
+
+            closest_points = [
+                self.__get_closest_points_on_lines(positions=positions, slopes=slopes, intercepts=intercepts)
+                for intercepts in self.__get_intercepts_of_road_lines(positions=positions, slopes=slopes, distances=distances)
+            ]
+
+            result = numpy.full_like(positions, nan)
+            is_valid = numpy.zeros(shape=len(positions), dtype=bool)
+
+            for points in closest_points:
+                is_point_appropriate = self.__points_positions_relative_to_vectors(
+                    initial_points=prev_positions,
+                    terminal_points=positions,
+                    points=points,
+                ) * numpy.sign(distances) < 0
+
+                result[is_point_appropriate] = points[is_point_appropriate]
+                is_valid |= is_point_appropriate
+
+        return result, is_valid
+
+    @staticmethod
+    def __get_closest_point_by_vectors(input_data: CalculatorInputData) -> Optional[Point]:
+        direction_of_road = input_data.abs_angle + input_data.angle_to_road
+        cos_of_direction = cos(direction_of_road)
+        sin_of_direction = sin(direction_of_road)
+
+        cur_pos = input_data.cur_pos
+        prev_pos = input_data.prev_pos
+
+        moving_along_road = (cur_pos.x - prev_pos.x) * cos_of_direction + (cur_pos.y - prev_pos.y) * sin_of_direction
+
+        if moving_along_road == 0 or input_data.dist == 0:
+            return None
+
+        offset = input_data.dist if moving_along_road > 0 else -input_data.dist
+
+        return Point(cur_pos.x + offset * sin_of_direction, cur_pos.y - offset * cos_of_direction)
+
+    @staticmethod
+    def __get_closest_points_by_vectors(positions: numpy.ndarray, prev_positions: numpy.ndarray,
+                                        directions_of_road: numpy.ndarray,
+                                        distances: numpy.ndarray) -> Tuple[numpy.ndarray, numpy.ndarray]:
+        cos_of_directions = numpy.cos(directions_of_road)
+        sin_of_directions = numpy.sin(directions_of_road)
+
+        moving = positions - prev_positions
+        moving_along_road = moving[:, 0] * cos_of_directions + moving[:, 1] * sin_of_directions
+
+        is_valid = (moving_along_road != 0) & (distances != 0) & ~numpy.isnan(moving_along_road)
+        offsets = numpy.where(moving_along_road > 0, distances, -distances)
+
+        result = numpy.column_stack((
+            positions[:, 0] + offsets * sin_of_directions,
+            positions[:, 1] - offsets * cos_of_directions,
+        ))
+        result[~is_valid] = nan
+
+        return result, is_valid
+
     def __calculate_bot_line(self) -> None:
         slope = self.__my_tan(self.__input_data.abs_angle)
         self.__bot_line = Line(slope=slope)
@@ -158,7 +257,7 @@ class ClosestPointsCalculator:
 
             A = 1
             B = 2 * (a * x - y)
-            C = a ** 2 * (x ** 2 - r ** 2) - y * (2 * slope * x - y) - r
+            C = a ** 2 * (x ** 2 - r) - y * (2 * slope * x - y) - r
 
             return self.__solve_quadratic_equation(a=A, b=B, c=C)
 
@@ -199,11 +298,87 @@ class ClosestPointsCalculator:
     def __solve_quadratic_equation(a: float, b: float, c: float) -> List[float]:
         D = b ** 2 - 4 * a * c
 
-        x1 = (-b - sqrt(D)) / (2 * a)
-        x2 = (-b + sqrt(D)) / (2 * a)
+        sqrt_of_D = sqrt(max(D, 0))
+
+        x1 = (-b - sqrt_of_D) / (2 * a)
+        x2 = (-b + sqrt_of_D) / (2 * a)
 
         return [x1, x2]
 
+    def __get_slopes_of_road_lines(self, abs_angles: numpy.ndarray, angles_to_road: numpy.ndarray) -> numpy.ndarray:
+        bot_slopes = self.__my_tan_of_array(abs_angles)
+        is_bot_slope_inf = numpy.isinf(bot_slopes)
+
+        new_angles = numpy.sign(-angles_to_road) * (abs(pi / 2) - numpy.abs(angles_to_road))
+        slopes_for_inf_bot = numpy.where(self.__is_zero_array(angles_to_road), inf, self.__my_tan_of_array(new_angles))
+
+        finite_bot_slopes = numpy.where(is_bot_slope_inf, 0, bot_slopes)
+        tan_of_angles = numpy.tan(angles_to_road)
+
+        slopes_for_perpendicular = self.__my_divide_arrays(numpy.full_like(finite_bot_slopes, -1), finite_bot_slopes)
+        slopes_for_other = self.__my_divide_arrays(tan_of_angles + finite_bot_slopes, 1 - tan_of_angles * finite_bot_slopes)
+        slopes_for_finite_bot = numpy.where(
+            numpy.isinf(self.__my_tan_of_array(angles_to_road)),
+            slopes_for_perpendicular,
+            slopes_for_other,
+        )
+
+        return numpy.where(is_bot_slope_inf, slopes_for_inf_bot, slopes_for_finite_bot)
+
+    @staticmethod
+    def __get_intercepts_of_road_lines(positions: numpy.ndarray, slopes: numpy.ndarray,
+                                       distances: numpy.ndarray) -> List[numpy.ndarray]:
+        is_slope_inf = numpy.isinf(slopes)
+
+        a = numpy.where(is_slope_inf, 0, slopes)
+        x = positions[:, 0]
+        y = positions[:, 1]
+        r = distances ** 2
+
+        B = 2 * (a * x - y)
+        C = a ** 2 * (x ** 2 - r) - y * (2 * a * x - y) - r
+        sqrt_of_D = numpy.sqrt(B ** 2 - 4 * C)
+
+        intercept1 = numpy.where(is_slope_inf, x - distances, (-B - sqrt_of_D) / 2)
+        intercept2 = numpy.where(is_slope_inf, x + distances, (-B + sqrt_of_D) / 2)
+
+        return [intercept1, intercept2]
+
+    @staticmethod
+    def __get_closest_points_on_lines(positions: numpy.ndarray, slopes: numpy.ndarray,
+                                      intercepts: numpy.ndarray) -> numpy.ndarray:
+        is_slope_inf = numpy.isinf(slopes)
+
+        a = numpy.where(is_slope_inf, 0, slopes)
+        x = positions[:, 0]
+        y = positions[:, 1]
+
+        A = a ** 2 + 1
+        B = a * (intercepts - y) - x
+
+        closest_x = numpy.where(is_slope_inf, intercepts, -B / A)
+        closest_y = numpy.where(is_slope_inf, y, a * closest_x + intercepts)
+
+        return numpy.column_stack((closest_x, closest_y))
+
+    @staticmethod
+    def __points_positions_relative_to_vectors(initial_points: numpy.ndarray, terminal_points: numpy.ndarray,
+                                               points: numpy.ndarray) -> numpy.ndarray:
+        ax, ay = initial_points[:, 0], initial_points[:, 1]
+        bx, by = terminal_points[:, 0], terminal_points[:, 1]
+        px, py = points[:, 0], points[:, 1]
+
+        return numpy.sign((bx - ax) * (py - ay) - (by - ay) * (px - ax))
+
+    def __is_zero_array(self, numbers: numpy.ndarray) -> numpy.ndarray:
+        return numpy.round(numbers, self.__precision) == 0
+
+    def __my_divide_arrays(self, numerators: numpy.ndarray, denominators: numpy.ndarray) -> numpy.ndarray:
+        return numpy.where(self.__is_zero_array(denominators), inf, numerators / denominators)
+
+    def __my_tan_of_array(self, angles: numpy.ndarray) -> numpy.ndarray:
+        return numpy.where(self.__is_zero_array(numpy.cos(angles)), inf, numpy.tan(angles))
+
     def __my_round(self, number: float) -> float:
         return round(number, self.__precision)
 
@@ -1,10 +1,16 @@
+from __future__ import annotations
+
 from math import pi
 
 import numpy
-from pyglet.window import key
 
-from gym_duckietown.src.gym_duckietown.simulator import LanePosition
-from gym_duckietown.src.gym_duckietown.envs.duckietown_env import DuckietownEnv
+from typing import TYPE_CHECKING
+
+from src.Sensors import SensorSnapshot
+
+if TYPE_CHECKING:
+    from pyglet.window import key
+    from gym_duckietown.src.gym_duckietown.envs.duckietown_env import DuckietownEnv
 
 
 __all__ = ['Driver', 'ManualDriver', 'AutoDriver']
@@ -12,14 +18,15 @@ __all__ = ['Driver', 'ManualDriver', 'AutoDriver']
 
 class Driver:
     _environment: DuckietownEnv
+    _snapshot: SensorSnapshot
     _speed: float=0
     _rotation: float=0
 
     def __init__(self, environment: DuckietownEnv) -> None:
         self._environment = environment
 
-    @property
-    def action(self) -> numpy.ndarray:
+    def get_action(self, snapshot: SensorSnapshot) -> numpy.ndarray:
+        self._snapshot = snapshot
         self._speed = 0
         self._rotation = 0
 
@@ -42,6 +49,8 @@ class ManualDriver(Driver):
         self.__key_handler = key_handler
 
     def _update_speed(self) -> None:
+        from pyglet.window import key
+
         max_speed = 0.44
 
         is_moving_forward = self.__key_handler[key.UP] or self.__key_handler[key.W]
@@ -50,6 +59,8 @@ class ManualDriver(Driver):
         self._speed = max_speed * (is_moving_forward - is_moving_back)
 
     def _update_rotation(self) -> None:
+        from pyglet.window import key
+
         max_rotation = 1
 
         is_moving_left = self.__key_handler[key.LEFT] or self.__key_handler[key.A]
@@ -59,48 +70,38 @@ class ManualDriver(Driver):
 
 
 class AutoDriver(Driver):
-    def __init__(self, environment: DuckietownEnv) -> None:
-        super().__init__(environment=environment)
-
-    def _update_speed(self) -> None:
-        abs_delta_angle = abs(1 - 2 * abs(self.__angle_to_road) / pi)
+    @staticmethod
+    def get_actions(lane_distances: numpy.ndarray, angles_to_road: numpy.ndarray) -> numpy.ndarray:
+        lane_distances = numpy.asarray(lane_distances, dtype=numpy.float64)
+        angles_to_road = numpy.asarray(angles_to_road, dtype=numpy.float64)
 
-        self._speed = self.__get_dependence(
-            value=abs_delta_angle,
+        speeds = AutoDriver.__get_dependence(
+            value=numpy.abs(1 - 2 * numpy.abs(angles_to_road) / pi),
             power=5,
             multiplier=0.35
         )
 
-    def _update_rotation(self) -> None:
-        self.__update_rotation_by_angle_to_road()
-
-        self.__update_rotation_by_distance_to_road()
-
-    def __update_rotation_by_angle_to_road(self) -> None:
-        self._rotation += self.__get_dependence(
-            value=self.__angle_to_road / pi,
+        rotations = AutoDriver.__get_dependence(
+            value=angles_to_road / pi,
             power=0.45,
             multiplier=6
         )
-
-    def __update_rotation_by_distance_to_road(self) -> None:
-        self._rotation += self.__get_dependence(
-            value=self.__distance_to_road,
+        rotations += AutoDriver.__get_dependence(
+            value=lane_distances + 0.14,
             power=0.7,
             multiplier=6
         )
 
-    @property
-    def __distance_to_road(self) -> float:
-        return self.__lane_pos.dist + 0.14
+        return numpy.column_stack((speeds, rotations))
+
+    def get_action(self, snapshot: SensorSnapshot) -> numpy.ndarray:
+        self._snapshot = snapshot
 
-    @property
-    def __angle_to_road(self) -> float:
-        return self.__lane_pos.angle_rad
+        lane_pose = snapshot.lane_pose
+        action = self.get_actions(lane_distances=[lane_pose.dist], angles_to_road=[lane_pose.angle_rad])[0]
+        self._speed, self._rotation = action
 
-    @property
-    def __lane_pos(self) -> LanePosition:
-        return self._environment.get_lane_pos2(self._environment.cur_pos, self._environment.cur_angle)
+        return action
 
     @staticmethod
     def __get_dependence(value: float, power: float, multiplier: float) -> float:
@@ -0,0 +1,187 @@
+import numpy
+from collections import deque
+from math import acos, cos, sin
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Set, Tuple
+
+from gym_duckietown.graphics import bezier_closest, bezier_point, bezier_tangent
+from gym_duckietown.simulator import LanePosition
+from gym_duckietown.envs.duckietown_env import DuckietownEnv
+
+
+__all__ = ['ExplorationTracker']
+
+
+Tile = Tuple[int, int]
+
+Direction = Tuple[int, int]
+
+
+@dataclass
+class TileCurve:
+    index: int
+    control_points: numpy.ndarray
+    entry: Direction
+    exit: Direction
+
+
+class ExplorationTracker:
+    __environment: DuckietownEnv
+    __exits: Dict[Tile, Set[Direction]]
+    __curves: Dict[Tile, List[TileCurve]]
+    __taken_exits: Dict[Tile, Set[Direction]]
+    __visited: Set[Tile]
+    __cur_tile: Optional[Tile]=None
+    __direction: Optional[Direction]=None
+    __chosen_exit: Optional[Direction]=None
+
+    def __init__(self, environment: DuckietownEnv) -> None:
+        self.__environment = environment
+        self.__exits = {}
+        self.__curves = {}
+        self.__taken_exits = {}
+        self.__visited = set()
+
+        for tile in environment.drivable_tiles:
+            coords = tuple(tile['coords'])
+            curves = [
+                self.__describe_curve(coords, index, control_points) for index, control_points in enumerate(tile['curves'])
+            ]
+
+            self.__curves[coords] = curves
+            self.__exits[coords] = {curve.exit for curve in curves}
+            self.__taken_exits[coords] = set()
+
+    @property
+    def intersections(self) -> List[Tile]:
+        return [tile for tile, exits in self.__exits.items() if len(exits) >= 3]
+
+    @property
+    def frontier(self) -> Dict[Tile, Set[Direction]]:
+        result = {}
+
+        for tile in self.intersections:
+            untaken_exits = self.__exits[tile] - self.__taken_exits[tile]
+
+            if untaken_exits:
+                result[tile] = untaken_exits
+
+        return result
+
+    @property
+    def unvisited_tiles(self) -> Set[Tile]:
+        return set(self.__exits) - self.__visited
+
+    @property
+    def is_complete(self) -> bool:
+        return not self.frontier and not self.unvisited_tiles
+
+    def update(self, cur_pos: numpy.ndarray) -> None:
+        tile = tuple(self.__environment.get_grid_coords(cur_pos))
+
+        if tile == self.__cur_tile:
+            return
+
+        if self.__cur_tile is not None:
+            direction = (tile[0] - self.__cur_tile[0], tile[1] - self.__cur_tile[1])
+
+            if abs(direction[0]) + abs(direction[1]) == 1:
+                self.__taken_exits.setdefault(self.__cur_tile, set()).add(direction)
+                self.__taken_exits.setdefault(tile, set()).add((-direction[0], -direction[1]))
+                self.__direction = direction
+            else:
+                self.__direction = None
+
+        self.__cur_tile = tile
+        self.__visited.add(tile)
+        self.__chosen_exit = None
+
+    def get_driving_curve(self, cur_pos: numpy.ndarray) -> Optional[int]:
+        self.update(cur_pos)
+
+        if self.__cur_tile not in self.__exits or len(self.__exits[self.__cur_tile]) < 3 or self.__direction is None:
+            return None
+
+        entry = (-self.__direction[0], -self.__direction[1])
+
+        curves = [curve for curve in self.__curves[self.__cur_tile] if curve.entry == entry]
+
+        if not curves:
+            return None
+
+        if self.__chosen_exit is None:
+            self.__chosen_exit = self.__choose_exit([curve.exit for curve in curves])
+
+        return next(curve.index for curve in curves if curve.exit == self.__chosen_exit)
+
+    def get_curve_lane_pose(self, curve_index: int, cur_pos: numpy.ndarray, cur_angle: float) -> LanePosition:
+        return self.__get_lane_pose(curve=self.__curves[self.__cur_tile][curve_index], cur_pos=cur_pos, cur_angle=cur_angle)
+
+    def __choose_exit(self, exits: List[Direction]) -> Direction:
+        untaken_exits = [exit for exit in exits if exit not in self.__taken_exits[self.__cur_tile]]
+
+        if untaken_exits:
+            return untaken_exits[0]
+
+        return min(exits, key=self.__get_distance_to_frontier)
+
+    def __get_distance_to_frontier(self, exit: Direction) -> float:
+        targets = set(self.frontier) | self.unvisited_tiles
+        start = (self.__cur_tile[0] + exit[0], self.__cur_tile[1] + exit[1])
+
+        distances = {start: 0}
+        queue = deque([start])
+
+        while queue:
+            tile = queue.popleft()
+
+            if tile in targets:
+                return distances[tile]
+
+            for direction in self.__exits.get(tile, ()):
+                neighbour = (tile[0] + direction[0], tile[1] + direction[1])
+
+                if neighbour not in distances:
+                    distances[neighbour] = distances[tile] + 1
+                    queue.append(neighbour)
+
+        return numpy.inf
+
+    def __describe_curve(self, tile: Tile, index: int, control_points: numpy.ndarray) -> TileCurve:
+        return TileCurve(
+            index=index,
+            control_points=control_points,
+            entry=self.__get_side(tile, control_points[0]),
+            exit=self.__get_side(tile, control_points[-1]),
+        )
+
+    def __get_side(self, tile: Tile, point: numpy.ndarray) -> Direction:
+        size = self.__environment.road_tile_size
+
+        dx = point[0] - (tile[0] + 0.5) * size
+        dz = point[2] - (tile[1] + 0.5) * size
+
+        if abs(dx) > abs(dz):
+            return int(numpy.sign(dx)), 0
+
+        return 0, int(numpy.sign(dz))
+
+    @staticmethod
+    def __get_lane_pose(curve: TileCurve, cur_pos: numpy.ndarray, cur_angle: float) -> LanePosition:
+        t = bezier_closest(curve.control_points, cur_pos)
+        point = bezier_point(curve.control_points, t)
+        tangent = bezier_tangent(curve.control_points, t)
+
+        dir_vec = numpy.array([cos(cur_angle), 0, -sin(cur_angle)])
+        right_vec = numpy.cross(tangent, numpy.array([0, 1, 0]))
+
+        dot_dir = max(-1, min(1, numpy.dot(dir_vec, tangent)))
+        signed_dist = numpy.dot(cur_pos - point, right_vec)
+
+        angle_rad = acos(dot_dir)
+
+        if numpy.dot(dir_vec, right_vec) < 0:
+            angle_rad *= -1
+
+        return LanePosition(dist=signed_dist, dot_dir=dot_dir, angle_deg=numpy.rad2deg(angle_rad), angle_rad=angle_rad)
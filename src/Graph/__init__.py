@@ -1,11 +1,29 @@
+import numpy
+from itertools import count
+from math import asin, atan2, ceil, hypot, nan, pi
+from threading import RLock
+
 from dataclasses import dataclass
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 
-from src.config import MIN_DISTANCE_IN_GRAPH
+from src.config import MIN_DISTANCE_IN_GRAPH, SPATIAL_INDEX_TYPE, WEIGHTED_STRETCHES, MERGE_TOLERANCE, \
+    CONSOLIDATION_PERIOD, GRAPH_SAMPLING, SAMPLING_TOLERANCE, SAMPLING_HEADING_TOLERANCE, MAX_NODE_SPACING
 from src.Point import Point
+from src.MapFile import MapData, write_map, read_map, export_geojson
+from src.Routing import Route, RouteEngine
+from src.SpatialIndex import SpatialIndex, create_spatial_index
+
+
+__all__ = ['Graph', 'GraphSnapshot', 'GraphCursor', 'Node', 'RoadStretch']
 
 
-__all__ = ['Graph', 'RoadStretch']
+Bounds = Tuple[float, float, float, float]
+
+# revision, coordinates, edges, lengths, number of nodes, number of stretches
+_State = Tuple[int, numpy.ndarray, numpy.ndarray, numpy.ndarray, int, int]
+
+# revision, number of nodes, number of stretches
+_Version = Tuple[int, int, int]
 
 
 @dataclass
@@ -17,85 +35,635 @@ class Node:
 class RoadStretch:
     node_1: Node
     node_2: Node
+    length: Optional[float]=None
+
+
+@dataclass
+class GraphSnapshot:
+    uid: int
+    revision: int
+    coordinates: numpy.ndarray
+    edges: numpy.ndarray
+    lengths: numpy.ndarray
+
+    @property
+    def number_of_nodes(self) -> int:
+        return len(self.coordinates)
+
+    @property
+    def number_of_stretches(self) -> int:
+        return len(self.edges)
+
+    @property
+    def bounds(self) -> Optional[Bounds]:
+        if self.number_of_nodes == 0:
+            return None
+
+        min_x, min_y = self.coordinates.min(axis=0).tolist()
+        max_x, max_y = self.coordinates.max(axis=0).tolist()
+
+        return min_x, max_x, min_y, max_y
+
+
+# end of the segment that is not added to the graph yet and the range of its directions (relative to the reference
+# direction) that keep all skipped points of the segment within the sampling tolerance
+@dataclass
+class _Segment:
+    end: Point
+    reference: float
+    low: float
+    high: float
+
+
+@dataclass
+class GraphCursor:
+    revision: int
+    prev_index: int
+    cur_index: int
+    segment: Optional[_Segment]=None
 
 
 class Graph:
-    __nodes: List[Node]=[]
-    __stretches: List[RoadStretch]=[]
+    __INITIAL_CAPACITY: int=1024
+    __uids = count()
+    __coordinates: numpy.ndarray
+    __edges: numpy.ndarray
+    __lengths: numpy.ndarray
+    __number_of_nodes: int
+    __number_of_stretches: int
+    __adjacency: Optional[Dict[int, Dict[int, int]]]
     __cur_index: int=-1
     __prev_index: int=-1
+    __index: Optional[SpatialIndex]
+    __revision: int=0
+    __checks_since_consolidation: int=0
+    __number_of_consolidated_nodes: int=0
+    __route_engine: Optional[Tuple[_Version, RouteEngine]]=None
+    __number_of_added_nodes: int=0
+    __number_of_added_stretches: int=0
+    __number_of_merged_nodes: int=0
+    __number_of_snapped_points: int=0
+    __segment: Optional[_Segment]=None
+    __lock: RLock
+    __state: _State
 
-    def __init__(self, min_distance: float=MIN_DISTANCE_IN_GRAPH) -> None:
+    def __init__(self, min_distance: float=MIN_DISTANCE_IN_GRAPH, index_type: str=SPATIAL_INDEX_TYPE,
+                 weighted: bool=WEIGHTED_STRETCHES, merge_tolerance: Optional[float]=MERGE_TOLERANCE,
+                 consolidation_period: int=CONSOLIDATION_PERIOD, sampling: str=GRAPH_SAMPLING,
+                 sampling_tolerance: float=SAMPLING_TOLERANCE, heading_tolerance: float=SAMPLING_HEADING_TOLERANCE,
+                 max_node_spacing: float=MAX_NODE_SPACING) -> None:
+        if sampling not in ('fixed', 'adaptive'):
+            raise ValueError(f'Unknown type of sampling: {sampling}')
+
+        self.__uid = next(self.__uids)
+        self.__is_adaptive = sampling == 'adaptive'
+        self.__sampling_tolerance = sampling_tolerance
+        self.__heading_tolerance = heading_tolerance
+        self.__max_node_spacing = max_node_spacing
         self.__min_distance = min_distance
+        self.__merge_tolerance = merge_tolerance
+        self.__consolidation_period = consolidation_period
+        self.__merge_window = 0 if merge_tolerance is None else ceil(2 * merge_tolerance / min_distance) + 2
+        self.__weighted = weighted
+        self.__index_type = index_type
+        self.__coordinates = numpy.empty(shape=(self.__INITIAL_CAPACITY, 2), dtype=numpy.float64)
+        self.__edges = numpy.empty(shape=(self.__INITIAL_CAPACITY, 2), dtype=numpy.int32)
+        self.__lengths = numpy.empty(shape=self.__INITIAL_CAPACITY, dtype=numpy.float64)
+        self.__number_of_nodes = 0
+        self.__number_of_stretches = 0
+        self.__adjacency = {}
+        self.__index = create_spatial_index(index_type=index_type, cell_size=min_distance)
+        self.__lock = RLock()
+        self.__publish()
+
+    def __getstate__(self) -> dict:
+        with self.__lock:
+            state = self.__dict__.copy()
+
+            state['_Graph__coordinates'] = self.coordinates.copy()
+            state['_Graph__edges'] = self.edges.copy()
+            state['_Graph__lengths'] = self.lengths.copy()
+
+        for name in ('_Graph__lock', '_Graph__state', '_Graph__index', '_Graph__adjacency', '_Graph__route_engine'):
+            state.pop(name, None)
+
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+
+        self.__uid = next(self.__uids)
+        self.__adjacency = None
+        self.__index = None
+        self.__lock = RLock()
+        self.__publish()
+
+    @property
+    def uid(self) -> int:
+        return self.__uid
+
+    @property
+    def revision(self) -> int:
+        return self.__revision
+
+    @property
+    def coordinates(self) -> numpy.ndarray:
+        return self.__read_only(self.__coordinates[:self.__number_of_nodes])
+
+    @property
+    def edges(self) -> numpy.ndarray:
+        return self.__read_only(self.__edges[:self.__number_of_stretches])
+
+    @property
+    def lengths(self) -> numpy.ndarray:
+        return self.__read_only(self.__lengths[:self.__number_of_stretches])
 
     @property
     def nodes(self) -> List[Node]:
-        return self.__nodes
+        return [Node(Point(x, y)) for x, y in self.coordinates.tolist()]
 
     @property
     def stretches(self) -> List[RoadStretch]:
-        return self.__stretches
+        nodes = self.nodes
+
+        return [
+            RoadStretch(node_1=nodes[index_1], node_2=nodes[index_2], length=None if numpy.isnan(length) else length)
+            for (index_1, index_2), length in zip(self.edges.tolist(), self.lengths.tolist())
+        ]
 
     @property
     def number_of_nodes(self) -> int:
-        return len(self.__nodes)
+        return self.__number_of_nodes
 
-    def check(self, pos_of_node: Optional[Point]) -> None:
-        if pos_of_node is not None:
-            node_to_check = Node(pos_of_node)
+    @property
+    def number_of_stretches(self) -> int:
+        return self.__number_of_stretches
 
-            index_of_nearest = self.__get_index_of_nearest(node_to_check)
+    @property
+    def bounds(self) -> Optional[Bounds]:
+        return self.snapshot().bounds
 
-            nearest_node = None if index_of_nearest == -1 else self.__nodes[index_of_nearest]
+    @property
+    def number_of_added_nodes(self) -> int:
+        return self.__number_of_added_nodes
 
-            is_node_appropriate = index_of_nearest == -1 or nearest_node.center - node_to_check.center >= self.__min_distance
+    @property
+    def number_of_added_stretches(self) -> int:
+        return self.__number_of_added_stretches
+
+    @property
+    def number_of_merged_nodes(self) -> int:
+        return self.__number_of_merged_nodes
+
+    @property
+    def number_of_snapped_points(self) -> int:
+        return self.__number_of_snapped_points
+
+    @property
+    def route_engine(self) -> RouteEngine:
+        snapshot = self.snapshot()
+        version = (snapshot.revision, snapshot.number_of_nodes, snapshot.number_of_stretches)
+
+        cached = self.__route_engine
+
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
+        route_engine = RouteEngine(coordinates=snapshot.coordinates, edges=snapshot.edges, lengths=snapshot.lengths)
+
+        with self.__lock:
+            if self.__route_engine is None or self.__route_engine[0] < version:
+                self.__route_engine = version, route_engine
 
-            if is_node_appropriate:
-                self.__add_node(node_to_check)
+        return route_engine
+
+    def snapshot(self) -> GraphSnapshot:
+        revision, coordinates, edges, lengths, number_of_nodes, number_of_stretches = self.__state
+
+        return GraphSnapshot(
+            uid=self.__uid,
+            revision=revision,
+            coordinates=self.__read_only(coordinates[:number_of_nodes]),
+            edges=self.__read_only(edges[:number_of_stretches]),
+            lengths=self.__read_only(lengths[:number_of_stretches]),
+        )
+
+    def get_cursor(self) -> GraphCursor:
+        with self.__lock:
+            return GraphCursor(
+                revision=self.__revision,
+                prev_index=self.__prev_index,
+                cur_index=self.__cur_index,
+                segment=self.__segment,
+            )
+
+    def set_cursor(self, cursor: Optional[GraphCursor]) -> None:
+        with self.__lock:
+            if cursor is None or cursor.revision != self.__revision:
+                self.__prev_index = -1
+                self.__cur_index = -1
+                self.__segment = None
             else:
-                self.__prev_index = self.__cur_index
-                self.__cur_index = index_of_nearest
+                self.__prev_index = cursor.prev_index
+                self.__cur_index = cursor.cur_index
+                self.__segment = cursor.segment
+
+    def node(self, index: int) -> Node:
+        x, y = self.__coordinates[index].tolist()
+
+        return Node(Point(x, y))
+
+    def distances_to(self, point: Point) -> numpy.ndarray:
+        return numpy.hypot(self.coordinates[:, 0] - point.x, self.coordinates[:, 1] - point.y)
+
+    def stretch_lengths(self) -> numpy.ndarray:
+        delta = self.coordinates[self.edges[:, 0]] - self.coordinates[self.edges[:, 1]]
+
+        return numpy.hypot(delta[:, 0], delta[:, 1])
+
+    def has_stretch(self, index_1: int, index_2: int) -> bool:
+        return index_2 in self.__get_adjacency().get(index_1, {})
+
+    def degree(self, index: int) -> int:
+        return len(self.__get_adjacency().get(index, {}))
+
+    def neighbours(self, index: int) -> List[int]:
+        return list(self.__get_adjacency().get(index, {}))
+
+    def get_stretch_length(self, index_1: int, index_2: int) -> Optional[float]:
+        length = float(self.__lengths[self.__get_adjacency()[index_1][index_2]])
+
+        return None if numpy.isnan(length) else length
+
+    def route(self, start: Point, finish: Point) -> Optional[Route]:
+        return self.route_engine.route(start=start, finish=finish)
+
+    def route_length(self, start: Point, finish: Point) -> float:
+        return self.route_engine.distance(start=start, finish=finish)
+
+    def add_node(self, point: Point) -> int:
+        with self.__lock:
+            index = self.__number_of_nodes
+
+            if index == len(self.__coordinates):
+                self.__coordinates = self.__grow(self.__coordinates)
+
+            self.__coordinates[index] = point.x, point.y
+            self.__number_of_nodes += 1
+            self.__number_of_added_nodes += 1
+
+            self.__get_index().insert(index=index, point=point)
+
+            self.__publish()
+
+            return index
+
+    def add_stretch(self, index_1: int, index_2: int, length: Optional[float]=None) -> bool:
+        with self.__lock:
+            if index_1 == index_2 or self.has_stretch(index_1, index_2):
+                return False
+
+            if self.__number_of_stretches == len(self.__edges):
+                self.__edges = self.__grow(self.__edges)
+                self.__lengths = self.__grow(self.__lengths)
+
+            if length is None and self.__weighted:
+                length = self.__get_distance(index_1, index_2)
+
+            stretch_index = self.__number_of_stretches
+
+            self.__edges[stretch_index] = index_1, index_2
+            self.__lengths[stretch_index] = nan if length is None else length
+            self.__number_of_stretches += 1
+            self.__number_of_added_stretches += 1
+
+            adjacency = self.__get_adjacency()
+
+            adjacency.setdefault(index_1, {})[index_2] = stretch_index
+            adjacency.setdefault(index_2, {})[index_1] = stretch_index
+
+            self.__publish()
+
+            return True
+
+    def save(self, path: str) -> None:
+        write_map(path=path, data=self.__to_map_data())
 
-            if len(self.__nodes) > 1:
+    def export_geojson(self, path: str, include_nodes: bool=False) -> None:
+        export_geojson(path=path, data=self.__to_map_data(), include_nodes=include_nodes)
+
+    @classmethod
+    def load(cls, path: str, mmap: bool=False, index_type: str=SPATIAL_INDEX_TYPE) -> 'Graph':
+        data = read_map(path=path, mmap=mmap)
+
+        graph = cls(min_distance=data.min_distance, index_type=index_type, weighted=data.weighted)
+
+        graph.__coordinates = data.coordinates
+        graph.__edges = data.edges
+        graph.__lengths = data.lengths
+        graph.__number_of_nodes = len(data.coordinates)
+        graph.__number_of_stretches = len(data.edges)
+        graph.__adjacency = None
+        graph.__index = None
+        graph.__publish()
+
+        return graph
+
+    def check(self, pos_of_node: Optional[Point]) -> None:
+        with self.__lock:
+            if pos_of_node is not None:
+                index_of_nearest = self.__get_index().nearest_within(point=pos_of_node, radius=self.__min_distance)
+
+                if index_of_nearest == -1 and self.__merge_tolerance is not None:
+                    index_of_nearest = self.__get_index_of_snapped(pos_of_node)
+
+                    if index_of_nearest != -1:
+                        self.__number_of_snapped_points += 1
+
+                if self.__is_adaptive:
+                    self.__check_adaptive(point=pos_of_node, index_of_nearest=index_of_nearest)
+                else:
+                    if index_of_nearest == -1:
+                        self.__add_node(pos_of_node)
+                    else:
+                        self.__prev_index = self.__cur_index
+                        self.__cur_index = index_of_nearest
+
+                    if self.__number_of_nodes > 1:
+                        self.__link_prev_and_cur()
+
+                if self.__merge_tolerance is not None:
+                    self.__checks_since_consolidation += 1
+
+                    if self.__checks_since_consolidation >= self.__consolidation_period:
+                        self.consolidate()
+
+    def flush(self) -> None:
+        with self.__lock:
+            if self.__segment is not None:
+                self.__add_node(self.__segment.end)
                 self.__link_prev_and_cur()
 
-    @property
-    def __is_graph_empty(self) -> bool:
-        return self.number_of_nodes == 0
+                self.__segment = None
+
+    def consolidate(self) -> int:
+        with self.__lock:
+            self.__checks_since_consolidation = 0
 
-    def __get_index_of_nearest(self, node: Node) -> int:
-        index = -1
+            if self.__merge_tolerance is None:
+                return 0
 
-        if not self.__is_graph_empty:
-            distance = self.__nodes[0].center - node.center
-            index = 0
+            representatives = {}
+            coordinates = self.coordinates.tolist()
 
-            for cur_index in range(1, len(self.__nodes)):
-                cur_dist = self.__nodes[cur_index].center - node.center
+            for index in range(self.__number_of_consolidated_nodes, self.__number_of_nodes):
+                point = Point(*coordinates[index])
 
-                if cur_dist < distance:
-                    distance = cur_dist
-                    index = cur_index
+                candidates = [
+                    (hypot(point.x - coordinates[other][0], point.y - coordinates[other][1]), other)
+                    for other in self.__get_index().within(point=point, radius=self.__merge_tolerance)
+                    if other < index - self.__merge_window and other not in representatives
+                ]
 
-        return index
+                if candidates:
+                    representatives[index] = min(candidates)[1]
+
+            if representatives:
+                self.__merge_nodes([representatives.get(index, index) for index in range(self.__number_of_nodes)])
+
+            self.__number_of_consolidated_nodes = self.__number_of_nodes
+            self.__number_of_merged_nodes += len(representatives)
+
+            return len(representatives)
+
+    @property
+    def __is_graph_empty(self) -> bool:
+        return self.number_of_nodes == 0
 
-    def __add_node(self, node: Node) -> None:
+    def __add_node(self, point: Point) -> None:
         if self.__is_graph_empty:
             self.__prev_index = 0
         else:
             self.__prev_index = self.__cur_index
 
-        self.__cur_index = len(self.__nodes)
-
-        self.__nodes.append(node)
+        self.__cur_index = self.add_node(point)
 
     def __link_prev_and_cur(self) -> None:
-        new_stretch = RoadStretch(
-            node_1=self.__nodes[self.__cur_index],
-            node_2=self.__nodes[self.__prev_index],
+        if self.__prev_index != -1:
+            self.add_stretch(self.__cur_index, self.__prev_index)
+
+    def __check_adaptive(self, point: Point, index_of_nearest: int) -> None:
+        if index_of_nearest != -1:
+            x, y = self.__coordinates[index_of_nearest].tolist()
+
+            if self.__segment is not None and not self.__extend_segment(Point(x, y)):
+                self.flush()
+
+            self.__segment = None
+            self.__prev_index = self.__cur_index
+            self.__cur_index = index_of_nearest
+            self.__link_prev_and_cur()
+        elif self.__cur_index == -1:
+            self.__add_node(point)
+        elif not self.__extend_segment(point):
+            self.flush()
+
+            if not self.__extend_segment(point):
+                self.__add_node(point)
+                self.__link_prev_and_cur()
+
+    def __extend_segment(self, point: Point) -> bool:
+        start_x, start_y = self.__coordinates[self.__cur_index].tolist()
+
+        dx = point.x - start_x
+        dy = point.y - start_y
+        distance = hypot(dx, dy)
+
+        if distance == 0 or distance > self.__max_node_spacing:
+            return False
+
+        direction = atan2(dy, dx)
+        segment = self.__segment
+
+        if segment is None:
+            last_x, last_y, reference, low, high = start_x, start_y, direction, -pi, pi
+        else:
+            last_x, last_y, reference, low, high = segment.end.x, segment.end.y, segment.reference, segment.low, segment.high
+
+        offset = self.__wrap_angle(direction - reference)
+        heading_change = self.__wrap_angle(atan2(point.y - last_y, point.x - last_x) - direction)
+
+        if not low <= offset <= high or abs(heading_change) > self.__heading_tolerance:
+            return False
+
+        half_width = asin(min(1.0, self.__sampling_tolerance / distance))
+
+        self.__segment = _Segment(
+            end=point,
+            reference=reference,
+            low=max(low, offset - half_width),
+            high=min(high, offset + half_width),
+        )
+
+        return True
+
+    @staticmethod
+    def __wrap_angle(angle: float) -> float:
+        return (angle + pi) % (2 * pi) - pi
+
+    def __get_index_of_snapped(self, point: Point) -> int:
+        window_start = self.__number_of_nodes - self.__merge_window
+        coordinates = self.__coordinates
+        adjacency = self.__get_adjacency()
+
+        best_distance = self.__merge_tolerance
+        best_index = -1
+
+        radius = self.__merge_tolerance + 2 * self.__min_distance
+
+        for index_1 in self.__get_index().within(point=point, radius=radius):
+            if index_1 >= window_start:
+                continue
+
+            x1, y1 = coordinates[index_1].tolist()
+
+            candidates = [(hypot(point.x - x1, point.y - y1), index_1)]
+
+            for index_2 in adjacency.get(index_1, {}):
+                if index_2 < window_start:
+                    x2, y2 = coordinates[index_2].tolist()
+
+                    distance, t = self.__project(point=point, x1=x1, y1=y1, x2=x2, y2=y2)
+
+                    candidates.append((distance, index_1 if t < 0.5 else index_2))
+
+            for distance, index in candidates:
+                if distance <= best_distance and (distance < best_distance or index < best_index or best_index == -1):
+                    best_distance = distance
+                    best_index = index
+
+        return best_index
+
+    def __merge_nodes(self, representatives: List[int]) -> None:
+        representatives = numpy.array(representatives, dtype=numpy.int64)
+        kept = numpy.flatnonzero(representatives == numpy.arange(len(representatives)))
+
+        new_indices = numpy.full(shape=len(representatives), fill_value=-1, dtype=numpy.int64)
+        new_indices[kept] = numpy.arange(len(kept))
+        new_indices = new_indices[representatives]
+
+        edges = new_indices[self.edges]
+        lengths = numpy.array(self.lengths)
+
+        is_not_loop = edges[:, 0] != edges[:, 1]
+        edges = edges[is_not_loop]
+        lengths = lengths[is_not_loop]
+
+        _, first_occurrences = numpy.unique(numpy.sort(edges, axis=1), axis=0, return_index=True)
+        first_occurrences.sort()
+
+        self.__coordinates = numpy.array(self.coordinates[kept])
+        self.__edges = edges[first_occurrences].astype(numpy.int32)
+        self.__lengths = lengths[first_occurrences]
+        self.__number_of_nodes = len(kept)
+        self.__number_of_stretches = len(first_occurrences)
+
+        if self.__cur_index != -1:
+            self.__cur_index = int(new_indices[self.__cur_index])
+        if self.__prev_index != -1:
+            self.__prev_index = int(new_indices[self.__prev_index])
+
+        self.__adjacency = None
+        self.__index = None
+        self.__revision += 1
+
+        self.__publish()
+
+    @staticmethod
+    def __project(point: Point, x1: float, y1: float, x2: float, y2: float) -> Tuple[float, float]:
+        dx = x2 - x1
+        dy = y2 - y1
+        squared_length = dx ** 2 + dy ** 2
+
+        t = 0 if squared_length == 0 else min(1, max(0, ((point.x - x1) * dx + (point.y - y1) * dy) / squared_length))
+
+        return hypot(point.x - x1 - t * dx, point.y - y1 - t * dy), t
+
+    def __publish(self) -> None:
+        self.__state = (
+            self.__revision,
+            self.__coordinates,
+            self.__edges,
+            self.__lengths,
+            self.__number_of_nodes,
+            self.__number_of_stretches,
+        )
+
+    def __get_index(self) -> SpatialIndex:
+        spatial_index = self.__index
+
+        if spatial_index is not None:
+            return spatial_index
+
+        with self.__lock:
+            if self.__index is None:
+                spatial_index = create_spatial_index(index_type=self.__index_type, cell_size=self.__min_distance)
+
+                for index, (x, y) in enumerate(self.coordinates.tolist()):
+                    spatial_index.insert(index=index, point=Point(x, y))
+
+                self.__index = spatial_index
+
+            return self.__index
+
+    def __get_adjacency(self) -> Dict[int, Dict[int, int]]:
+        adjacency = self.__adjacency
+
+        if adjacency is not None:
+            return adjacency
+
+        with self.__lock:
+            if self.__adjacency is None:
+                adjacency = {}
+
+                for stretch_index, (index_1, index_2) in enumerate(self.edges.tolist()):
+                    adjacency.setdefault(index_1, {})[index_2] = stretch_index
+                    adjacency.setdefault(index_2, {})[index_1] = stretch_index
+
+                self.__adjacency = adjacency
+
+            return self.__adjacency
+
+    def __to_map_data(self) -> MapData:
+        return MapData(
+            min_distance=self.__min_distance,
+            weighted=self.__weighted,
+            coordinates=self.coordinates,
+            edges=self.edges,
+            lengths=self.lengths,
         )
 
-        self.__stretches.append(new_stretch)
+    def __get_distance(self, index_1: int, index_2: int) -> float:
+        x1, y1 = self.__coordinates[index_1].tolist()
+        x2, y2 = self.__coordinates[index_2].tolist()
+
+        return hypot(x1 - x2, y1 - y2)
+
+    @staticmethod
+    def __grow(array: numpy.ndarray) -> numpy.ndarray:
+        capacity = max(2 * len(array), Graph.__INITIAL_CAPACITY)
+
+        result = numpy.empty(shape=(capacity,) + array.shape[1:], dtype=array.dtype)
+        result[:len(array)] = array
+
+        return result
+
+    @staticmethod
+    def __read_only(array: numpy.ndarray) -> numpy.ndarray:
+        result = array.view()
+        result.flags.writeable = False
+
+        return result
 
     def __repr__(self) -> str:
-        return f'Nodes: {self.__nodes}'
+        return f'Nodes: {self.nodes}'
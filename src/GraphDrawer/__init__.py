@@ -1,21 +1,26 @@
 import numpy
-import cv2
+from queue import Empty, Full, Queue
+from threading import Event, Thread
+from time import perf_counter
 from dataclasses import dataclass
-from pyglet.window import key
-from typing import Tuple, Optional
+from typing import Tuple, Optional, Union
 
-from src.Graph import Graph, RoadStretch
+from src.Graph import Graph, GraphSnapshot
 from src.Point import Point
 from src.config import *
 
 
-__all__ = ['GraphDrawerSettings', 'GraphDrawer']
+__all__ = ['GraphDrawerSettings', 'GraphDrawer', 'GraphViewer']
 
 
 Image = numpy.ndarray
 
 Color = Tuple[int, int, int]
 
+Bounds = Tuple[float, float, float, float]
+
+DrawableGraph = Union[Graph, GraphSnapshot]
+
 
 @dataclass
 class GraphDrawerSettings:
@@ -31,7 +36,8 @@ class GraphDrawerSettings:
     nodes_color: Color=NODES_COLOR
     roads_color: Color=ROADS_COLOR
     bg_color: Color=BACKGROUND_COLOR
-    key_to_close: str=key.symbol_string(KEY_TO_CLOSE_GRAPH).lower()
+    bounds_slack: float=GRAPH_BOUNDS_SLACK
+    key_to_close: str=KEY_NAME_TO_CLOSE_GRAPH.lower()
 
 
 class GraphDrawer:
@@ -41,10 +47,15 @@ class GraphDrawer:
     __max_x: float
     __min_y: float
     __max_y: float
-    __graph: Graph
     __width: int
     __height: int
     __image: Image=None
+    __graph: Optional[DrawableGraph]=None
+    __drawn_version: Optional[Tuple[int, int]]=None
+    __number_of_drawn_nodes: int=0
+    __number_of_drawn_stretches: int=0
+    __graph_bounds: Optional[Bounds]=None
+    __number_of_bounded_nodes: int=0
 
     def __init__(self, settings: GraphDrawerSettings) -> None:
         self.__settings = settings
@@ -57,19 +68,29 @@ class GraphDrawer:
     def image(self) -> Image:
         return self.__image
 
-    def upload_graph(self, graph: Graph) -> None:
-        self.__graph = graph
+    def upload_graph(self, graph: DrawableGraph) -> None:
+        version = graph.uid, graph.revision
+        is_redraw_needed = self.__image is None or version != self.__drawn_version
 
-        self.__init_image()
+        self.__graph = graph
+        self.__drawn_version = version
 
-        if self.__graph.number_of_nodes != 0:
-            self.__calculate_min_max_x_y()
+        if self.__graph.number_of_nodes == 0:
+            self.__init_image()
+            self.__reset_drawn()
+            self.__graph_bounds = None
+            return
 
-            self.__draw_nodes()
+        bounds = self.__get_bounds(is_redraw_needed)
 
-            self.__draw_roads()
+        if is_redraw_needed or self.__is_scale_invalid(bounds):
+            self.__redraw(bounds)
+        else:
+            self.__draw_new()
 
     def show_graph(self) -> None:
+        import cv2
+
         if self.__image is not None:
             cv2.imshow(winname=' ', mat=self.__image)
 
@@ -82,78 +103,125 @@ class GraphDrawer:
     def __init_image(self) -> None:
         self.__image = numpy.zeros(shape=(self.__height, self.__width), dtype=numpy.uint8)
 
-    def __calculate_min_max_x_y(self) -> None:
-        self.__min_x = self.__settings.min_x
-        self.__max_x = self.__settings.max_x
+    def __reset_drawn(self) -> None:
+        self.__number_of_drawn_nodes = 0
+        self.__number_of_drawn_stretches = 0
+
+    def __get_bounds(self, is_redraw_needed: bool) -> Bounds:
+        min_x, max_x, min_y, max_y = self.__update_graph_bounds(is_redraw_needed)
+
+        return (
+            min_x if self.__settings.min_x is None else self.__settings.min_x,
+            max_x if self.__settings.max_x is None else self.__settings.max_x,
+            min_y if self.__settings.min_y is None else self.__settings.min_y,
+            max_y if self.__settings.max_y is None else self.__settings.max_y,
+        )
+
+    def __update_graph_bounds(self, is_redraw_needed: bool) -> Bounds:
+        coordinates = self.__graph.coordinates
+
+        if is_redraw_needed or self.__graph_bounds is None or len(coordinates) < self.__number_of_bounded_nodes:
+            self.__graph_bounds = None
+            self.__number_of_bounded_nodes = 0
+
+        new_coordinates = coordinates[self.__number_of_bounded_nodes:]
+
+        if len(new_coordinates) != 0:
+            min_x, min_y = new_coordinates.min(axis=0).tolist()
+            max_x, max_y = new_coordinates.max(axis=0).tolist()
 
-        self.__min_y = self.__settings.min_y
-        self.__max_y = self.__settings.max_y
+            if self.__graph_bounds is not None:
+                old_min_x, old_max_x, old_min_y, old_max_y = self.__graph_bounds
 
-        if self.__min_x is None or self.__max_x is None:
-            x_values = [node.center.x for node in self.__graph.nodes]
+                min_x, max_x = min(min_x, old_min_x), max(max_x, old_max_x)
+                min_y, max_y = min(min_y, old_min_y), max(max_y, old_max_y)
 
-            if self.__min_x is None:
-                self.__min_x = min(x_values)
-            if self.__max_x is None:
-                self.__max_x = max(x_values)
+            self.__graph_bounds = min_x, max_x, min_y, max_y
+            self.__number_of_bounded_nodes = len(coordinates)
 
-        if self.__min_y is None or self.__max_y is None:
-            y_values = [node.center.y for node in self.__graph.nodes]
+        return self.__graph_bounds
 
-            if self.__min_y is None:
-                self.__min_y = min(y_values)
-            if self.__max_y is None:
-                self.__max_y = max(y_values)
+    def __is_scale_invalid(self, bounds: Bounds) -> bool:
+        min_x, max_x, min_y, max_y = bounds
 
-    def __draw_nodes(self) -> None:
-        if len(self.__graph.nodes) == 1:
+        return (
+            self.__number_of_drawn_nodes <= 1
+            or self.__graph.number_of_nodes < self.__number_of_drawn_nodes
+            or self.__graph.number_of_stretches < self.__number_of_drawn_stretches
+            or min_x < self.__min_x or max_x > self.__max_x
+            or min_y < self.__min_y or max_y > self.__max_y
+        )
+
+    def __redraw(self, bounds: Bounds) -> None:
+        self.__init_image()
+        self.__reset_drawn()
+
+        self.__calculate_min_max_x_y(bounds)
+
+        if self.__graph.number_of_nodes == 1:
             self.__draw_circle(center=Point(
                 x=self.__width // 2,
                 y=self.__height // 2,
             ))
+
+            self.__number_of_drawn_nodes = 1
         else:
-            for node in self.__graph.nodes:
-                scaled_center = self.__scale_point(point=node.center)
+            self.__draw_new()
 
-                self.__draw_circle(center=scaled_center)
+    def __draw_new(self) -> None:
+        coordinates = self.__graph.coordinates
+        edges = self.__graph.edges
+        new_edges = edges[self.__number_of_drawn_stretches:]
 
-    def __draw_roads(self) -> None:
-        for stretch in self.__graph.stretches:
-            self.__draw_stretch(stretch)
+        self.__draw_nodes(coordinates[self.__number_of_drawn_nodes:])
+        self.__draw_roads(coordinates[new_edges[:, 0]], coordinates[new_edges[:, 1]])
 
-    def __scale_point(self, point: Point) -> Point:
-        scaled_x = self.__scale_x(value=point.x)
-        scaled_y = self.__scale_y(value=point.y)
+        self.__number_of_drawn_nodes = len(coordinates)
+        self.__number_of_drawn_stretches = len(edges)
 
-        return Point(x=scaled_x, y=scaled_y)
+    def __calculate_min_max_x_y(self, bounds: Bounds) -> None:
+        min_x, max_x, min_y, max_y = bounds
 
-    def __scale_x(self, value: float) -> int:
-        if self.__max_x != self.__min_x:
-            return self.__SCALING_CONSTANT + int(self.__scale(
-                value=value,
-                from_low=self.__min_x,
-                from_high=self.__max_x,
-                to_low=0,
-                to_high=self.__width - 2 * self.__SCALING_CONSTANT,
-            ))
+        slack_x = self.__settings.bounds_slack * (max_x - min_x)
+        slack_y = self.__settings.bounds_slack * (max_y - min_y)
+
+        self.__min_x = min_x - slack_x if self.__settings.min_x is None else min_x
+        self.__max_x = max_x + slack_x if self.__settings.max_x is None else max_x
+
+        self.__min_y = min_y - slack_y if self.__settings.min_y is None else min_y
+        self.__max_y = max_y + slack_y if self.__settings.max_y is None else max_y
+
+    def __scale_coordinates(self, coordinates: numpy.ndarray) -> numpy.ndarray:
+        return numpy.column_stack((
+            self.__scale_values(values=coordinates[:, 0], low=self.__min_x, high=self.__max_x, size=self.__width),
+            self.__scale_values(values=coordinates[:, 1], low=self.__min_y, high=self.__max_y, size=self.__height),
+        ))
+
+    def __draw_nodes(self, coordinates: numpy.ndarray) -> None:
+        for x, y in self.__scale_coordinates(coordinates).tolist():
+            self.__draw_circle(center=Point(x=x, y=y))
+
+    def __draw_roads(self, coordinates_1: numpy.ndarray, coordinates_2: numpy.ndarray) -> None:
+        scaled_coordinates_1 = self.__scale_coordinates(coordinates_1).tolist()
+        scaled_coordinates_2 = self.__scale_coordinates(coordinates_2).tolist()
 
-        return self.__width // 2
+        for pt_1, pt_2 in zip(scaled_coordinates_1, scaled_coordinates_2):
+            self.__draw_stretch(pt_1=Point(*pt_1), pt_2=Point(*pt_2))
 
-    def __scale_y(self, value: float) -> int:
-        if self.__min_y != self.__max_y:
-            return self.__SCALING_CONSTANT + int(self.__scale(
-                value=value,
-                from_low=self.__min_y,
-                from_high=self.__max_y,
+    def __scale_values(self, values: numpy.ndarray, low: float, high: float, size: int) -> numpy.ndarray:
+        if low != high:
+            return self.__SCALING_CONSTANT + self.__scale(
+                value=values,
+                from_low=low,
+                from_high=high,
                 to_low=0,
-                to_high=self.__height - 2 * self.__SCALING_CONSTANT,
-            ))
+                to_high=size - 2 * self.__SCALING_CONSTANT,
+            ).astype(numpy.int64)
 
-        return self.__height // 2
+        return numpy.full(shape=len(values), fill_value=size // 2, dtype=numpy.int64)
 
-    def __draw_stretch(self, stretch: RoadStretch) -> None:
-        pt_1 = self.__scale_point(point=stretch.node_1.center)
-        pt_2 = self.__scale_point(point=stretch.node_2.center)
+    def __draw_stretch(self, pt_1: Point, pt_2: Point) -> None:
+        import cv2
 
         cv2.line(
             img=self.__image,
@@ -164,6 +232,8 @@ class GraphDrawer:
         )
 
     def __draw_circle(self, center: Point) -> None:
+        import cv2
+
         cv2.circle(
             img=self.__image,
             center=center.tuple,
@@ -178,3 +248,96 @@ class GraphDrawer:
             return (to_high - to_low) * (value - from_low) / (from_high - from_low) + to_low
         else:
             return None
+
+
+class GraphViewer:
+    __WINDOW_NAME: str='Graph'
+    __settings: GraphDrawerSettings
+    __frame_rate: float
+    __snapshots: Queue
+    __frames: Queue
+    __stopped: Event
+    __thread: Optional[Thread]=None
+    __is_window_shown: bool=False
+
+    def __init__(self, settings: GraphDrawerSettings, frame_rate: float) -> None:
+        self.__settings = settings
+        self.__frame_rate = frame_rate
+        self.__snapshots = Queue(maxsize=1)
+        self.__frames = Queue(maxsize=1)
+        self.__stopped = Event()
+
+    @property
+    def is_running(self) -> bool:
+        return self.__thread is not None and self.__thread.is_alive()
+
+    def start(self) -> None:
+        if not self.is_running:
+            self.__stopped.clear()
+
+            self.__thread = Thread(target=self.__run, name='GraphViewer', daemon=True)
+            self.__thread.start()
+
+    def stop(self) -> None:
+        self.__stopped.set()
+
+        if self.__thread is not None:
+            self.__thread.join()
+            self.__thread = None
+
+        self.__close_window()
+
+    def publish(self, snapshot: GraphSnapshot) -> None:
+        self.__put_latest(self.__snapshots, snapshot)
+
+    def pump(self) -> None:
+        import cv2
+
+        if self.__stopped.is_set():
+            self.__close_window()
+            return
+
+        try:
+            cv2.imshow(winname=self.__WINDOW_NAME, mat=self.__frames.get_nowait())
+            self.__is_window_shown = True
+        except Empty:
+            pass
+
+        if self.__is_window_shown and cv2.waitKey(1) & 0xFF == ord(self.__settings.key_to_close):
+            self.__stopped.set()
+            self.__close_window()
+
+    def __run(self) -> None:
+        drawer = GraphDrawer(self.__settings)
+        frame_duration = 1 / self.__frame_rate
+
+        while not self.__stopped.is_set():
+            start = perf_counter()
+
+            try:
+                drawer.upload_graph(self.__snapshots.get(timeout=frame_duration))
+            except Empty:
+                continue
+
+            self.__put_latest(self.__frames, drawer.image.copy())
+
+            self.__stopped.wait(max(0.0, frame_duration - (perf_counter() - start)))
+
+    def __close_window(self) -> None:
+        import cv2
+
+        if self.__is_window_shown:
+            cv2.destroyWindow(self.__WINDOW_NAME)
+            self.__is_window_shown = False
+
+    @staticmethod
+    def __put_latest(queue: Queue, item) -> None:
+        try:
+            queue.get_nowait()
+        except Empty:
+            pass
+
+        try:
+            queue.put_nowait(item)
+        except Full:
+            pass
@@ -0,0 +1,192 @@
+import numpy
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from src.Graph import Graph
+from src.Point import Point
+from src.Topology import Chain, build_adjacency, build_chains
+
+
+__all__ = ['Road', 'RoadMap', 'simplify_graph', 'douglas_peucker', 'save_graph']
+
+
+@dataclass
+class Road:
+    start: int
+    end: int
+    length: float
+    polyline: numpy.ndarray
+    cumulative_lengths: numpy.ndarray
+
+
+@dataclass
+class RoadMap:
+    vertices: numpy.ndarray
+    degrees: numpy.ndarray
+    roads: List[Road]
+
+    @property
+    def intersections(self) -> numpy.ndarray:
+        return numpy.flatnonzero(self.degrees >= 3)
+
+    @property
+    def dead_ends(self) -> numpy.ndarray:
+        return numpy.flatnonzero(self.degrees == 1)
+
+    @property
+    def total_length(self) -> float:
+        return sum(road.length for road in self.roads)
+
+    def to_graph(self, min_distance: float) -> Graph:
+        graph = Graph(min_distance=min_distance)
+
+        for x, y in self.vertices.tolist():
+            graph.add_node(Point(x, y))
+
+        for road in self.roads:
+            indices = [road.start]
+
+            for x, y in road.polyline[1:-1].tolist():
+                indices.append(graph.add_node(Point(x, y)))
+
+            indices.append(road.end)
+
+            segment_lengths = numpy.diff(road.cumulative_lengths).tolist()
+
+            for index_1, index_2, length in zip(indices[:-1], indices[1:], segment_lengths):
+                graph.add_stretch(index_1, index_2, length=length)
+
+        return graph
+
+
+def simplify_graph(graph: Graph, tolerance: Optional[float]=None) -> RoadMap:
+    coordinates = numpy.array(graph.coordinates)
+    edges = numpy.array(graph.edges, dtype=numpy.int64)
+    lengths = numpy.array(graph.stretch_lengths())
+
+    stored_lengths = numpy.array(graph.lengths)
+    has_stored_length = ~numpy.isnan(stored_lengths)
+    lengths[has_stored_length] = stored_lengths[has_stored_length]
+
+    number_of_nodes = len(coordinates)
+    degrees = numpy.bincount(edges.ravel(), minlength=number_of_nodes)
+
+    adjacency = build_adjacency(edges=edges, number_of_nodes=number_of_nodes)
+    chains, _ = build_chains(adjacency=adjacency, edges=edges)
+
+    vertex_of_node: Dict[int, int] = {}
+    roads: List[Tuple[int, int, List[int], List[float]]] = []
+
+    def get_vertex(node: int) -> int:
+        return vertex_of_node.setdefault(node, len(vertex_of_node))
+
+    def add_road(chain: Chain) -> None:
+        start = get_vertex(chain.start)
+        end = get_vertex(chain.end)
+
+        roads.append((start, end, chain.nodes, [lengths[stretch] for stretch in chain.stretches]))
+
+    chain_index = 0
+
+    for node in numpy.flatnonzero(degrees != 2).tolist():
+        get_vertex(node)
+
+        while chain_index < len(chains) and chains[chain_index].start == node:
+            add_road(chains[chain_index])
+            chain_index += 1
+
+    for chain in chains[chain_index:]:
+        add_road(chain)
+
+    vertices = numpy.empty(shape=(len(vertex_of_node), 2), dtype=numpy.float64)
+    vertex_degrees = numpy.empty(shape=len(vertex_of_node), dtype=numpy.int64)
+
+    for node, vertex in vertex_of_node.items():
+        vertices[vertex] = coordinates[node]
+        vertex_degrees[vertex] = degrees[node]
+
+    result = []
+
+    used_pairs = {(min(start, end), max(start, end)) for start, end, chain, _ in roads if len(chain) == 2}
+
+    for start, end, chain, chain_lengths in roads:
+        polyline = coordinates[chain]
+        cumulative_lengths = numpy.concatenate(([0], numpy.cumsum(chain_lengths)))
+
+        if tolerance is not None and len(chain) > 2:
+            pair = (min(start, end), max(start, end))
+
+            if start == end:
+                min_points = 4
+            elif pair in used_pairs:
+                min_points = 3
+            else:
+                min_points = 2
+
+            used_pairs.add(pair)
+
+            kept = douglas_peucker(polyline=polyline, tolerance=tolerance, min_points=min_points)
+
+            polyline = polyline[kept]
+            cumulative_lengths = cumulative_lengths[kept]
+
+        result.append(Road(
+            start=start,
+            end=end,
+            length=float(cumulative_lengths[-1]),
+            polyline=polyline,
+            cumulative_lengths=cumulative_lengths,
+        ))
+
+    return RoadMap(vertices=vertices, degrees=vertex_degrees, roads=result)
+
+
+def save_graph(graph: Graph, path: str, simplify: bool, tolerance: float, min_distance: float) -> None:
+    graph.flush()
+
+    if simplify:
+        graph = simplify_graph(graph=graph, tolerance=tolerance).to_graph(min_distance=min_distance)
+
+    graph.save(path)
+
+
+def douglas_peucker(polyline: numpy.ndarray, tolerance: float, min_points: int=2) -> numpy.ndarray:
+    is_kept = numpy.zeros(shape=len(polyline), dtype=bool)
+    is_kept[0] = is_kept[-1] = True
+
+    number_of_kept = 2
+
+    segments = [(0, len(polyline) - 1)]
+
+    while segments:
+        first, last = segments.pop()
+
+        if last - first < 2:
+            continue
+
+        distances = _distances_to_segment(points=polyline[first + 1:last], start=polyline[first], end=polyline[last])
+        farthest = int(numpy.argmax(distances))
+
+        if distances[farthest] > tolerance or number_of_kept < min_points:
+            middle = first + 1 + farthest
+            is_kept[middle] = True
+            number_of_kept += 1
+
+            segments.append((first, middle))
+            segments.append((middle, last))
+
+    return numpy.flatnonzero(is_kept)
+
+
+def _distances_to_segment(points: numpy.ndarray, start: numpy.ndarray, end: numpy.ndarray) -> numpy.ndarray:
+    direction = end - start
+    squared_length = numpy.dot(direction, direction)
+
+    if squared_length == 0:
+        return numpy.hypot(points[:, 0] - start[0], points[:, 1] - start[1])
+
+    t = numpy.clip((points - start) @ direction / squared_length, 0, 1)
+    projections = start + t[:, None] * direction
+
+    return numpy.hypot(points[:, 0] - projections[:, 0], points[:, 1] - projections[:, 1])
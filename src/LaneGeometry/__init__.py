@@ -0,0 +1,259 @@
+import numpy
+from functools import lru_cache
+from math import acos, cos, degrees, floor, pi, sin
+from random import Random
+from time import perf_counter
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from gym_duckietown.simulator import LanePosition, NotInLane
+from gym_duckietown.envs.duckietown_env import DuckietownEnv
+
+from src.config import LANE_POSE_CACHE_SIZE, LANE_POSE_POSITION_QUANTUM, LANE_POSE_ANGLE_QUANTUM
+
+
+__all__ = ['LaneAgreement', 'LaneGeometry', 'check_agreement']
+
+
+# the simulator looks for the closest point of a curve by bisection of this depth, so every point it looks at
+# lies on the grid of 2 ** (BISECTION_DEPTH + 1) + 1 points of the curve
+BISECTION_DEPTH = 8
+
+NUMBER_OF_SAMPLES = 2 ** (BISECTION_DEPTH + 1) + 1
+
+# precision of control points (relative to the tile) when equal curves of different tiles are merged
+CURVE_KEY_PRECISION = 9
+
+Tile = Tuple[int, int]
+
+
+@dataclass
+class _CurveSamples:
+    points: List[float]
+    tangents: List[float]
+
+
+@dataclass
+class _TileLanes:
+    origin: Tuple[float, float, float]
+    headings: List[Tuple[float, float]]
+    curves: List[_CurveSamples]
+
+
+@dataclass
+class LaneAgreement:
+    number_of_poses: int
+    number_of_mismatches: int
+    max_dist_error: float
+    max_angle_error: float
+    geometry_microseconds: float
+    simulator_microseconds: float
+
+    def __repr__(self) -> str:
+        return (f'Poses: {self.number_of_poses}, mismatches: {self.number_of_mismatches}, '
+                f'max dist error: {self.max_dist_error:.2e}, max angle error: {self.max_angle_error:.2e} rad, '
+                f'geometry: {self.geometry_microseconds:.1f} us, simulator: {self.simulator_microseconds:.1f} us')
+
+
+class LaneGeometry:
+    __tile_size: float
+    __tiles: Dict[Tile, _TileLanes]
+    __position_quantum: float
+    __angle_quantum: float
+
+    def __init__(self, environment: DuckietownEnv, cache_size: int=LANE_POSE_CACHE_SIZE,
+                 position_quantum: float=LANE_POSE_POSITION_QUANTUM, angle_quantum: float=LANE_POSE_ANGLE_QUANTUM) -> None:
+        self.__tile_size = environment.road_tile_size
+        self.__tiles = {}
+        self.__position_quantum = position_quantum
+        self.__angle_quantum = angle_quantum
+
+        samples: Dict[bytes, _CurveSamples] = {}
+
+        for tile in environment.drivable_tiles:
+            i, j = tile['coords']
+            origin = numpy.array([i * self.__tile_size, 0, j * self.__tile_size])
+            curves = numpy.array(tile['curves'], dtype=numpy.float64) - origin
+
+            headings = curves[:, -1, :] - curves[:, 0, :]
+
+            tile_curves = []
+
+            for control_points in curves:
+                key = numpy.round(control_points, CURVE_KEY_PRECISION).tobytes()
+
+                if key not in samples:
+                    samples[key] = self.__sample_curve(control_points)
+
+                tile_curves.append(samples[key])
+
+            self.__tiles[(i, j)] = _TileLanes(
+                origin=tuple(origin.tolist()),
+                headings=[(x, z) for x, _, z in headings.tolist()],
+                curves=tile_curves,
+            )
+
+        self.__number_of_unique_curves = len(samples)
+
+        if cache_size > 0:
+            self.__get_quantized = lru_cache(maxsize=cache_size)(self.__get_quantized_lane_pos)
+        else:
+            self.__get_quantized = None
+
+    @property
+    def number_of_tiles(self) -> int:
+        return len(self.__tiles)
+
+    @property
+    def number_of_unique_curves(self) -> int:
+        return self.__number_of_unique_curves
+
+    def get_lane_pos(self, cur_pos: numpy.ndarray, cur_angle: float,
+                     curve_index: Optional[int]=None) -> Optional[LanePosition]:
+        x, y, z = cur_pos.tolist()
+
+        if self.__get_quantized is None:
+            return self.__get_lane_pos(x, y, z, cur_angle, curve_index)
+
+        return self.__get_quantized(
+            round(x / self.__position_quantum),
+            round(y / self.__position_quantum),
+            round(z / self.__position_quantum),
+            round(cur_angle / self.__angle_quantum),
+            curve_index,
+        )
+
+    def __get_quantized_lane_pos(self, x: int, y: int, z: int, angle: int,
+                                 curve_index: Optional[int]) -> Optional[LanePosition]:
+        return self.__get_lane_pos(
+            x * self.__position_quantum,
+            y * self.__position_quantum,
+            z * self.__position_quantum,
+            angle * self.__angle_quantum,
+            curve_index,
+        )
+
+    def __get_lane_pos(self, x: float, y: float, z: float, angle: float,
+                       curve_index: Optional[int]) -> Optional[LanePosition]:
+        lanes = self.__tiles.get((floor(x / self.__tile_size), floor(z / self.__tile_size)))
+
+        if lanes is None:
+            return None
+
+        dir_x = cos(angle)
+        dir_z = -sin(angle)
+
+        if curve_index is None:
+            curve_index = 0
+            best_dot = -numpy.inf
+
+            for index, (heading_x, heading_z) in enumerate(lanes.headings):
+                dot = heading_x * dir_x + heading_z * dir_z
+
+                if dot > best_dot:
+                    curve_index = index
+                    best_dot = dot
+
+        curve = lanes.curves[curve_index]
+        points = curve.points
+
+        origin_x, origin_y, origin_z = lanes.origin
+        x -= origin_x
+        y -= origin_y
+        z -= origin_z
+
+        low = 0
+        high = NUMBER_OF_SAMPLES - 1
+
+        for _ in range(BISECTION_DEPTH):
+            middle = (low + high) // 2
+
+            low_x, low_y, low_z = points[3 * low], points[3 * low + 1], points[3 * low + 2]
+            high_x, high_y, high_z = points[3 * high], points[3 * high + 1], points[3 * high + 2]
+
+            distance_to_low = (low_x - x) ** 2 + (low_y - y) ** 2 + (low_z - z) ** 2
+            distance_to_high = (high_x - x) ** 2 + (high_y - y) ** 2 + (high_z - z) ** 2
+
+            if distance_to_low < distance_to_high:
+                high = middle
+            else:
+                low = middle
+
+        index = 3 * ((low + high) // 2)
+
+        point_x, point_z = points[index], points[index + 2]
+        tangent_x, tangent_y, tangent_z = curve.tangents[index:index + 3]
+
+        dot_dir = max(-1, min(1, dir_x * tangent_x + dir_z * tangent_z))
+        signed_dist = (point_x - x) * tangent_z - (point_z - z) * tangent_x
+
+        angle_rad = acos(dot_dir)
+
+        if dir_z * tangent_x - dir_x * tangent_z < 0:
+            angle_rad *= -1
+
+        return LanePosition(dist=signed_dist, dot_dir=dot_dir, angle_deg=degrees(angle_rad), angle_rad=angle_rad)
+
+    @staticmethod
+    def __sample_curve(control_points: numpy.ndarray) -> _CurveSamples:
+        t = numpy.linspace(0, 1, NUMBER_OF_SAMPLES)[:, numpy.newaxis]
+        p0, p1, p2, p3 = control_points
+
+        points = ((1 - t) ** 3) * p0 + 3 * t * ((1 - t) ** 2) * p1 + 3 * (t ** 2) * (1 - t) * p2 + (t ** 3) * p3
+
+        tangents = 3 * ((1 - t) ** 2) * (p1 - p0) + 6 * (1 - t) * t * (p2 - p1) + 3 * (t ** 2) * (p3 - p2)
+        tangents /= numpy.linalg.norm(tangents, axis=1, keepdims=True)
+
+        return _CurveSamples(points=points.ravel().tolist(), tangents=tangents.ravel().tolist())
+
+
+def check_agreement(geometry: LaneGeometry, environment: DuckietownEnv, number_of_poses: int,
+                    seed: int=0) -> LaneAgreement:
+    random = Random(seed)
+    tile_size = environment.road_tile_size
+
+    poses = []
+
+    for _ in range(number_of_poses):
+        i, j = random.choice(environment.drivable_tiles)['coords']
+
+        cur_pos = numpy.array([(i + random.random()) * tile_size, 0, (j + random.random()) * tile_size])
+
+        poses.append((cur_pos, random.uniform(-pi, pi)))
+
+    start = perf_counter()
+    geometry_poses = [geometry.get_lane_pos(cur_pos, cur_angle) for cur_pos, cur_angle in poses]
+    geometry_seconds = perf_counter() - start
+
+    simulator_poses = []
+
+    start = perf_counter()
+
+    for cur_pos, cur_angle in poses:
+        try:
+            simulator_poses.append(environment.get_lane_pos2(cur_pos, cur_angle))
+        except NotInLane:
+            simulator_poses.append(None)
+
+    simulator_seconds = perf_counter() - start
+
+    number_of_mismatches = 0
+    max_dist_error = 0.0
+    max_angle_error = 0.0
+
+    for geometry_pose, simulator_pose in zip(geometry_poses, simulator_poses):
+        if (geometry_pose is None) != (simulator_pose is None):
+            number_of_mismatches += 1
+        elif geometry_pose is not None:
+            max_dist_error = max(max_dist_error, abs(geometry_pose.dist - simulator_pose.dist))
+            max_angle_error = max(max_angle_error, abs(geometry_pose.angle_rad - simulator_pose.angle_rad))
+
+    return LaneAgreement(
+        number_of_poses=number_of_poses,
+        number_of_mismatches=number_of_mismatches,
+        max_dist_error=max_dist_error,
+        max_angle_error=max_angle_error,
+        geometry_microseconds=geometry_seconds / number_of_poses * 1e6,
+        simulator_microseconds=simulator_seconds / number_of_poses * 1e6,
+    )
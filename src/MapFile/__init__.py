@@ -0,0 +1,128 @@
+import json
+import struct
+import numpy
+
+from dataclasses import dataclass
+from typing import Any, Dict
+
+
+__all__ = ['MAP_FILE_VERSION', 'MapData', 'write_map', 'read_map', 'map_to_geojson', 'export_geojson']
+
+
+MAP_FILE_MAGIC = b'WAIMAP\0\0'
+
+MAP_FILE_VERSION = 1
+
+# magic, version, flags, number of nodes, number of stretches, min distance
+HEADER_FORMAT = '<8sIIQQd'
+
+HEADER_SIZE = 64
+
+WEIGHTED_FLAG = 1
+
+COORDINATES_DTYPE = numpy.dtype('<f8')
+
+EDGES_DTYPE = numpy.dtype('<i4')
+
+LENGTHS_DTYPE = numpy.dtype('<f8')
+
+
+@dataclass
+class MapData:
+    min_distance: float
+    weighted: bool
+    coordinates: numpy.ndarray
+    edges: numpy.ndarray
+    lengths: numpy.ndarray
+
+
+def write_map(path: str, data: MapData) -> None:
+    number_of_nodes = len(data.coordinates)
+    number_of_stretches = len(data.edges)
+
+    header = struct.pack(
+        HEADER_FORMAT,
+        MAP_FILE_MAGIC,
+        MAP_FILE_VERSION,
+        WEIGHTED_FLAG if data.weighted else 0,
+        number_of_nodes,
+        number_of_stretches,
+        data.min_distance,
+    )
+
+    with open(path, 'wb') as file:
+        file.write(header.ljust(HEADER_SIZE, b'\0'))
+        file.write(numpy.ascontiguousarray(data.coordinates, dtype=COORDINATES_DTYPE).tobytes())
+        file.write(numpy.ascontiguousarray(data.edges, dtype=EDGES_DTYPE).tobytes())
+        file.write(numpy.ascontiguousarray(data.lengths, dtype=LENGTHS_DTYPE).tobytes())
+
+
+def read_map(path: str, mmap: bool=False) -> MapData:
+    with open(path, 'rb') as file:
+        header = file.read(HEADER_SIZE)
+
+    if len(header) != HEADER_SIZE:
+        raise ValueError(f'{path} is not a map file: header is too short')
+
+    magic, version, flags, number_of_nodes, number_of_stretches, min_distance = struct.unpack_from(HEADER_FORMAT, header)
+
+    if magic != MAP_FILE_MAGIC:
+        raise ValueError(f'{path} is not a map file')
+    if version != MAP_FILE_VERSION:
+        raise ValueError(f'Unsupported version of map file {path}: {version}')
+
+    coordinates_offset = HEADER_SIZE
+    edges_offset = coordinates_offset + number_of_nodes * 2 * COORDINATES_DTYPE.itemsize
+    lengths_offset = edges_offset + number_of_stretches * 2 * EDGES_DTYPE.itemsize
+
+    return MapData(
+        min_distance=min_distance,
+        weighted=bool(flags & WEIGHTED_FLAG),
+        coordinates=_read_array(path, COORDINATES_DTYPE, (number_of_nodes, 2), coordinates_offset, mmap),
+        edges=_read_array(path, EDGES_DTYPE, (number_of_stretches, 2), edges_offset, mmap),
+        lengths=_read_array(path, LENGTHS_DTYPE, (number_of_stretches,), lengths_offset, mmap),
+    )
+
+
+def map_to_geojson(data: MapData, include_nodes: bool=False) -> Dict[str, Any]:
+    coordinates = data.coordinates.tolist()
+    lengths = data.lengths.tolist()
+
+    features = [
+        {
+            'type': 'Feature',
+            'geometry': {'type': 'LineString', 'coordinates': [coordinates[index_1], coordinates[index_2]]},
+            'properties': {'nodes': [index_1, index_2], 'length': None if numpy.isnan(length) else length},
+        }
+        for (index_1, index_2), length in zip(data.edges.tolist(), lengths)
+    ]
+
+    if include_nodes:
+        features.extend(
+            {
+                'type': 'Feature',
+                'geometry': {'type': 'Point', 'coordinates': point},
+                'properties': {'index': index},
+            }
+            for index, point in enumerate(coordinates)
+        )
+
+    return {'type': 'FeatureCollection', 'features': features}
+
+
+def export_geojson(path: str, data: MapData, include_nodes: bool=False) -> None:
+    with open(path, 'w') as file:
+        json.dump(map_to_geojson(data=data, include_nodes=include_nodes), file)
+
+
+def _read_array(path: str, dtype: numpy.dtype, shape: tuple, offset: int, mmap: bool) -> numpy.ndarray:
+    if shape[0] == 0:
+        return numpy.empty(shape=shape, dtype=dtype)
+
+    if mmap:
+        return numpy.memmap(path, dtype=dtype, mode='r', offset=offset, shape=shape)
+
+    with open(path, 'rb') as file:
+        file.seek(offset)
+
+        return numpy.fromfile(file, dtype=dtype, count=int(numpy.prod(shape))).reshape(shape)
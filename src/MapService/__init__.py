@@ -0,0 +1,669 @@
+import json
+import asyncio
+import numpy
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import suppress
+from http import HTTPStatus
+from math import inf, isfinite, nan
+from threading import Lock
+from time import perf_counter
+from traceback import print_exc
+from urllib.parse import parse_qs, urlsplit
+
+from dataclasses import asdict, dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from src.config import MAP_SERVICE_QUEUE_SIZE, MAP_SERVICE_MAX_BATCH_POSES, MAP_SERVICE_QUERY_WORKERS, \
+    MAP_SERVICE_MAX_REQUEST_SIZE, MAP_SERVICE_ROUTE_REBUILD_INTERVAL, MAP_SERVICE_NEAREST_CELL_SIZE
+from src.Graph import Graph, GraphCursor, GraphSnapshot
+from src.GraphDrawer import GraphDrawer, GraphDrawerSettings
+from src.Point import Point
+from src.Routing import RouteEngine
+from src.SpatialIndex import GridIndex
+from src.Trajectory import TRAJECTORY_DTYPE
+from src.ClosestPointsCalculator import ClosestPointsCalculator
+
+
+__all__ = ['PoseBatch', 'ServiceStatistics', 'MapService', 'MapServer', 'serve']
+
+
+DEFAULT_AGENT = 'default'
+
+
+@dataclass
+class PoseBatch:
+    agent: str
+    positions: numpy.ndarray
+    abs_angles: numpy.ndarray
+    angles_to_road: numpy.ndarray
+    distances: numpy.ndarray
+    episodes: numpy.ndarray
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    @classmethod
+    def from_records(cls, agent: str, records: numpy.ndarray) -> 'PoseBatch':
+        return cls(
+            agent=agent,
+            positions=numpy.column_stack((records['x'], records['z'])),
+            abs_angles=numpy.array(records['angle']),
+            angles_to_road=numpy.array(records['lane_angle']),
+            distances=numpy.array(records['lane_dist']),
+            episodes=numpy.array(records['episode']),
+        )
+
+    @classmethod
+    def from_json(cls, data: Dict[str, Any]) -> 'PoseBatch':
+        positions = numpy.array(data['positions'], dtype=numpy.float64).reshape(-1, 2)
+        episodes = data.get('episodes')
+
+        batch = cls(
+            agent=str(data.get('agent', DEFAULT_AGENT)),
+            positions=positions,
+            abs_angles=numpy.array(data['angles'], dtype=numpy.float64).reshape(-1),
+            angles_to_road=numpy.array(data['angles_to_road'], dtype=numpy.float64).reshape(-1),
+            distances=numpy.array(data['distances'], dtype=numpy.float64).reshape(-1),
+            episodes=numpy.zeros(shape=len(positions), dtype=numpy.int32) if episodes is None else
+            numpy.array(episodes, dtype=numpy.int32).reshape(-1),
+        )
+
+        lengths = {len(batch.abs_angles), len(batch.angles_to_road), len(batch.distances), len(batch.episodes)}
+
+        if lengths != {len(positions)}:
+            raise ValueError('All pose arrays must have the same length')
+
+        return batch
+
+
+@dataclass
+class ServiceStatistics:
+    agents: int
+    batches: int
+    poses: int
+    points: int
+    queued_batches: int
+    ingest_seconds: float
+    revision: int
+    number_of_nodes: int
+    number_of_stretches: int
+
+
+@dataclass
+class _AgentState:
+    last_position: numpy.ndarray
+    last_episode: int
+    cursor: Optional[GraphCursor]=None
+
+
+class MapService:
+    __graph: Graph
+    __calculator: ClosestPointsCalculator
+    __queue_size: int
+    __max_batch_poses: int
+    __queue: Optional[asyncio.Queue]=None
+    __worker: Optional[asyncio.Task]=None
+    __ingest_executor: ThreadPoolExecutor
+    __query_executor: ThreadPoolExecutor
+    __routing_executor: ThreadPoolExecutor
+    __agents: Dict[str, _AgentState]
+    __drawer: GraphDrawer
+    __drawer_lock: Lock
+    __png: Optional[bytes]=None
+    __png_version: Optional[Tuple[int, int, int, int]]=None
+    __nearest_cell_size: float
+    __nearest_lock: Lock
+    __nearest_index: Optional[GridIndex]=None
+    __nearest_version: Optional[Tuple[int, int]]=None
+    __number_of_nearest_nodes: int=0
+    __route_rebuild_interval: float
+    __route_engine_lock: Lock
+    __route_engine: Optional[RouteEngine]=None
+    __route_engine_version: Optional[Tuple[int, int, int]]=None
+    __route_engine_time: float=-inf
+    __route_engine_future: Optional[Future]=None
+    __number_of_route_engine_builds: int=0
+    __batches: int=0
+    __poses: int=0
+    __points: int=0
+    __ingest_seconds: float=0
+
+    def __init__(self, graph: Graph, calculator: ClosestPointsCalculator, queue_size: int=MAP_SERVICE_QUEUE_SIZE,
+                 max_batch_poses: int=MAP_SERVICE_MAX_BATCH_POSES, query_workers: int=MAP_SERVICE_QUERY_WORKERS,
+                 drawer_settings: Optional[GraphDrawerSettings]=None,
+                 route_rebuild_interval: float=MAP_SERVICE_ROUTE_REBUILD_INTERVAL,
+                 nearest_cell_size: float=MAP_SERVICE_NEAREST_CELL_SIZE) -> None:
+        self.__graph = graph
+        self.__calculator = calculator
+        self.__queue_size = queue_size
+        self.__max_batch_poses = max_batch_poses
+        self.__route_rebuild_interval = route_rebuild_interval
+        self.__nearest_cell_size = nearest_cell_size
+        self.__route_engine_lock = Lock()
+        self.__ingest_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='MapServiceIngest')
+        self.__query_executor = ThreadPoolExecutor(max_workers=query_workers, thread_name_prefix='MapServiceQuery')
+        self.__routing_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='MapServiceRouting')
+        self.__agents = {}
+        self.__drawer = GraphDrawer(GraphDrawerSettings() if drawer_settings is None else drawer_settings)
+        self.__drawer_lock = Lock()
+        self.__nearest_lock = Lock()
+
+    @property
+    def graph(self) -> Graph:
+        return self.__graph
+
+    @property
+    def number_of_route_engine_builds(self) -> int:
+        return self.__number_of_route_engine_builds
+
+    @property
+    def is_running(self) -> bool:
+        return self.__worker is not None and not self.__worker.done()
+
+    async def start(self) -> None:
+        if not self.is_running:
+            self.__queue = asyncio.Queue(maxsize=self.__queue_size)
+            self.__worker = asyncio.create_task(self.__run())
+
+    async def stop(self) -> None:
+        if self.__worker is not None:
+            await self.flush()
+
+            self.__worker.cancel()
+
+            with suppress(asyncio.CancelledError):
+                await self.__worker
+
+            self.__worker = None
+
+        self.__ingest_executor.shutdown()
+        self.__query_executor.shutdown()
+        self.__routing_executor.shutdown()
+
+    async def submit(self, batch: PoseBatch) -> None:
+        if len(batch) != 0:
+            await self.__queue.put(batch)
+
+    async def flush(self) -> None:
+        await self.__queue.join()
+
+        await asyncio.get_running_loop().run_in_executor(self.__ingest_executor, self.__flush_segments)
+
+    async def statistics(self) -> ServiceStatistics:
+        snapshot = self.__graph.snapshot()
+
+        return ServiceStatistics(
+            agents=len(self.__agents),
+            batches=self.__batches,
+            poses=self.__poses,
+            points=self.__points,
+            queued_batches=0 if self.__queue is None else self.__queue.qsize(),
+            ingest_seconds=self.__ingest_seconds,
+            revision=snapshot.revision,
+            number_of_nodes=snapshot.number_of_nodes,
+            number_of_stretches=snapshot.number_of_stretches,
+        )
+
+    async def snapshot(self) -> GraphSnapshot:
+        return self.__graph.snapshot()
+
+    async def nearest(self, point: Point, k: int=1) -> Tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray]:
+        return await self.__query(self.__get_nearest, point, k)
+
+    async def route(self, start: Point, finish: Point) -> Optional[Tuple[List[int], float]]:
+        return await self.__query(self.__get_route, start, finish)
+
+    async def render_png(self) -> bytes:
+        return await self.__query(self.__render_png, self.__graph.snapshot())
+
+    async def __query(self, function: Callable, *args) -> Any:
+        return await asyncio.get_running_loop().run_in_executor(self.__query_executor, function, *args)
+
+    async def __run(self) -> None:
+        loop = asyncio.get_running_loop()
+
+        while True:
+            batches = [await self.__queue.get()]
+            number_of_poses = len(batches[0])
+
+            while number_of_poses < self.__max_batch_poses and not self.__queue.empty():
+                batches.append(self.__queue.get_nowait())
+                number_of_poses += len(batches[-1])
+
+            try:
+                await loop.run_in_executor(self.__ingest_executor, self.__ingest, batches)
+            except Exception:
+                print_exc()
+            finally:
+                for _ in batches:
+                    self.__queue.task_done()
+
+    def __ingest(self, batches: List[PoseBatch]) -> None:
+        start = perf_counter()
+
+        prev_positions = numpy.concatenate([self.__get_prev_positions(batch) for batch in batches])
+
+        points, is_valid = self.__calculator.get_closest_points(
+            positions=numpy.concatenate([batch.positions for batch in batches]),
+            abs_angles=numpy.concatenate([batch.abs_angles for batch in batches]),
+            angles_to_road=numpy.concatenate([batch.angles_to_road for batch in batches]),
+            distances=numpy.concatenate([batch.distances for batch in batches]),
+            prev_positions=prev_positions,
+        )
+
+        offset = 0
+
+        for batch in batches:
+            agent = self.__agents[batch.agent]
+            part = slice(offset, offset + len(batch))
+
+            self.__graph.set_cursor(agent.cursor)
+
+            for x, y in points[part][is_valid[part]].tolist():
+                self.__graph.check(Point(x, y))
+
+            agent.cursor = self.__graph.get_cursor()
+            offset += len(batch)
+
+        self.__batches += len(batches)
+        self.__poses += offset
+        self.__points += int(numpy.count_nonzero(is_valid))
+        self.__ingest_seconds += perf_counter() - start
+
+    def __flush_segments(self) -> None:
+        for agent in self.__agents.values():
+            self.__graph.set_cursor(agent.cursor)
+            self.__graph.flush()
+
+            agent.cursor = self.__graph.get_cursor()
+
+    def __get_prev_positions(self, batch: PoseBatch) -> numpy.ndarray:
+        agent = self.__agents.get(batch.agent)
+
+        prev_positions = numpy.empty_like(batch.positions)
+        prev_positions[0] = agent.last_position if agent is not None and agent.last_episode == batch.episodes[0] else nan
+        prev_positions[1:] = batch.positions[:-1]
+        prev_positions[1:][batch.episodes[1:] != batch.episodes[:-1]] = nan
+
+        if agent is None:
+            self.__agents[batch.agent] = _AgentState(last_position=batch.positions[-1], last_episode=int(batch.episodes[-1]))
+        else:
+            agent.last_position = batch.positions[-1]
+            agent.last_episode = int(batch.episodes[-1])
+
+        return prev_positions
+
+    def __get_nearest(self, point: Point, k: int) -> Tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray]:
+        with self.__nearest_lock:
+            snapshot = self.__graph.snapshot()
+
+            indices = numpy.array(self.__get_nearest_index(snapshot).nearest(point=point, k=k), dtype=numpy.int64)
+
+        coordinates = snapshot.coordinates[indices]
+        distances = numpy.hypot(coordinates[:, 0] - point.x, coordinates[:, 1] - point.y)
+
+        return indices, coordinates, distances
+
+    # nodes are only appended while the revision stays the same, so the index is extended with the new nodes and
+    # rebuilt only after the graph is consolidated
+    def __get_nearest_index(self, snapshot: GraphSnapshot) -> GridIndex:
+        version = snapshot.uid, snapshot.revision
+
+        if self.__nearest_index is None or self.__nearest_version != version:
+            self.__nearest_index = GridIndex(cell_size=self.__nearest_cell_size)
+            self.__nearest_version = version
+            self.__number_of_nearest_nodes = 0
+
+        for index, (x, y) in enumerate(snapshot.coordinates[self.__number_of_nearest_nodes:].tolist(),
+                                       start=self.__number_of_nearest_nodes):
+            self.__nearest_index.insert(index=index, point=Point(x, y))
+
+        self.__number_of_nearest_nodes = snapshot.number_of_nodes
+
+        return self.__nearest_index
+
+    def __get_route(self, start: Point, finish: Point) -> Optional[Tuple[List[int], float]]:
+        route = self.__get_route_engine().route(start=start, finish=finish)
+
+        return None if route is None else (route.nodes, route.length)
+
+    def __get_route_engine(self) -> RouteEngine:
+        snapshot = self.__graph.snapshot()
+
+        with self.__route_engine_lock:
+            route_engine = self.__route_engine
+
+            is_stale = route_engine is None or self.__route_engine_version != self.__get_version(snapshot)
+            is_due = perf_counter() - self.__route_engine_time >= self.__route_rebuild_interval
+
+            if is_stale and is_due and self.__route_engine_future is None:
+                self.__route_engine_future = self.__routing_executor.submit(self.__build_route_engine, snapshot)
+
+            future = self.__route_engine_future
+
+        if route_engine is None:
+            return future.result()
+
+        return route_engine
+
+    def __build_route_engine(self, snapshot: GraphSnapshot) -> RouteEngine:
+        try:
+            route_engine = RouteEngine(coordinates=snapshot.coordinates, edges=snapshot.edges, lengths=snapshot.lengths)
+        except Exception:
+            with self.__route_engine_lock:
+                self.__route_engine_future = None
+
+            raise
+
+        with self.__route_engine_lock:
+            self.__route_engine = route_engine
+            self.__route_engine_version = self.__get_version(snapshot)
+            self.__route_engine_time = perf_counter()
+            self.__route_engine_future = None
+            self.__number_of_route_engine_builds += 1
+
+        return route_engine
+
+    @staticmethod
+    def __get_version(snapshot: GraphSnapshot) -> Tuple[int, int, int]:
+        return snapshot.revision, snapshot.number_of_nodes, snapshot.number_of_stretches
+
+    def __render_png(self, snapshot: GraphSnapshot) -> bytes:
+        import cv2
+
+        version = snapshot.uid, snapshot.revision, snapshot.number_of_nodes, snapshot.number_of_stretches
+
+        with self.__drawer_lock:
+            if self.__png is None or self.__png_version != version:
+                self.__drawer.upload_graph(snapshot)
+
+                self.__png = cv2.imencode('.png', self.__drawer.image)[1].tobytes()
+                self.__png_version = version
+
+            return self.__png
+
+
+@dataclass
+class _Request:
+    method: str
+    path: str
+    query: Dict[str, List[str]]
+    headers: Dict[str, str]
+    body: bytes
+
+
+class _HttpError(Exception):
+    status: int
+
+    def __init__(self, status: int, message: str) -> None:
+        super().__init__(message)
+
+        self.status = status
+
+
+_Response = Tuple[int, str, bytes]
+
+_Handler = Callable[[_Request], Awaitable[_Response]]
+
+
+class MapServer:
+    __service: MapService
+    __host: str
+    __port: int
+    __socket_path: Optional[str]
+    __max_request_size: int
+    __server: Optional[asyncio.AbstractServer]=None
+    __routes: Dict[Tuple[str, str], _Handler]
+
+    def __init__(self, service: MapService, host: str, port: int, socket_path: Optional[str]=None,
+                 max_request_size: int=MAP_SERVICE_MAX_REQUEST_SIZE) -> None:
+        self.__service = service
+        self.__host = host
+        self.__port = port
+        self.__socket_path = socket_path
+        self.__max_request_size = max_request_size
+        self.__routes = {
+            ('POST', '/poses'): self.__post_poses,
+            ('GET', '/stats'): self.__get_stats,
+            ('GET', '/nodes'): self.__get_nodes,
+            ('GET', '/bounds'): self.__get_bounds,
+            ('GET', '/nearest'): self.__get_nearest,
+            ('GET', '/route'): self.__get_route,
+            ('GET', '/map.png'): self.__get_png,
+        }
+
+    @property
+    def address(self) -> Any:
+        return None if self.__server is None else self.__server.sockets[0].getsockname()
+
+    async def start(self) -> None:
+        if self.__socket_path is not None:
+            self.__server = await asyncio.start_unix_server(self.__handle, path=self.__socket_path)
+        else:
+            self.__server = await asyncio.start_server(self.__handle, host=self.__host, port=self.__port)
+
+    async def serve_forever(self) -> None:
+        await self.__server.serve_forever()
+
+    async def stop(self) -> None:
+        if self.__server is not None:
+            self.__server.close()
+            await self.__server.wait_closed()
+
+            self.__server = None
+
+    async def __handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                try:
+                    request = await self.__read_request(reader)
+                except _HttpError as error:
+                    writer.write(self.__format_response(*self.__get_error_response(error), keep_alive=False))
+                    await writer.drain()
+                    break
+
+                if request is None:
+                    break
+
+                try:
+                    status, content_type, body = await self.__dispatch(request)
+                except _HttpError as error:
+                    status, content_type, body = self.__get_error_response(error)
+                except Exception:
+                    print_exc()
+
+                    status, content_type, body = self.__get_error_response(
+                        _HttpError(HTTPStatus.INTERNAL_SERVER_ERROR, 'Internal server error')
+                    )
+
+                keep_alive = request.headers.get('connection', '').lower() != 'close'
+
+                writer.write(self.__format_response(status, content_type, body, keep_alive))
+                await writer.drain()
+
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+            with suppress(ConnectionError):
+                await writer.wait_closed()
+
+    async def __read_request(self, reader: asyncio.StreamReader) -> Optional[_Request]:
+        request_line = await reader.readline()
+
+        if not request_line.strip():
+            return None
+
+        try:
+            method, target, _ = request_line.decode('latin-1').split(' ', 2)
+        except ValueError:
+            raise _HttpError(HTTPStatus.BAD_REQUEST, 'Malformed request line')
+
+        headers = {}
+
+        while True:
+            line = await reader.readline()
+
+            if line in (b'\r\n', b'\n', b''):
+                break
+
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        try:
+            content_length = int(headers.get('content-length', 0))
+        except ValueError:
+            raise _HttpError(HTTPStatus.BAD_REQUEST, 'Invalid Content-Length')
+
+        if content_length > self.__max_request_size:
+            raise _HttpError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, 'Request body is too large')
+
+        url = urlsplit(target)
+
+        return _Request(
+            method=method.upper(),
+            path=url.path,
+            query=parse_qs(url.query),
+            headers=headers,
+            body=await reader.readexactly(content_length),
+        )
+
+    async def __dispatch(self, request: _Request) -> _Response:
+        handler = self.__routes.get((request.method, request.path))
+
+        if handler is None:
+            if any(path == request.path for _, path in self.__routes):
+                raise _HttpError(HTTPStatus.METHOD_NOT_ALLOWED, f'{request.method} is not allowed for {request.path}')
+
+            raise _HttpError(HTTPStatus.NOT_FOUND, f'Unknown path {request.path}')
+
+        return await handler(request)
+
+    async def __post_poses(self, request: _Request) -> _Response:
+        try:
+            if request.headers.get('content-type', '').startswith('application/octet-stream'):
+                records = numpy.frombuffer(request.body, dtype=TRAJECTORY_DTYPE)
+                batch = PoseBatch.from_records(agent=self.__get_string(request, 'agent', DEFAULT_AGENT), records=records)
+            else:
+                batch = PoseBatch.from_json(json.loads(request.body))
+        except (ValueError, KeyError, TypeError) as error:
+            raise _HttpError(HTTPStatus.BAD_REQUEST, f'Invalid pose batch: {error}')
+
+        await self.__service.submit(batch)
+
+        return self.__json(HTTPStatus.ACCEPTED, {'queued': len(batch)})
+
+    async def __get_stats(self, request: _Request) -> _Response:
+        return self.__json(HTTPStatus.OK, asdict(await self.__service.statistics()))
+
+    async def __get_nodes(self, request: _Request) -> _Response:
+        snapshot = await self.__service.snapshot()
+
+        return self.__json(HTTPStatus.OK, {
+            'revision': snapshot.revision,
+            'coordinates': snapshot.coordinates.tolist(),
+            'edges': snapshot.edges.tolist(),
+            'lengths': [None if numpy.isnan(length) else length for length in snapshot.lengths.tolist()],
+        })
+
+    async def __get_bounds(self, request: _Request) -> _Response:
+        snapshot = await self.__service.snapshot()
+
+        return self.__json(HTTPStatus.OK, {'revision': snapshot.revision, 'bounds': snapshot.bounds})
+
+    async def __get_nearest(self, request: _Request) -> _Response:
+        point = Point(self.__get_float(request, 'x'), self.__get_float(request, 'y'))
+        k = self.__get_count(request, 'k', default=1)
+
+        indices, coordinates, distances = await self.__service.nearest(point=point, k=k)
+
+        return self.__json(HTTPStatus.OK, {
+            'nodes': indices.tolist(),
+            'coordinates': coordinates.tolist(),
+            'distances': distances.tolist(),
+        })
+
+    async def __get_route(self, request: _Request) -> _Response:
+        start = Point(self.__get_float(request, 'x1'), self.__get_float(request, 'y1'))
+        finish = Point(self.__get_float(request, 'x2'), self.__get_float(request, 'y2'))
+
+        route = await self.__service.route(start=start, finish=finish)
+
+        if route is None:
+            return self.__json(HTTPStatus.OK, {'nodes': None, 'length': None})
+
+        return self.__json(HTTPStatus.OK, {'nodes': route[0], 'length': route[1]})
+
+    async def __get_png(self, request: _Request) -> _Response:
+        return HTTPStatus.OK, 'image/png', await self.__service.render_png()
+
+    @staticmethod
+    def __get_string(request: _Request, name: str, default: str) -> str:
+        return request.query.get(name, [default])[0]
+
+    @staticmethod
+    def __get_float(request: _Request, name: str, default: Optional[float]=None) -> float:
+        values = request.query.get(name)
+
+        if values is None:
+            if default is None:
+                raise _HttpError(HTTPStatus.BAD_REQUEST, f'Missing query parameter "{name}"')
+
+            return default
+
+        try:
+            value = float(values[0])
+        except ValueError:
+            raise _HttpError(HTTPStatus.BAD_REQUEST, f'Query parameter "{name}" must be a number')
+
+        if not isfinite(value):
+            raise _HttpError(HTTPStatus.BAD_REQUEST, f'Query parameter "{name}" must be finite')
+
+        return value
+
+    @classmethod
+    def __get_count(cls, request: _Request, name: str, default: int) -> int:
+        value = cls.__get_float(request, name, default=float(default))
+
+        if value < 1 or not value.is_integer():
+            raise _HttpError(HTTPStatus.BAD_REQUEST, f'Query parameter "{name}" must be a positive integer')
+
+        return int(value)
+
+    @classmethod
+    def __get_error_response(cls, error: _HttpError) -> _Response:
+        return cls.__json(error.status, {'error': str(error)})
+
+    @staticmethod
+    def __json(status: int, data: Any) -> _Response:
+        return status, 'application/json', json.dumps(data).encode()
+
+    @staticmethod
+    def __format_response(status: int, content_type: str, body: bytes, keep_alive: bool) -> bytes:
+        head = (
+            f'HTTP/1.1 {status} {HTTPStatus(status).phrase}\r\n'
+            f'Content-Type: {content_type}\r\n'
+            f'Content-Length: {len(body)}\r\n'
+            f'Connection: {"keep-alive" if keep_alive else "close"}\r\n'
+            f'\r\n'
+        )
+
+        return head.encode('latin-1') + body
+
+
+async def serve(service: MapService, host: str, port: int, socket_path: Optional[str]=None) -> None:
+    server = MapServer(service=service, host=host, port=port, socket_path=socket_path)
+
+    await service.start()
+    await server.start()
+
+    print(f'Map service is listening on {server.address}')
+
+    try:
+        await server.serve_forever()
+    finally:
+        await server.stop()
+        await service.stop()
@@ -0,0 +1,332 @@
+from __future__ import annotations
+
+import numpy
+from math import inf, nan
+from time import perf_counter
+
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, TYPE_CHECKING
+
+from src.Point import Point
+from src.Graph import Graph
+from src.Drivers import AutoDriver, Driver
+from src.Sensors import SensorSnapshot, Sensors
+from src.Metrics import Metrics
+from src.Trajectory import TrajectoryRecorder
+from src.ClosestPointsCalculator import CalculatorInputData, ClosestPointsCalculator
+
+if TYPE_CHECKING:
+    from src.Exploration import ExplorationTracker
+    from gym_duckietown.envs.duckietown_env import DuckietownEnv
+
+
+__all__ = ['RunStatistics', 'Mapper', 'VectorMapper', 'create_environment']
+
+
+@dataclass
+class RunStatistics:
+    steps: int
+    seconds: float
+    number_of_nodes: int
+    number_of_stretches: int
+    number_of_lane_pose_queries: int
+    number_of_simulator_lane_pose_queries: int=0
+    is_exploration_complete: bool=False
+
+    @property
+    def steps_per_second(self) -> float:
+        return self.steps / self.seconds if self.seconds > 0 else inf
+
+    @property
+    def lane_pose_queries_per_step(self) -> float:
+        return self.number_of_lane_pose_queries / self.steps if self.steps > 0 else 0
+
+    def __repr__(self) -> str:
+        return (f'Steps: {self.steps}, seconds: {self.seconds:.2f}, steps per second: {self.steps_per_second:.1f}, '
+                f'nodes: {self.number_of_nodes}, stretches: {self.number_of_stretches}, '
+                f'lane pose queries per step: {self.lane_pose_queries_per_step:.2f}, '
+                f'simulator lane pose queries: {self.number_of_simulator_lane_pose_queries}, '
+                f'exploration complete: {self.is_exploration_complete}')
+
+
+class Mapper:
+    __environment: DuckietownEnv
+    __driver: Driver
+    __graph: Graph
+    __calculator: ClosestPointsCalculator
+    __sensors: Sensors
+    __recorder: Optional[TrajectoryRecorder]
+    __exploration: Optional[ExplorationTracker]
+    __metrics: Optional[Metrics]
+    __episode: int=0
+    __prev_pos: Optional[Point]=None
+
+    def __init__(self, environment: DuckietownEnv, driver: Driver, graph: Graph,
+                 calculator: ClosestPointsCalculator, recorder: Optional[TrajectoryRecorder]=None,
+                 exploration: Optional[ExplorationTracker]=None, metrics: Optional[Metrics]=None) -> None:
+        self.__recorder = recorder
+        self.__exploration = exploration
+        self.__metrics = metrics
+        self.__environment = environment
+        self.__driver = driver
+        self.__graph = graph
+        self.__calculator = calculator
+        self.__sensors = Sensors(environment=environment, exploration=exploration)
+
+        if metrics is not None:
+            metrics.add_gauge('nodes', lambda: self.__graph.number_of_nodes)
+            metrics.add_gauge('stretches', lambda: self.__graph.number_of_stretches)
+            metrics.add_gauge('nodes_added', lambda: self.__graph.number_of_added_nodes)
+            metrics.add_gauge('nodes_merged', lambda: self.__graph.number_of_merged_nodes)
+            metrics.add_gauge('points_snapped', lambda: self.__graph.number_of_snapped_points)
+            metrics.add_gauge('stretches_added', lambda: self.__graph.number_of_added_stretches)
+            metrics.add_gauge('lane_pose_queries', lambda: self.__sensors.number_of_lane_pose_queries)
+            metrics.add_gauge('simulator_lane_pose_queries', lambda: self.__sensors.number_of_simulator_lane_pose_queries)
+
+    @property
+    def graph(self) -> Graph:
+        return self.__graph
+
+    @property
+    def sensors(self) -> Sensors:
+        return self.__sensors
+
+    @property
+    def is_exploration_complete(self) -> bool:
+        return self.__exploration is not None and self.__exploration.is_complete
+
+    def take_snapshot(self) -> SensorSnapshot:
+        if self.__metrics is None:
+            return self.__sensors.take_snapshot()
+
+        start = perf_counter()
+        snapshot = self.__sensors.take_snapshot()
+        self.__metrics.add_time('lane_pose', perf_counter() - start)
+
+        return snapshot
+
+    def step(self) -> bool:
+        snapshot = self.take_snapshot()
+
+        self.update_graph(snapshot)
+
+        done = self.step_environment(snapshot)
+
+        if self.__metrics is not None:
+            self.__metrics.tick()
+
+        return done
+
+    def run(self, steps: int) -> RunStatistics:
+        queries_before = self.__sensors.number_of_lane_pose_queries
+        simulator_queries_before = self.__sensors.number_of_simulator_lane_pose_queries
+
+        start = perf_counter()
+
+        made_steps = 0
+
+        while made_steps < steps and not self.is_exploration_complete:
+            self.step()
+
+            made_steps += 1
+
+        self.__graph.flush()
+
+        finish = perf_counter()
+
+        return RunStatistics(
+            steps=made_steps,
+            seconds=finish - start,
+            number_of_nodes=self.__graph.number_of_nodes,
+            number_of_stretches=self.__graph.number_of_stretches,
+            number_of_lane_pose_queries=self.__sensors.number_of_lane_pose_queries - queries_before,
+            number_of_simulator_lane_pose_queries=(self.__sensors.number_of_simulator_lane_pose_queries
+                                                   - simulator_queries_before),
+            is_exploration_complete=self.is_exploration_complete,
+        )
+
+    def update_graph(self, snapshot: SensorSnapshot) -> None:
+        input_data = self.__get_data_for_calculator(snapshot)
+
+        if self.__metrics is None:
+            self.__graph.check(self.__calculator.get_closest_point(input_data))
+            return
+
+        start = perf_counter()
+        closest_point = self.__calculator.get_closest_point(input_data)
+        calculated = perf_counter()
+        self.__graph.check(closest_point)
+        checked = perf_counter()
+
+        self.__metrics.add_time('closest_point', calculated - start)
+        self.__metrics.add_time('graph_check', checked - calculated)
+
+    def step_environment(self, snapshot: SensorSnapshot) -> bool:
+        start = perf_counter() if self.__metrics is not None else 0
+
+        action = self.__driver.get_action(snapshot)
+
+        if self.__metrics is not None:
+            self.__metrics.add_time('driver_action', perf_counter() - start)
+
+        if self.__recorder is not None:
+            self.__recorder.record(
+                episode=self.__episode,
+                cur_pos=snapshot.cur_pos,
+                cur_angle=snapshot.cur_angle,
+                lane_dist=snapshot.lane_pose.dist,
+                lane_angle=snapshot.lane_pose.angle_rad,
+                action=action,
+            )
+
+        start = perf_counter() if self.__metrics is not None else 0
+
+        _, _, done, _ = self.__environment.step(action)
+
+        if self.__metrics is not None:
+            self.__metrics.add_time('environment_step', perf_counter() - start)
+
+        if done:
+            self.__environment.reset()
+            self.__episode += 1
+
+            if self.__metrics is not None:
+                self.__metrics.increment('episodes')
+            self.__prev_pos = None
+
+        return done
+
+    def __get_data_for_calculator(self, snapshot: SensorSnapshot) -> CalculatorInputData:
+        cur_pos = snapshot.position
+
+        result = CalculatorInputData(
+            cur_pos=cur_pos,
+            prev_pos=self.__prev_pos,
+            abs_angle=snapshot.cur_angle,
+            angle_to_road=snapshot.lane_pose.angle_rad,
+            dist=snapshot.lane_pose.dist
+        )
+
+        self.__prev_pos = cur_pos
+
+        return result
+
+
+class VectorMapper:
+    __environments: List[DuckietownEnv]
+    __graphs: List[Graph]
+    __calculator: ClosestPointsCalculator
+    __sensors: List[Sensors]
+    __prev_positions: numpy.ndarray
+
+    def __init__(self, environments: List[DuckietownEnv], graphs: List[Graph], calculator: ClosestPointsCalculator) -> None:
+        if len(environments) != len(graphs):
+            raise ValueError(f'Got {len(environments)} environments and {len(graphs)} graphs')
+
+        self.__environments = environments
+        self.__graphs = graphs
+        self.__calculator = calculator
+        self.__sensors = [Sensors(environment=environment) for environment in environments]
+        self.__prev_positions = numpy.full(shape=(len(environments), 2), fill_value=nan)
+
+    @property
+    def graphs(self) -> List[Graph]:
+        return self.__graphs
+
+    @property
+    def number_of_environments(self) -> int:
+        return len(self.__environments)
+
+    def step(self, indices: Optional[numpy.ndarray]=None) -> numpy.ndarray:
+        if indices is None:
+            indices = numpy.arange(self.number_of_environments)
+
+        snapshots = [self.__sensors[index].take_snapshot() for index in indices.tolist()]
+
+        positions = numpy.array([(snapshot.cur_pos[0], snapshot.cur_pos[2]) for snapshot in snapshots]).reshape(-1, 2)
+        abs_angles = numpy.array([snapshot.cur_angle for snapshot in snapshots])
+        angles_to_road = numpy.array([snapshot.lane_pose.angle_rad for snapshot in snapshots])
+        lane_distances = numpy.array([snapshot.lane_pose.dist for snapshot in snapshots])
+
+        points, is_valid = self.__calculator.get_closest_points(
+            positions=positions,
+            abs_angles=abs_angles,
+            angles_to_road=angles_to_road,
+            distances=lane_distances,
+            prev_positions=self.__prev_positions[indices],
+        )
+
+        self.__prev_positions[indices] = positions
+
+        for index, (x, y) in zip(indices[is_valid].tolist(), points[is_valid].tolist()):
+            self.__graphs[index].check(Point(x, y))
+
+        actions = AutoDriver.get_actions(lane_distances=lane_distances, angles_to_road=angles_to_road)
+
+        done = numpy.zeros(shape=len(indices), dtype=bool)
+
+        for position, index in enumerate(indices.tolist()):
+            environment = self.__environments[index]
+
+            _, _, done[position], _ = environment.step(actions[position])
+
+            if done[position]:
+                environment.reset()
+                self.__prev_positions[index] = nan
+
+        return done
+
+    def run(self, steps: Sequence[int]) -> List[RunStatistics]:
+        budgets = numpy.array(steps, dtype=numpy.int64)
+        made_steps = numpy.zeros(shape=self.number_of_environments, dtype=numpy.int64)
+        queries_before = [sensors.number_of_lane_pose_queries for sensors in self.__sensors]
+        simulator_queries_before = [sensors.number_of_simulator_lane_pose_queries for sensors in self.__sensors]
+
+        start = perf_counter()
+
+        while True:
+            indices = numpy.flatnonzero(made_steps < budgets)
+
+            if len(indices) == 0:
+                break
+
+            self.step(indices)
+
+            made_steps[indices] += 1
+
+        for graph in self.__graphs:
+            graph.flush()
+
+        finish = perf_counter()
+
+        return [
+            RunStatistics(
+                steps=int(made_steps[index]),
+                seconds=finish - start,
+                number_of_nodes=graph.number_of_nodes,
+                number_of_stretches=graph.number_of_stretches,
+                number_of_lane_pose_queries=sensors.number_of_lane_pose_queries - queries_before[index],
+                number_of_simulator_lane_pose_queries=(sensors.number_of_simulator_lane_pose_queries
+                                                       - simulator_queries_before[index]),
+            )
+            for index, (graph, sensors) in enumerate(zip(self.__graphs, self.__sensors))
+        ]
+
+
+def create_environment(map_name: str, seed: int, headless: bool=False) -> DuckietownEnv:
+    if headless:
+        import pyglet
+
+        pyglet.options['headless'] = True
+
+    from gym_duckietown.envs.duckietown_env import DuckietownEnv
+
+    environment = DuckietownEnv(
+        seed=seed,
+        map_name=map_name,
+        domain_rand=False,
+        max_steps=inf,
+    )
+    environment.reset()
+
+    return environment
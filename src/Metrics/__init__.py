@@ -0,0 +1,200 @@
+import os
+import csv
+import json
+import numpy
+from time import perf_counter, time
+
+from dataclasses import asdict, dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+__all__ = ['StageSummary', 'MetricsSummary', 'RollingHistogram', 'Metrics']
+
+
+PERCENTILES = (50, 90, 99)
+
+CSV_COLUMNS = ['time', 'elapsed', 'name', 'count', 'total', 'mean', 'p50', 'p90', 'p99', 'max', 'value']
+
+
+@dataclass
+class StageSummary:
+    count: int
+    total: float
+    mean: float
+    p50: float
+    p90: float
+    p99: float
+    max: float
+
+
+@dataclass
+class MetricsSummary:
+    time: float
+    elapsed: float
+    stages: Dict[str, StageSummary]
+    counters: Dict[str, float]
+
+    def __repr__(self) -> str:
+        lines = [f'Metrics after {self.elapsed:.1f} s']
+
+        for name, stage in self.stages.items():
+            lines.append(f'  {name:<18} calls: {stage.count:>8}, mean: {stage.mean * 1e3:>8.3f} ms, '
+                         f'p50: {stage.p50 * 1e3:>8.3f} ms, p99: {stage.p99 * 1e3:>8.3f} ms, '
+                         f'max: {stage.max * 1e3:>8.3f} ms')
+
+        for name, value in self.counters.items():
+            lines.append(f'  {name:<18} {value:g}')
+
+        return '\n'.join(lines)
+
+
+class RollingHistogram:
+    __values: numpy.ndarray
+    __position: int
+    __count: int
+    __total: float
+
+    def __init__(self, window: int) -> None:
+        self.__values = numpy.zeros(shape=window, dtype=numpy.float64)
+        self.__position = 0
+        self.__count = 0
+        self.__total = 0
+
+    @property
+    def count(self) -> int:
+        return self.__count
+
+    @property
+    def total(self) -> float:
+        return self.__total
+
+    @property
+    def values(self) -> numpy.ndarray:
+        return self.__values[:min(self.__count, len(self.__values))]
+
+    def add(self, value: float) -> None:
+        self.__values[self.__position] = value
+        self.__position = (self.__position + 1) % len(self.__values)
+        self.__count += 1
+        self.__total += value
+
+    def histogram(self, bins: int) -> Tuple[numpy.ndarray, numpy.ndarray]:
+        return numpy.histogram(self.values, bins=bins)
+
+    def summary(self) -> StageSummary:
+        values = self.values
+
+        if len(values) == 0:
+            return StageSummary(count=0, total=0, mean=0, p50=0, p90=0, p99=0, max=0)
+
+        p50, p90, p99 = numpy.percentile(values, PERCENTILES).tolist()
+
+        return StageSummary(
+            count=self.__count,
+            total=self.__total,
+            mean=self.__total / self.__count,
+            p50=p50,
+            p90=p90,
+            p99=p99,
+            max=float(values.max()),
+        )
+
+
+class Metrics:
+    __window: int
+    __period: float
+    __path: Optional[str]
+    __stages: Dict[str, RollingHistogram]
+    __counters: Dict[str, float]
+    __gauges: Dict[str, Callable[[], float]]
+    __start: float
+    __last_summary: float
+
+    def __init__(self, window: int, period: float, path: Optional[str]=None) -> None:
+        self.__window = window
+        self.__period = period
+        self.__path = path
+        self.__stages = {}
+        self.__counters = {}
+        self.__gauges = {}
+        self.__start = perf_counter()
+        self.__last_summary = self.__start
+
+    @property
+    def stages(self) -> Dict[str, RollingHistogram]:
+        return self.__stages
+
+    def add_time(self, stage: str, seconds: float) -> None:
+        histogram = self.__stages.get(stage)
+
+        if histogram is None:
+            histogram = self.__stages[stage] = RollingHistogram(window=self.__window)
+
+        histogram.add(seconds)
+
+    def increment(self, counter: str, value: float=1) -> None:
+        self.__counters[counter] = self.__counters.get(counter, 0) + value
+
+    def add_gauge(self, name: str, getter: Callable[[], float]) -> None:
+        self.__gauges[name] = getter
+
+    def summary(self) -> MetricsSummary:
+        counters = dict(self.__counters)
+
+        for name, getter in self.__gauges.items():
+            counters[name] = getter()
+
+        return MetricsSummary(
+            time=time(),
+            elapsed=perf_counter() - self.__start,
+            stages={name: histogram.summary() for name, histogram in self.__stages.items()},
+            counters=counters,
+        )
+
+    def tick(self) -> Optional[MetricsSummary]:
+        now = perf_counter()
+
+        if now - self.__last_summary < self.__period:
+            return None
+
+        self.__last_summary = now
+
+        return self.write_summary()
+
+    def write_summary(self) -> MetricsSummary:
+        summary = self.summary()
+
+        if self.__path is None:
+            print(summary)
+        elif self.__path.endswith('.csv'):
+            self.__write_csv(summary)
+        else:
+            self.__write_json(summary)
+
+        return summary
+
+    def close(self) -> None:
+        self.write_summary()
+
+    def __write_csv(self, summary: MetricsSummary) -> None:
+        rows: List[Dict[str, object]] = []
+
+        for name, stage in summary.stages.items():
+            rows.append(dict(time=summary.time, elapsed=summary.elapsed, name=name, **asdict(stage)))
+
+        for name, value in summary.counters.items():
+            rows.append(dict(time=summary.time, elapsed=summary.elapsed, name=name, value=value))
+
+        is_new_file = not os.path.exists(self.__path)
+
+        with open(self.__path, 'a', newline='') as file:
+            writer = csv.DictWriter(file, fieldnames=CSV_COLUMNS)
+
+            if is_new_file:
+                writer.writeheader()
+
+            writer.writerows(rows)
+
+    def __write_json(self, summary: MetricsSummary) -> None:
+        with open(self.__path, 'a') as file:
+            file.write(json.dumps(asdict(summary)) + '\n')
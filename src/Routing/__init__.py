@@ -0,0 +1,317 @@
+import numpy
+from functools import lru_cache
+from heapq import heappop, heappush
+from math import hypot, inf
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from src.config import ROUTING_CACHE_SIZE, ROUTING_TABLE_MAX_KEY_NODES
+from src.Point import Point
+from src.Topology import Adjacency, build_adjacency, build_chains
+
+
+__all__ = ['Route', 'RouteEngine']
+
+
+@dataclass
+class Route:
+    nodes: List[int]
+    length: float
+
+
+@dataclass
+class _Chain:
+    start: int
+    end: int
+    nodes: List[int]
+    offsets: List[float]
+
+    @property
+    def length(self) -> float:
+        return self.offsets[-1]
+
+
+# key node, distance to it, chain (-1 if the node is a key node itself), position in the chain, is the key node the end of the chain
+_Exit = Tuple[int, float, int, int, bool]
+
+
+class RouteEngine:
+    __coordinates: numpy.ndarray
+    __coordinate_list: List[List[float]]
+    __neighbours: List[int]
+    __weights: List[float]
+    __offsets: List[int]
+    __chains: List[_Chain]
+    __chain_of_node: List[int]
+    __position_in_chain: List[int]
+    __key_nodes: List[int]
+    __key_index: Dict[int, int]
+    __distances: Optional[numpy.ndarray]
+    __predecessors: Optional[numpy.ndarray]
+
+    def __init__(self, coordinates: numpy.ndarray, edges: numpy.ndarray, lengths: numpy.ndarray,
+                 cache_size: int=ROUTING_CACHE_SIZE, max_table_size: int=ROUTING_TABLE_MAX_KEY_NODES) -> None:
+        self.__coordinates = numpy.array(coordinates, dtype=numpy.float64).reshape(-1, 2)
+        self.__coordinate_list = self.__coordinates.tolist()
+
+        edges = numpy.array(edges, dtype=numpy.int64).reshape(-1, 2)
+        weights = self.__get_weights(edges=edges, lengths=numpy.array(lengths, dtype=numpy.float64))
+
+        self.__build_adjacency(edges=edges, weights=weights)
+
+        self.__distances = None
+        self.__predecessors = None
+
+        if len(self.__key_nodes) <= max_table_size:
+            self.__build_table()
+
+        self.__snap = lru_cache(maxsize=cache_size)(self.__find_nearest)
+
+    @property
+    def number_of_nodes(self) -> int:
+        return len(self.__coordinates)
+
+    @property
+    def number_of_key_nodes(self) -> int:
+        return len(self.__key_nodes)
+
+    @property
+    def has_table(self) -> bool:
+        return self.__distances is not None
+
+    def snap(self, point: Point) -> int:
+        return self.__snap(point.x, point.y)
+
+    def route(self, start: Point, finish: Point) -> Optional[Route]:
+        if self.number_of_nodes == 0:
+            return None
+
+        return self.route_between(self.snap(start), self.snap(finish))
+
+    def distance(self, start: Point, finish: Point) -> float:
+        if self.number_of_nodes == 0:
+            return inf
+
+        return self.distance_between(self.snap(start), self.snap(finish))
+
+    def distance_between(self, source: int, target: int) -> float:
+        if source == target:
+            return 0
+
+        if not self.has_table:
+            route = self.__find_route(source=source, target=target)
+
+            return inf if route is None else route.length
+
+        return self.__get_best_connection(source=source, target=target)[0]
+
+    def route_between(self, source: int, target: int) -> Optional[Route]:
+        if source == target:
+            return Route(nodes=[source], length=0)
+
+        if not self.has_table:
+            return self.__find_route(source=source, target=target)
+
+        length, source_exit, target_exit = self.__get_best_connection(source=source, target=target)
+
+        if length == inf:
+            return None
+
+        if source_exit is None:
+            chain = self.__chains[self.__chain_of_node[source]]
+            first, last = self.__position_in_chain[source], self.__position_in_chain[target]
+
+            nodes = chain.nodes[first:last + 1] if first <= last else chain.nodes[last:first + 1][::-1]
+
+            return Route(nodes=nodes, length=length)
+
+        nodes = self.__get_part_of_chain(source_exit)
+
+        key_path = self.__get_key_path(source=source_exit[0], target=target_exit[0])
+
+        for chain_index, is_reversed in key_path:
+            chain_nodes = self.__chains[chain_index].nodes
+
+            nodes.extend((chain_nodes[::-1] if is_reversed else chain_nodes)[1:])
+
+        nodes.extend(self.__get_part_of_chain(target_exit)[::-1][1:])
+
+        return Route(nodes=nodes, length=length)
+
+    def __get_best_connection(self, source: int, target: int) -> Tuple[float, Optional[_Exit], Optional[_Exit]]:
+        best = (inf, None, None)
+
+        chain_index = self.__chain_of_node[source]
+
+        if chain_index != -1 and chain_index == self.__chain_of_node[target]:
+            offsets = self.__chains[chain_index].offsets
+
+            best = (abs(offsets[self.__position_in_chain[source]] - offsets[self.__position_in_chain[target]]), None, None)
+
+        for source_exit in self.__get_exits(source):
+            row = self.__distances[self.__key_index[source_exit[0]]]
+
+            for target_exit in self.__get_exits(target):
+                length = source_exit[1] + float(row[self.__key_index[target_exit[0]]]) + target_exit[1]
+
+                if length < best[0]:
+                    best = (length, source_exit, target_exit)
+
+        return best
+
+    def __get_exits(self, node: int) -> List[_Exit]:
+        chain_index = self.__chain_of_node[node]
+
+        if chain_index == -1:
+            return [(node, 0, -1, 0, False)]
+
+        chain = self.__chains[chain_index]
+        position = self.__position_in_chain[node]
+        offset = chain.offsets[position]
+
+        return [
+            (chain.start, offset, chain_index, position, False),
+            (chain.end, chain.length - offset, chain_index, position, True),
+        ]
+
+    def __get_part_of_chain(self, exit: _Exit) -> List[int]:
+        key_node, _, chain_index, position, is_end = exit
+
+        if chain_index == -1:
+            return [key_node]
+
+        nodes = self.__chains[chain_index].nodes
+
+        return nodes[position:] if is_end else nodes[position::-1]
+
+    def __get_key_path(self, source: int, target: int) -> List[Tuple[int, bool]]:
+        result = []
+
+        row = self.__predecessors[self.__key_index[source]]
+        node = target
+
+        while node != source:
+            chain_index = int(row[self.__key_index[node]])
+            chain = self.__chains[chain_index]
+            is_reversed = chain.start == node
+
+            result.append((chain_index, is_reversed))
+            node = chain.end if is_reversed else chain.start
+
+        return result[::-1]
+
+    def __find_route(self, source: int, target: int) -> Optional[Route]:
+        target_x, target_y = self.__coordinates[target].tolist()
+
+        def heuristic(node: int) -> float:
+            x, y = self.__coordinate_list[node]
+
+            return hypot(x - target_x, y - target_y)
+
+        distances = {source: 0.0}
+        predecessors = {source: -1}
+        queue = [(heuristic(source), source)]
+
+        while queue:
+            _, node = heappop(queue)
+
+            if node == target:
+                nodes = [node]
+
+                while predecessors[nodes[-1]] != -1:
+                    nodes.append(predecessors[nodes[-1]])
+
+                return Route(nodes=nodes[::-1], length=distances[target])
+
+            distance = distances[node]
+
+            for position in range(self.__offsets[node], self.__offsets[node + 1]):
+                neighbour = self.__neighbours[position]
+                new_distance = distance + self.__weights[position]
+
+                if new_distance < distances.get(neighbour, inf):
+                    distances[neighbour] = new_distance
+                    predecessors[neighbour] = node
+
+                    heappush(queue, (new_distance + heuristic(neighbour), neighbour))
+
+        return None
+
+    def __build_table(self) -> None:
+        number_of_key_nodes = len(self.__key_nodes)
+
+        key_adjacency: List[List[Tuple[int, float, int]]] = [[] for _ in range(number_of_key_nodes)]
+
+        for chain_index, chain in enumerate(self.__chains):
+            if chain.start == chain.end:
+                continue
+
+            start, end = self.__key_index[chain.start], self.__key_index[chain.end]
+
+            key_adjacency[start].append((end, chain.length, chain_index))
+            key_adjacency[end].append((start, chain.length, chain_index))
+
+        self.__distances = numpy.full(shape=(number_of_key_nodes, number_of_key_nodes), fill_value=inf)
+        self.__predecessors = numpy.full(shape=(number_of_key_nodes, number_of_key_nodes), fill_value=-1, dtype=numpy.int32)
+
+        for source in range(number_of_key_nodes):
+            distances = self.__distances[source]
+            predecessors = self.__predecessors[source]
+
+            distances[source] = 0
+            queue = [(0.0, source)]
+
+            while queue:
+                distance, node = heappop(queue)
+
+                if distance > distances[node]:
+                    continue
+
+                for neighbour, length, chain_index in key_adjacency[node]:
+                    new_distance = distance + length
+
+                    if new_distance < distances[neighbour]:
+                        distances[neighbour] = new_distance
+                        predecessors[neighbour] = chain_index
+
+                        heappush(queue, (new_distance, neighbour))
+
+    def __build_adjacency(self, edges: numpy.ndarray, weights: numpy.ndarray) -> None:
+        adjacency = build_adjacency(edges=edges, number_of_nodes=self.number_of_nodes)
+
+        self.__neighbours = adjacency.neighbours
+        self.__weights = weights[adjacency.stretches].tolist()
+        self.__offsets = adjacency.offsets
+
+        self.__build_chains(adjacency=adjacency, edges=edges, weights=weights.tolist())
+
+    def __build_chains(self, adjacency: Adjacency, edges: numpy.ndarray, weights: List[float]) -> None:
+        chains, is_key = build_chains(adjacency=adjacency, edges=edges)
+
+        self.__chains = []
+        self.__chain_of_node = [-1] * self.number_of_nodes
+        self.__position_in_chain = [0] * self.number_of_nodes
+
+        for chain_index, chain in enumerate(chains):
+            offsets = [0.0]
+
+            for stretch in chain.stretches:
+                offsets.append(offsets[-1] + weights[stretch])
+
+            for position_in_chain, node in enumerate(chain.nodes[1:-1], start=1):
+                self.__chain_of_node[node] = chain_index
+                self.__position_in_chain[node] = position_in_chain
+
+            self.__chains.append(_Chain(start=chain.start, end=chain.end, nodes=chain.nodes, offsets=offsets))
+
+        self.__key_nodes = [node for node in range(self.number_of_nodes) if is_key[node]]
+        self.__key_index = {node: index for index, node in enumerate(self.__key_nodes)}
+
+    def __find_nearest(self, x: float, y: float) -> int:
+        return int(numpy.argmin(numpy.hypot(self.__coordinates[:, 0] - x, self.__coordinates[:, 1] - y)))
+
+    def __get_weights(self, edges: numpy.ndarray, lengths: numpy.ndarray) -> numpy.ndarray:
+        delta = self.__coordinates[edges[:, 0]] - self.__coordinates[edges[:, 1]]
+
+        return numpy.where(numpy.isnan(lengths), numpy.hypot(delta[:, 0], delta[:, 1]), lengths)
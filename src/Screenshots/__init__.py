@@ -0,0 +1,142 @@
+import os
+import re
+import json
+import numpy
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from itertools import islice
+from math import nan
+from time import perf_counter
+
+from dataclasses import dataclass
+from typing import Callable, Deque, Iterator, List, Optional, Tuple
+
+from src.Graph import Graph
+from src.Point import Point
+from src.Trajectory import ReplayStatistics
+from src.ClosestPointsCalculator import ClosestPointsCalculator
+
+
+__all__ = ['ScreenshotFrame', 'iterate_screenshots', 'build_map_from_screenshots']
+
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp')
+
+POSE_EXTENSION = '.json'
+
+NUMBER_PATTERN = re.compile(r'(\d+)')
+
+
+@dataclass
+class ScreenshotFrame:
+    name: str
+    image: Optional[numpy.ndarray]
+    cur_pos: Point
+    abs_angle: float
+    angle_to_road: float
+    dist: float
+
+
+def iterate_screenshots(directory: str, workers: int, prefetch: int, decode_images: bool) -> Iterator[ScreenshotFrame]:
+    pairs = _iterate_pairs(directory)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending: Deque[Future] = deque(
+            executor.submit(_load_frame, image_path, pose_path, decode_images)
+            for image_path, pose_path in islice(pairs, prefetch)
+        )
+
+        while pending:
+            frame = pending.popleft().result()
+
+            for image_path, pose_path in islice(pairs, 1):
+                pending.append(executor.submit(_load_frame, image_path, pose_path, decode_images))
+
+            yield frame
+
+
+def build_map_from_screenshots(directory: str, graph: Graph, calculator: ClosestPointsCalculator, workers: int,
+                               prefetch: int, batch_size: int, decode_images: bool=False,
+                               frame_handler: Optional[Callable[[ScreenshotFrame], None]]=None) -> ReplayStatistics:
+    frames = 0
+    last_position = (nan, nan)
+
+    start = perf_counter()
+
+    screenshots = iterate_screenshots(directory=directory, workers=workers, prefetch=prefetch, decode_images=decode_images)
+
+    while True:
+        batch = list(islice(screenshots, batch_size))
+
+        if not batch:
+            break
+
+        if frame_handler is not None:
+            for frame in batch:
+                frame_handler(frame)
+
+        positions = numpy.array([frame.cur_pos.tuple for frame in batch], dtype=numpy.float64)
+
+        prev_positions = numpy.empty_like(positions)
+        prev_positions[0] = last_position
+        prev_positions[1:] = positions[:-1]
+
+        points, is_valid = calculator.get_closest_points(
+            positions=positions,
+            abs_angles=numpy.array([frame.abs_angle for frame in batch]),
+            angles_to_road=numpy.array([frame.angle_to_road for frame in batch]),
+            distances=numpy.array([frame.dist for frame in batch]),
+            prev_positions=prev_positions,
+        )
+
+        for x, y in points[is_valid].tolist():
+            graph.check(Point(x, y))
+
+        frames += len(batch)
+        last_position = positions[-1]
+
+    graph.flush()
+
+    finish = perf_counter()
+
+    return ReplayStatistics(
+        frames=frames,
+        seconds=finish - start,
+        number_of_nodes=graph.number_of_nodes,
+        number_of_stretches=graph.number_of_stretches,
+    )
+
+
+def _iterate_pairs(directory: str) -> Iterator[Tuple[str, str]]:
+    file_names: List[str] = sorted(os.listdir(directory), key=_get_natural_key)
+
+    for file_name in file_names:
+        name, extension = os.path.splitext(file_name)
+        pose_path = os.path.join(directory, name + POSE_EXTENSION)
+
+        if extension.lower() in IMAGE_EXTENSIONS and os.path.exists(pose_path):
+            yield os.path.join(directory, file_name), pose_path
+
+
+def _get_natural_key(file_name: str) -> List[Tuple[int, str]]:
+    return [(int(part), '') if part.isdigit() else (-1, part) for part in NUMBER_PATTERN.split(file_name)]
+
+
+def _load_frame(image_path: str, pose_path: str, decode_image: bool) -> ScreenshotFrame:
+    with open(pose_path) as file:
+        pose = json.load(file)
+
+    return ScreenshotFrame(
+        name=os.path.basename(image_path),
+        image=_read_image(image_path) if decode_image else None,
+        cur_pos=Point(pose['x'], pose['y']),
+        abs_angle=pose['angle'],
+        angle_to_road=pose['angle_to_road'],
+        dist=pose['dist'],
+    )
+
+
+def _read_image(image_path: str) -> numpy.ndarray:
+    import cv2
+
+    return cv2.imread(image_path)
@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import numpy
+
+from dataclasses import dataclass
+from typing import Optional, TYPE_CHECKING
+
+from src.Point import Point
+from src.config import USE_LANE_GEOMETRY
+
+if TYPE_CHECKING:
+    from src.Exploration import ExplorationTracker
+    from src.LaneGeometry import LaneGeometry
+    from gym_duckietown.simulator import LanePosition
+    from gym_duckietown.envs.duckietown_env import DuckietownEnv
+
+
+__all__ = ['SensorSnapshot', 'Sensors']
+
+
+@dataclass
+class SensorSnapshot:
+    cur_pos: numpy.ndarray
+    cur_angle: float
+    lane_pose: LanePosition
+
+    @property
+    def position(self) -> Point:
+        return Point(self.cur_pos[0], self.cur_pos[2])
+
+
+class Sensors:
+    __environment: DuckietownEnv
+    __lane_geometry: Optional[LaneGeometry]=None
+    __exploration: Optional[ExplorationTracker]
+    __number_of_snapshots: int
+    __number_of_lane_pose_queries: int
+    __number_of_simulator_lane_pose_queries: int
+
+    def __init__(self, environment: DuckietownEnv, use_lane_geometry: bool=USE_LANE_GEOMETRY,
+                 exploration: Optional[ExplorationTracker]=None) -> None:
+        self.__environment = environment
+        self.__exploration = exploration
+        self.__number_of_snapshots = 0
+        self.__number_of_lane_pose_queries = 0
+        self.__number_of_simulator_lane_pose_queries = 0
+
+        if use_lane_geometry:
+            from src.LaneGeometry import LaneGeometry
+
+            self.__lane_geometry = LaneGeometry(environment)
+
+    @property
+    def number_of_snapshots(self) -> int:
+        return self.__number_of_snapshots
+
+    @property
+    def number_of_lane_pose_queries(self) -> int:
+        return self.__number_of_lane_pose_queries
+
+    @property
+    def number_of_simulator_lane_pose_queries(self) -> int:
+        return self.__number_of_simulator_lane_pose_queries
+
+    def take_snapshot(self) -> SensorSnapshot:
+        cur_pos = numpy.array(self.__environment.cur_pos)
+        cur_angle = self.__environment.cur_angle
+
+        self.__number_of_snapshots += 1
+
+        return SensorSnapshot(
+            cur_pos=cur_pos,
+            cur_angle=cur_angle,
+            lane_pose=self.__get_lane_pose(cur_pos, cur_angle),
+        )
+
+    def __get_lane_pose(self, cur_pos: numpy.ndarray, cur_angle: float) -> LanePosition:
+        self.__number_of_lane_pose_queries += 1
+
+        curve_index = None if self.__exploration is None else self.__exploration.get_driving_curve(cur_pos)
+
+        if self.__lane_geometry is not None:
+            lane_pose = self.__lane_geometry.get_lane_pos(cur_pos, cur_angle, curve_index=curve_index)
+
+            if lane_pose is not None:
+                return lane_pose
+
+        self.__number_of_simulator_lane_pose_queries += 1
+
+        if curve_index is not None:
+            return self.__exploration.get_curve_lane_pose(curve_index, cur_pos, cur_angle)
+
+        return self.__environment.get_lane_pos2(cur_pos, cur_angle)
@@ -0,0 +1,365 @@
+from heapq import heappush, heapreplace
+from math import floor, ceil, inf, sqrt
+
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from src.Point import Point
+
+
+__all__ = ['SpatialIndex', 'LinearIndex', 'GridIndex', 'KDTreeIndex', 'create_spatial_index']
+
+
+Entry = Tuple[int, float, float]
+
+Cell = Tuple[int, int]
+
+# max-heap of the nearest entries found so far as (-distance, -index)
+Nearest = List[Tuple[float, int]]
+
+
+class SpatialIndex:
+    def insert(self, index: int, point: Point) -> None:
+        raise NotImplementedError
+
+    def nearest_within(self, point: Point, radius: float) -> int:
+        raise NotImplementedError
+
+    def within(self, point: Point, radius: float) -> List[int]:
+        raise NotImplementedError
+
+    # k nearest indices ordered by distance (ties by index)
+    def nearest(self, point: Point, k: int) -> List[int]:
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+    @staticmethod
+    def _distance(entry: Entry, point: Point) -> float:
+        return sqrt((entry[1] - point.x) ** 2 + (entry[2] - point.y) ** 2)
+
+    @classmethod
+    def _closest(cls, candidates: List[Entry], point: Point, radius: float, best: Tuple[float, int]) -> Tuple[float, int]:
+        best_distance, best_index = best
+
+        for entry in candidates:
+            distance = cls._distance(entry=entry, point=point)
+
+            if distance < radius and (distance < best_distance or distance == best_distance and entry[0] < best_index):
+                best_distance = distance
+                best_index = entry[0]
+
+        return best_distance, best_index
+
+    @classmethod
+    def _within(cls, candidates: List[Entry], point: Point, radius: float) -> List[int]:
+        return [entry[0] for entry in candidates if cls._distance(entry=entry, point=point) < radius]
+
+    @classmethod
+    def _push_nearest(cls, candidates: List[Entry], point: Point, k: int, nearest: Nearest) -> None:
+        for entry in candidates:
+            item = -cls._distance(entry=entry, point=point), -entry[0]
+
+            if len(nearest) < k:
+                heappush(nearest, item)
+            elif item > nearest[0]:
+                heapreplace(nearest, item)
+
+    @staticmethod
+    def _get_worst_distance(nearest: Nearest, k: int) -> float:
+        return -nearest[0][0] if len(nearest) == k else inf
+
+    @staticmethod
+    def _sort_nearest(nearest: Nearest) -> List[int]:
+        return [-index for _, index in sorted(nearest, reverse=True)]
+
+
+class LinearIndex(SpatialIndex):
+    __entries: List[Entry]
+
+    def __init__(self) -> None:
+        self.__entries = []
+
+    def insert(self, index: int, point: Point) -> None:
+        self.__entries.append((index, point.x, point.y))
+
+    def nearest_within(self, point: Point, radius: float) -> int:
+        return self._closest(candidates=self.__entries, point=point, radius=radius, best=(radius, -1))[1]
+
+    def within(self, point: Point, radius: float) -> List[int]:
+        return self._within(candidates=self.__entries, point=point, radius=radius)
+
+    def nearest(self, point: Point, k: int) -> List[int]:
+        nearest = []
+
+        if k > 0:
+            self._push_nearest(candidates=self.__entries, point=point, k=k, nearest=nearest)
+
+        return self._sort_nearest(nearest)
+
+    def clear(self) -> None:
+        self.__entries = []
+
+
+class GridIndex(SpatialIndex):
+    __cell_size: float
+    __cells: Dict[Cell, List[Entry]]
+    __cell_bounds: Optional[Tuple[int, int, int, int]]=None
+
+    def __init__(self, cell_size: float) -> None:
+        self.__cell_size = cell_size
+        self.__cells = {}
+
+    def insert(self, index: int, point: Point) -> None:
+        cell = self.__get_cell(point)
+
+        self.__cells.setdefault(cell, []).append((index, point.x, point.y))
+
+        if self.__cell_bounds is None:
+            self.__cell_bounds = cell[0], cell[0], cell[1], cell[1]
+        else:
+            min_x, max_x, min_y, max_y = self.__cell_bounds
+            self.__cell_bounds = min(min_x, cell[0]), max(max_x, cell[0]), min(min_y, cell[1]), max(max_y, cell[1])
+
+    def nearest_within(self, point: Point, radius: float) -> int:
+        best = (radius, -1)
+
+        for candidates in self.__get_candidates(point=point, radius=radius):
+            best = self._closest(candidates=candidates, point=point, radius=radius, best=best)
+
+        return best[1]
+
+    def within(self, point: Point, radius: float) -> List[int]:
+        result = []
+
+        for candidates in self.__get_candidates(point=point, radius=radius):
+            result.extend(self._within(candidates=candidates, point=point, radius=radius))
+
+        return result
+
+    # visits rings of cells around the point (only the occupied cells range) until no unvisited cell can be closer
+    # than the k-th nearest entry found
+    def nearest(self, point: Point, k: int) -> List[int]:
+        nearest = []
+
+        if k <= 0 or self.__cell_bounds is None:
+            return []
+
+        cx, cy = self.__get_cell(point)
+        min_x, max_x, min_y, max_y = self.__cell_bounds
+
+        ring = max(0, min_x - cx, cx - max_x, min_y - cy, cy - max_y)
+        last_ring = max(cx - min_x, max_x - cx, cy - min_y, max_y - cy)
+
+        while ring <= last_ring:
+            for candidates in self.__get_ring(cx=cx, cy=cy, ring=ring):
+                self._push_nearest(candidates=candidates, point=point, k=k, nearest=nearest)
+
+            if self._get_worst_distance(nearest=nearest, k=k) < ring * self.__cell_size:
+                break
+
+            ring += 1
+
+        return self._sort_nearest(nearest)
+
+    def clear(self) -> None:
+        self.__cells = {}
+        self.__cell_bounds = None
+
+    def __get_candidates(self, point: Point, radius: float) -> Iterator[List[Entry]]:
+        cx, cy = self.__get_cell(point)
+        rings = max(1, ceil(radius / self.__cell_size))
+
+        for x in range(cx - rings, cx + rings + 1):
+            for y in range(cy - rings, cy + rings + 1):
+                candidates = self.__cells.get((x, y))
+
+                if candidates is not None:
+                    yield candidates
+
+    def __get_ring(self, cx: int, cy: int, ring: int) -> Iterator[List[Entry]]:
+        min_x, max_x, min_y, max_y = self.__cell_bounds
+
+        cells = []
+
+        for y in (cy - ring, cy + ring) if ring != 0 else (cy,):
+            if min_y <= y <= max_y:
+                cells.extend((x, y) for x in range(max(min_x, cx - ring), min(max_x, cx + ring) + 1))
+
+        for x in (cx - ring, cx + ring) if ring != 0 else ():
+            if min_x <= x <= max_x:
+                cells.extend((x, y) for y in range(max(min_y, cy - ring + 1), min(max_y, cy + ring - 1) + 1))
+
+        for cell in cells:
+            candidates = self.__cells.get(cell)
+
+            if candidates is not None:
+                yield candidates
+
+    def __get_cell(self, point: Point) -> Cell:
+        return floor(point.x / self.__cell_size), floor(point.y / self.__cell_size)
+
+
+class _KDTree:
+    __entries: List[Entry]
+    __left: List[int]
+    __right: List[int]
+    __root: int
+
+    def __init__(self, entries: List[Entry]) -> None:
+        self.__entries = []
+        self.__left = []
+        self.__right = []
+
+        self.__root = self.__build(entries=list(entries), depth=0)
+
+    @property
+    def entries(self) -> List[Entry]:
+        return self.__entries
+
+    def nearest_within(self, point: Point, radius: float, best: Tuple[float, int]) -> Tuple[float, int]:
+        stack = [(self.__root, 0)]
+
+        while stack:
+            position, depth = stack.pop()
+
+            if position == -1:
+                continue
+
+            entry = self.__entries[position]
+            best = SpatialIndex._closest(candidates=[entry], point=point, radius=radius, best=best)
+
+            axis = depth % 2
+            delta = (point.x if axis == 0 else point.y) - entry[axis + 1]
+
+            near, far = (self.__left[position], self.__right[position]) if delta < 0 else (self.__right[position], self.__left[position])
+
+            if abs(delta) <= best[0]:
+                stack.append((far, depth + 1))
+
+            stack.append((near, depth + 1))
+
+        return best
+
+    def nearest(self, point: Point, k: int, nearest: Nearest) -> None:
+        stack = [(self.__root, 0, 0.0)]
+
+        while stack:
+            position, depth, distance_to_split = stack.pop()
+
+            if position == -1 or distance_to_split > SpatialIndex._get_worst_distance(nearest=nearest, k=k):
+                continue
+
+            entry = self.__entries[position]
+            SpatialIndex._push_nearest(candidates=[entry], point=point, k=k, nearest=nearest)
+
+            axis = depth % 2
+            delta = (point.x if axis == 0 else point.y) - entry[axis + 1]
+
+            near, far = (self.__left[position], self.__right[position]) if delta < 0 else (self.__right[position], self.__left[position])
+
+            stack.append((far, depth + 1, abs(delta)))
+            stack.append((near, depth + 1, 0.0))
+
+    def within(self, point: Point, radius: float) -> List[int]:
+        result = []
+        stack = [(self.__root, 0)]
+
+        while stack:
+            position, depth = stack.pop()
+
+            if position == -1:
+                continue
+
+            entry = self.__entries[position]
+            result.extend(SpatialIndex._within(candidates=[entry], point=point, radius=radius))
+
+            axis = depth % 2
+            delta = (point.x if axis == 0 else point.y) - entry[axis + 1]
+
+            if delta < radius:
+                stack.append((self.__left[position], depth + 1))
+            if delta > -radius:
+                stack.append((self.__right[position], depth + 1))
+
+        return result
+
+    def __build(self, entries: List[Entry], depth: int) -> int:
+        if not entries:
+            return -1
+
+        axis = depth % 2
+        entries.sort(key=lambda entry: entry[axis + 1])
+        median = len(entries) // 2
+
+        position = len(self.__entries)
+        self.__entries.append(entries[median])
+        self.__left.append(-1)
+        self.__right.append(-1)
+
+        self.__left[position] = self.__build(entries=entries[:median], depth=depth + 1)
+        self.__right[position] = self.__build(entries=entries[median + 1:], depth=depth + 1)
+
+        return position
+
+
+class KDTreeIndex(SpatialIndex):
+    __trees: List[Optional[_KDTree]]
+
+    def __init__(self) -> None:
+        self.__trees = []
+
+    def insert(self, index: int, point: Point) -> None:
+        carry = [(index, point.x, point.y)]
+
+        for level, tree in enumerate(self.__trees):
+            if tree is None:
+                self.__trees[level] = _KDTree(carry)
+                return
+
+            carry.extend(tree.entries)
+            self.__trees[level] = None
+
+        self.__trees.append(_KDTree(carry))
+
+    def nearest_within(self, point: Point, radius: float) -> int:
+        best = (radius, -1)
+
+        for tree in self.__trees:
+            if tree is not None:
+                best = tree.nearest_within(point=point, radius=radius, best=best)
+
+        return best[1]
+
+    def within(self, point: Point, radius: float) -> List[int]:
+        result = []
+
+        for tree in self.__trees:
+            if tree is not None:
+                result.extend(tree.within(point=point, radius=radius))
+
+        return result
+
+    def nearest(self, point: Point, k: int) -> List[int]:
+        nearest = []
+
+        if k > 0:
+            for tree in self.__trees:
+                if tree is not None:
+                    tree.nearest(point=point, k=k, nearest=nearest)
+
+        return self._sort_nearest(nearest)
+
+    def clear(self) -> None:
+        self.__trees = []
+
+
+def create_spatial_index(index_type: str, cell_size: float) -> SpatialIndex:
+    if index_type == 'linear':
+        return LinearIndex()
+    if index_type == 'grid':
+        return GridIndex(cell_size=cell_size)
+    if index_type == 'kd_tree':
+        return KDTreeIndex()
+
+    raise ValueError(f'Unknown type of spatial index: {index_type}')
@@ -0,0 +1,92 @@
+import numpy
+
+from dataclasses import dataclass
+from typing import List, Tuple
+
+
+__all__ = ['Adjacency', 'Chain', 'build_adjacency', 'build_chains']
+
+
+# neighbours and stretches of the node are at positions offsets[node]..offsets[node + 1] - 1
+@dataclass
+class Adjacency:
+    neighbours: List[int]
+    stretches: List[int]
+    offsets: List[int]
+
+    @property
+    def number_of_nodes(self) -> int:
+        return len(self.offsets) - 1
+
+    def degree(self, node: int) -> int:
+        return self.offsets[node + 1] - self.offsets[node]
+
+
+@dataclass
+class Chain:
+    start: int
+    end: int
+    nodes: List[int]
+    stretches: List[int]
+
+
+def build_adjacency(edges: numpy.ndarray, number_of_nodes: int) -> Adjacency:
+    sources = numpy.concatenate((edges[:, 0], edges[:, 1]))
+    targets = numpy.concatenate((edges[:, 1], edges[:, 0]))
+    stretches = numpy.concatenate((numpy.arange(len(edges)), numpy.arange(len(edges))))
+
+    order = numpy.argsort(sources, kind='stable')
+    offsets = numpy.concatenate(([0], numpy.cumsum(numpy.bincount(sources, minlength=number_of_nodes))))
+
+    return Adjacency(neighbours=targets[order].tolist(), stretches=stretches[order].tolist(), offsets=offsets.tolist())
+
+
+# splits the graph into chains of degree-2 nodes between key nodes (nodes of other degrees); a cycle without key
+# nodes makes its first node a key node. Returns the chains (all chains of a key node are consecutive, key nodes
+# in ascending order, cycles last) and whether each node is a key node
+def build_chains(adjacency: Adjacency, edges: numpy.ndarray) -> Tuple[List[Chain], List[bool]]:
+    neighbours, stretches, offsets = adjacency.neighbours, adjacency.stretches, adjacency.offsets
+
+    is_key = [adjacency.degree(node) != 2 for node in range(adjacency.number_of_nodes)]
+    is_stretch_visited = [False] * len(edges)
+
+    chains = []
+
+    def walk(start: int, position: int) -> None:
+        nodes = [start]
+        chain_stretches = []
+
+        while True:
+            stretch = stretches[position]
+            is_stretch_visited[stretch] = True
+
+            node = neighbours[position]
+            nodes.append(node)
+            chain_stretches.append(stretch)
+
+            if is_key[node] or node == start:
+                break
+
+            position = next(
+                cur_position for cur_position in range(offsets[node], offsets[node + 1])
+                if not is_stretch_visited[stretches[cur_position]]
+            )
+
+        chains.append(Chain(start=start, end=nodes[-1], nodes=nodes, stretches=chain_stretches))
+
+    for start in range(adjacency.number_of_nodes):
+        if is_key[start]:
+            for position in range(offsets[start], offsets[start + 1]):
+                if not is_stretch_visited[stretches[position]]:
+                    walk(start=start, position=position)
+
+    for stretch in range(len(edges)):
+        if not is_stretch_visited[stretch]:
+            start = int(edges[stretch, 0])
+            is_key[start] = True
+
+            walk(start=start, position=next(
+                position for position in range(offsets[start], offsets[start + 1]) if stretches[position] == stretch
+            ))
+
+    return chains, is_key
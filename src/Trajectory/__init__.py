@@ -0,0 +1,157 @@
+import os
+import numpy
+from math import nan
+from time import perf_counter
+
+from dataclasses import dataclass
+from typing import Iterator, List
+
+from src.Graph import Graph
+from src.Point import Point
+from src.ClosestPointsCalculator import ClosestPointsCalculator
+
+
+__all__ = ['TRAJECTORY_DTYPE', 'TrajectoryRecorder', 'ReplayStatistics', 'read_trajectory', 'replay_trajectory']
+
+
+TRAJECTORY_DTYPE = numpy.dtype([
+    ('episode', numpy.int32),
+    ('x', numpy.float64),
+    ('y', numpy.float64),
+    ('z', numpy.float64),
+    ('angle', numpy.float64),
+    ('lane_dist', numpy.float64),
+    ('lane_angle', numpy.float64),
+    ('speed', numpy.float64),
+    ('rotation', numpy.float64),
+])
+
+CHUNK_PREFIX = 'chunk_'
+
+CHUNK_SUFFIX = '.npy'
+
+
+class TrajectoryRecorder:
+    __directory: str
+    __chunk_size: int
+    __buffer: numpy.ndarray
+    __size: int
+    __number_of_chunks: int
+
+    def __init__(self, directory: str, chunk_size: int=65536) -> None:
+        self.__directory = directory
+        self.__chunk_size = chunk_size
+        self.__buffer = numpy.empty(shape=chunk_size, dtype=TRAJECTORY_DTYPE)
+        self.__size = 0
+        self.__number_of_chunks = 0
+
+        os.makedirs(self.__directory, exist_ok=True)
+
+        if _get_chunk_names(directory):
+            raise FileExistsError(f'Directory "{directory}" already contains a recorded trajectory')
+
+    def record(self, episode: int, cur_pos: numpy.ndarray, cur_angle: float, lane_dist: float, lane_angle: float,
+               action: numpy.ndarray) -> None:
+        self.__buffer[self.__size] = (
+            episode,
+            cur_pos[0],
+            cur_pos[1],
+            cur_pos[2],
+            cur_angle,
+            lane_dist,
+            lane_angle,
+            action[0],
+            action[1],
+        )
+        self.__size += 1
+
+        if self.__size == self.__chunk_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if self.__size != 0:
+            file_name = f'{CHUNK_PREFIX}{self.__number_of_chunks:06d}{CHUNK_SUFFIX}'
+
+            numpy.save(os.path.join(self.__directory, file_name), self.__buffer[:self.__size])
+
+            self.__number_of_chunks += 1
+            self.__size = 0
+
+    def close(self) -> None:
+        self.flush()
+
+    def __enter__(self) -> 'TrajectoryRecorder':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+
+@dataclass
+class ReplayStatistics:
+    frames: int
+    seconds: float
+    number_of_nodes: int
+    number_of_stretches: int
+
+    @property
+    def frames_per_second(self) -> float:
+        return self.frames / self.seconds if self.seconds > 0 else 0
+
+    def __repr__(self) -> str:
+        return (f'Frames: {self.frames}, seconds: {self.seconds:.2f}, frames per second: {self.frames_per_second:.1f}, '
+                f'nodes: {self.number_of_nodes}, stretches: {self.number_of_stretches}')
+
+
+def read_trajectory(directory: str, mmap: bool=True) -> Iterator[numpy.ndarray]:
+    for file_name in _get_chunk_names(directory):
+        yield numpy.load(os.path.join(directory, file_name), mmap_mode='r' if mmap else None)
+
+
+def replay_trajectory(directory: str, graph: Graph, calculator: ClosestPointsCalculator) -> ReplayStatistics:
+    frames = 0
+    last_position = numpy.array([nan, nan])
+    last_episode = None
+
+    start = perf_counter()
+
+    for chunk in read_trajectory(directory):
+        positions = numpy.column_stack((chunk['x'], chunk['z']))
+
+        prev_positions = numpy.empty_like(positions)
+        prev_positions[0] = last_position if chunk['episode'][0] == last_episode else nan
+        prev_positions[1:] = positions[:-1]
+        prev_positions[1:][chunk['episode'][1:] != chunk['episode'][:-1]] = nan
+
+        points, is_valid = calculator.get_closest_points(
+            positions=positions,
+            abs_angles=chunk['angle'],
+            angles_to_road=chunk['lane_angle'],
+            distances=chunk['lane_dist'],
+            prev_positions=prev_positions,
+        )
+
+        for x, y in points[is_valid].tolist():
+            graph.check(Point(x, y))
+
+        frames += len(chunk)
+        last_position = positions[-1]
+        last_episode = chunk['episode'][-1]
+
+    graph.flush()
+
+    finish = perf_counter()
+
+    return ReplayStatistics(
+        frames=frames,
+        seconds=finish - start,
+        number_of_nodes=graph.number_of_nodes,
+        number_of_stretches=graph.number_of_stretches,
+    )
+
+
+def _get_chunk_names(directory: str) -> List[str]:
+    return sorted(
+        file_name for file_name in os.listdir(directory)
+        if file_name.startswith(CHUNK_PREFIX) and file_name.endswith(CHUNK_SUFFIX)
+    )
@@ -0,0 +1,28 @@
+from itertools import product
+
+from src.BatchRunner import *
+from src.config import *
+
+
+def main() -> None:
+    jobs = [
+        Job(map_name=map_name, seed=seed, steps=BATCH_STEPS)
+        for map_name, seed in product(BATCH_MAP_NAMES, BATCH_MAP_SEEDS)
+    ]
+
+    batch_result = run_jobs(
+        jobs=jobs,
+        min_distance=MIN_DISTANCE_IN_GRAPH,
+        workers=BATCH_WORKERS,
+        environments_per_worker=BATCH_ENVIRONMENTS_PER_WORKER,
+    )
+
+    for result in batch_result.results:
+        print(f'{result.job.map_name} (seed {result.job.seed}): {result.statistics}')
+
+    print(f'Jobs: {len(batch_result.results)}, seconds: {batch_result.seconds:.2f}, '
+          f'steps per second: {batch_result.steps_per_second:.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,279 @@
+import sys
+import subprocess
+from argparse import ArgumentParser
+from time import perf_counter
+
+from src.Benchmarks import *
+from src.config import MIN_DISTANCE_IN_GRAPH, MAP_NAME, MAP_SEED, LANE_GEOMETRY_TOLERANCE
+
+
+NUMBER_OF_POINTS = 20000
+
+WINDOW = 2000
+
+INDEX_TYPES = ['linear', 'grid', 'kd_tree']
+
+ROAD_GRID_BLOCKS = 10
+
+ROAD_GRID_BLOCK_LENGTH = 1
+
+NUMBER_OF_ROUTES = 1000
+
+IMPORTED_MODULES = [
+    'src.Point',
+    'src.Graph',
+    'src.ClosestPointsCalculator',
+    'src.GraphDrawer',
+    'src.Mapper',
+    'cv2',
+    'pyglet.window',
+]
+
+SUITE_SIZES = [1000, 10000, 100000]
+
+SAMPLING_SIZE = 20000
+
+SAMPLINGS = ['fixed', 'adaptive']
+
+NUMBER_OF_CALCULATOR_INPUTS = 50000
+
+# наибольшее допустимое расстояние между точками, найденными разными способами
+ENGINES_TOLERANCE = 1e-6
+
+NUMBER_OF_LANE_POSES = 20000
+
+NUMBER_OF_STEPS = 2000
+
+BASELINE_PATH = 'benchmark_baseline.json'
+
+# допустимое ухудшение относительно сохранённых результатов (0.25 - на 25%)
+REGRESSION_TOLERANCE = 0.25
+
+
+def print_graph_check_benchmark() -> None:
+    print('Graph.check, microseconds per frame')
+
+    for index_type in INDEX_TYPES:
+        samples = benchmark_graph_check(
+            number_of_points=NUMBER_OF_POINTS,
+            index_type=index_type,
+            min_distance=MIN_DISTANCE_IN_GRAPH,
+            window=WINDOW,
+        )
+
+        row = ' '.join(f'{sample.number_of_nodes:>6}:{sample.microseconds_per_check:>8.1f}' for sample in samples)
+
+        print(f'{index_type:>8} {row}')
+
+
+def print_routing_benchmark() -> None:
+    print('Graph.route, road grid')
+
+    graph = synthetic_road_grid(
+        blocks=ROAD_GRID_BLOCKS,
+        block_length=ROAD_GRID_BLOCK_LENGTH,
+        min_distance=MIN_DISTANCE_IN_GRAPH,
+    )
+
+    for name, max_table_size in [('table', graph.number_of_nodes), ('a_star', 0)]:
+        sample = benchmark_routing(
+            graph=graph,
+            number_of_queries=NUMBER_OF_ROUTES,
+            max_table_size=max_table_size,
+            name=name,
+        )
+
+        print(f'{sample.name:>8} nodes: {sample.number_of_nodes}, key nodes: {sample.number_of_key_nodes}, '
+              f'build: {sample.milliseconds_to_build:.1f} ms, route: {sample.microseconds_per_route:.1f} us')
+
+
+def print_sampling_benchmark() -> None:
+    print('Node sampling, trajectories with a step of the min distance')
+
+    for scenario in SCENARIOS:
+        for sampling in SAMPLINGS:
+            print(benchmark_sampling(
+                scenario=scenario,
+                size=SAMPLING_SIZE,
+                sampling=sampling,
+                min_distance=MIN_DISTANCE_IN_GRAPH,
+            ))
+
+
+def validate_calculator_engines() -> int:
+    print('ClosestPointsCalculator engines, "lines" against "vectors"')
+
+    corpus = {
+        'random': random_calculator_inputs(number_of_inputs=NUMBER_OF_CALCULATOR_INPUTS),
+        'grid': calculator_inputs(list(grid_trajectory(
+            number_of_points=NUMBER_OF_CALCULATOR_INPUTS,
+            step=MIN_DISTANCE_IN_GRAPH,
+            block_length=ROAD_GRID_BLOCK_LENGTH,
+        ))),
+        'loop': calculator_inputs(list(loop_trajectory(
+            number_of_points=NUMBER_OF_CALCULATOR_INPUTS,
+            step=MIN_DISTANCE_IN_GRAPH,
+        ))),
+    }
+
+    is_valid = True
+
+    for name, inputs in corpus.items():
+        comparison = compare_calculator_engines(inputs)
+
+        print(f'{name:>8} {comparison}')
+
+        is_valid &= comparison.number_of_mismatches == 0 and comparison.max_distance <= ENGINES_TOLERANCE
+
+    return 0 if is_valid else 1
+
+
+def validate_lane_geometry() -> int:
+    from src.Drivers import AutoDriver
+    from src.Mapper import create_environment
+    from src.Sensors import Sensors
+    from src.LaneGeometry import LaneGeometry, check_agreement
+
+    environment = create_environment(map_name=MAP_NAME, seed=MAP_SEED)
+
+    print(f'Lane geometry against get_lane_pos2, map "{MAP_NAME}"')
+
+    agreement = check_agreement(
+        geometry=LaneGeometry(environment, cache_size=0),
+        environment=environment,
+        number_of_poses=NUMBER_OF_LANE_POSES,
+    )
+
+    print(agreement)
+
+    for use_lane_geometry in (False, True):
+        environment.reset()
+
+        sensors = Sensors(environment=environment, use_lane_geometry=use_lane_geometry)
+        driver = AutoDriver(environment=environment)
+
+        start = perf_counter()
+
+        for _ in range(NUMBER_OF_STEPS):
+            _, _, done, _ = environment.step(driver.get_action(sensors.take_snapshot()))
+
+            if done:
+                environment.reset()
+
+        finish = perf_counter()
+
+        print(f'{"table" if use_lane_geometry else "simulator":>10} steps per second: {NUMBER_OF_STEPS / (finish - start):.1f}')
+
+    environment.close()
+
+    is_valid = (agreement.number_of_mismatches == 0 and agreement.max_dist_error <= LANE_GEOMETRY_TOLERANCE
+                and agreement.max_angle_error <= LANE_GEOMETRY_TOLERANCE)
+
+    return 0 if is_valid else 1
+
+
+def validate_graph_pickling() -> int:
+    print('Graph round trip through a spawned worker')
+
+    is_valid = True
+
+    for scenario in SCENARIOS:
+        is_equal = check_graph_round_trip(scenario=scenario, size=SAMPLING_SIZE, min_distance=MIN_DISTANCE_IN_GRAPH)
+
+        print(f'{scenario:>8} {"equal" if is_equal else "different"}')
+
+        is_valid &= is_equal
+
+    return 0 if is_valid else 1
+
+
+def print_import_benchmark() -> None:
+    print('Import time, best of 5 fresh interpreters')
+
+    for module in IMPORTED_MODULES:
+        try:
+            print(benchmark_import(module))
+        except subprocess.CalledProcessError as error:
+            print(f'{module:<28} failed: {error.stderr.strip().splitlines()[-1]}')
+
+
+def run_suite(sizes, save: bool, compare: bool, baseline_path: str, tolerance: float) -> int:
+    results = []
+
+    for result in run_benchmark_suite(sizes=sizes, min_distance=MIN_DISTANCE_IN_GRAPH):
+        print(result)
+
+        results.append(result)
+
+    if save:
+        save_baseline(path=baseline_path, results=results)
+
+        print(f'Baseline is saved to {baseline_path}')
+
+    if compare:
+        regressions = compare_with_baseline(results=results, baseline=load_baseline(baseline_path), tolerance=tolerance)
+
+        for regression in regressions:
+            print(f'Regression: {regression}')
+
+        if regressions:
+            return 1
+
+        print(f'No regressions against {baseline_path}')
+
+    return 0
+
+
+def main() -> int:
+    parser = ArgumentParser()
+    parser.add_argument('--suite', action='store_true', help='run the map-building benchmark suite')
+    parser.add_argument('--sizes', type=int, nargs='+', default=SUITE_SIZES)
+    parser.add_argument('--save-baseline', action='store_true')
+    parser.add_argument('--compare', action='store_true', help='fail if the suite is slower than the baseline')
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--tolerance', type=float, default=REGRESSION_TOLERANCE)
+    parser.add_argument('--imports', action='store_true', help='measure import time of the modules')
+    parser.add_argument('--sampling', action='store_true', help='compare fixed and adaptive node sampling')
+    parser.add_argument('--engines', action='store_true', help='check that calculator engines find the same points')
+    parser.add_argument('--pickling', action='store_true', help='check that graphs survive a spawned worker')
+    parser.add_argument('--lane-geometry', action='store_true', help='check the lane geometry table against the simulator')
+
+    arguments = parser.parse_args()
+
+    if arguments.imports:
+        print_import_benchmark()
+
+        return 0
+
+    if arguments.sampling:
+        print_sampling_benchmark()
+
+        return 0
+
+    if arguments.engines:
+        return validate_calculator_engines()
+
+    if arguments.pickling:
+        return validate_graph_pickling()
+
+    if arguments.lane_geometry:
+        return validate_lane_geometry()
+
+    if arguments.suite or arguments.save_baseline or arguments.compare:
+        return run_suite(
+            sizes=arguments.sizes,
+            save=arguments.save_baseline,
+            compare=arguments.compare,
+            baseline_path=arguments.baseline,
+            tolerance=arguments.tolerance,
+        )
+
+    print_graph_check_benchmark()
+
+    print_routing_benchmark()
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,15 +1,62 @@
-from pyglet.window import key
-
-
 __all__ = [
     'DRIVING_TYPE',
+    'STOP_WHEN_EXPLORED',
+    'HEADLESS',
+    'HEADLESS_STEPS',
+    'BATCH_MAP_NAMES',
+    'BATCH_MAP_SEEDS',
+    'BATCH_STEPS',
+    'BATCH_WORKERS',
+    'BATCH_ENVIRONMENTS_PER_WORKER',
+    'RECORD_TRAJECTORY',
+    'TRAJECTORY_DIRECTORY',
+    'METRICS_ENABLED',
+    'METRICS_FILE_PATH',
+    'METRICS_WINDOW',
+    'METRICS_PERIOD',
+    'MAP_SERVICE_HOST',
+    'MAP_SERVICE_PORT',
+    'MAP_SERVICE_SOCKET_PATH',
+    'MAP_SERVICE_QUEUE_SIZE',
+    'MAP_SERVICE_MAX_BATCH_POSES',
+    'MAP_SERVICE_QUERY_WORKERS',
+    'MAP_SERVICE_MAX_REQUEST_SIZE',
+    'MAP_SERVICE_ROUTE_REBUILD_INTERVAL',
+    'MAP_SERVICE_NEAREST_CELL_SIZE',
+    'SCREENSHOTS_DIRECTORY',
+    'SCREENSHOTS_WORKERS',
+    'SCREENSHOTS_PREFETCH',
+    'SCREENSHOTS_BATCH_SIZE',
+    'SCREENSHOTS_DECODE_IMAGES',
     'IMAGE_WIDTH',
     'IMAGE_HEIGHT',
+    'USE_LANE_GEOMETRY',
+    'LANE_POSE_CACHE_SIZE',
+    'LANE_POSE_POSITION_QUANTUM',
+    'LANE_POSE_ANGLE_QUANTUM',
+    'LANE_GEOMETRY_TOLERANCE',
     'MIN_DISTANCE_IN_GRAPH',
-    'KEY_TO_SHOW_GRAPH',
-    'KEY_TO_CLOSE_GRAPH',
+    'CALCULATOR_ENGINE',
+    'SPATIAL_INDEX_TYPE',
+    'WEIGHTED_STRETCHES',
+    'MERGE_TOLERANCE',
+    'CONSOLIDATION_PERIOD',
+    'GRAPH_SAMPLING',
+    'SAMPLING_TOLERANCE',
+    'SAMPLING_HEADING_TOLERANCE',
+    'MAX_NODE_SPACING',
+    'ROUTING_CACHE_SIZE',
+    'ROUTING_TABLE_MAX_KEY_NODES',
+    'KEY_NAME_TO_SHOW_GRAPH',
+    'KEY_NAME_TO_CLOSE_GRAPH',
+    'LIVE_GRAPH_VIEWER',
+    'LIVE_GRAPH_FRAME_RATE',
     'MAP_SEED',
     'MAP_NAME',
+    'SAVE_MAP',
+    'MAP_FILE_PATH',
+    'SIMPLIFY_SAVED_MAP',
+    'SIMPLIFICATION_TOLERANCE',
     'MARGIN',
     'NODES_RADIUS',
     'NODES_COLOR',
@@ -19,26 +66,190 @@ __all__ = [
     'GRAPH_MIN_X',
     'GRAPH_MAX_X',
     'GRAPH_MIN_Y',
-    'GRAPH_MAX_Y'
+    'GRAPH_MAX_Y',
+    'GRAPH_BOUNDS_SLACK',
 ]
 
 # Тип вождения, "auto" - бот сам будет ездить, "manual" - ручное управлние ботом
 DRIVING_TYPE = 'auto'
 
+# Останавливаться, когда карта исследована полностью (пройдены все тайлы и все выезды со всех перекрёстков),
+# на перекрёстках бот выбирает ещё не пройденные выезды. Работает только с DRIVING_TYPE = "auto"
+STOP_WHEN_EXPLORED = True
+
+# Запуск без отрисовки: симулятор шагает с максимальной скоростью, работает только с DRIVING_TYPE = "auto".
+# OpenGL-контекст симулятора создаётся через EGL (pyglet headless), поэтому дисплей не нужен, но нужны драйверы с EGL
+HEADLESS = False
+
+# Количество шагов симулятора при запуске без отрисовки
+HEADLESS_STEPS = 10000
+
+# Карты для пакетного построения (src/batch.py), каждая карта запускается с каждым сидом из BATCH_MAP_SEEDS
+BATCH_MAP_NAMES = ['udem1']
+
+# Сиды карт для пакетного построения
+BATCH_MAP_SEEDS = [1]
+
+# Количество шагов симулятора на одну задачу пакетного построения
+BATCH_STEPS = 10000
+
+# Количество процессов для пакетного построения, None - по числу ядер
+BATCH_WORKERS = None
+
+# Сколько симуляторов каждый процесс ведёт одновременно: на каждом шаге положения всех ботов собираются в массивы,
+# действия и ближайшие точки считаются для всех сразу. 1 - каждый запуск в своём процессе по отдельности
+BATCH_ENVIRONMENTS_PER_WORKER = 1
+
+# Записывать ли траекторию бота (положение, угол, положение относительно полосы, действие) для последующего воспроизведения
+RECORD_TRAJECTORY = False
+
+# Папка с записанной траекторией, из неё же читает src/replay.py. Запись в папку, где уже есть траектория, не начнётся
+TRAJECTORY_DIRECTORY = 'trajectory'
+
+# Замерять время этапов кадра (положение на полосе, ближайшая точка, проверка графа, действие водителя, шаг
+# симулятора, отрисовка) и считать узлы и участки графа. Если выключено, замеры ничего не стоят
+METRICS_ENABLED = False
+
+# Файл, в который периодически дописывается сводка (".csv" - таблица, иначе - по JSON-объекту на строку),
+# None - печатать сводку в консоль
+METRICS_FILE_PATH = 'metrics.csv'
+
+# По скольким последним кадрам считаются перцентили времени этапов
+METRICS_WINDOW = 1000
+
+# Раз во сколько секунд записывается сводка
+METRICS_PERIOD = 10
+
+# Адрес, на котором src/service.py принимает положения ботов и запросы к графу по HTTP
+MAP_SERVICE_HOST = '127.0.0.1'
+
+# Порт сервиса построения карты
+MAP_SERVICE_PORT = 8765
+
+# Путь к Unix-сокету сервиса построения карты, None - слушать MAP_SERVICE_HOST:MAP_SERVICE_PORT
+MAP_SERVICE_SOCKET_PATH = None
+
+# Сколько пачек положений может ждать обработки. Если очередь заполнена, запросы с новыми положениями
+# ждут, пока в ней не освободится место
+MAP_SERVICE_QUEUE_SIZE = 64
+
+# Сколько положений из очереди обрабатывается калькулятором за раз
+MAP_SERVICE_MAX_BATCH_POSES = 8192
+
+# Количество потоков для запросов к графу (ближайшие узлы, маршруты, изображение)
+MAP_SERVICE_QUERY_WORKERS = 2
+
+# Максимальный размер тела запроса в байтах
+MAP_SERVICE_MAX_REQUEST_SIZE = 16 * 1024 * 1024
+
+# Как часто (в секундах) пересобирать таблицу маршрутов, пока граф растёт. Пересборка идёт в отдельном потоке,
+# а маршруты до её окончания строятся по предыдущей таблице
+MAP_SERVICE_ROUTE_REBUILD_INTERVAL = 1.0
+
+# Размер ячейки сетки, по которой сервис ищет ближайшие вершины (запрос /nearest). Сетка строится по снимку графа,
+# дополняется новыми вершинами и пересобирается только после слияния вершин
+MAP_SERVICE_NEAREST_CELL_SIZE = 0.25
+
+# Папка со скриншотами для src/screenshots.py. Рядом с каждым изображением "<имя>.png" лежит "<имя>.json"
+# с положением камеры: {"x": ..., "y": ..., "angle": ..., "angle_to_road": ..., "dist": ...}.
+# Кадры обрабатываются в порядке имён с учётом чисел в них (frame_2 раньше frame_10), поэтому имена должны
+# идти в порядке съёмки: соседние кадры используются, чтобы определить сторону движения
+SCREENSHOTS_DIRECTORY = 'screenshots'
+
+# Количество потоков для чтения скриншотов
+SCREENSHOTS_WORKERS = 4
+
+# Максимальное количество скриншотов, читаемых заранее
+SCREENSHOTS_PREFETCH = 64
+
+# Количество скриншотов, обрабатываемых калькулятором за раз
+SCREENSHOTS_BATCH_SIZE = 256
+
+# Декодировать ли сами изображения (для построения графа достаточно положений камеры)
+SCREENSHOTS_DECODE_IMAGES = False
+
 # Ширина окна с графом
 IMAGE_WIDTH = 600
 
 # Высота окна с графов
 IMAGE_HEIGHT = 600
 
+# Считать положение бота относительно полосы по заранее построенной таблице точек кривых полос карты,
+# а не спрашивать симулятор (get_lane_pos2). В разы быстрее, но пока не сверено с настоящим gym_duckietown,
+# поэтому по умолчанию выключено. Перед включением проверить через src/benchmark.py --lane-geometry
+USE_LANE_GEOMETRY = False
+
+# Сколько последних положений бота (округлённых до LANE_POSE_POSITION_QUANTUM и LANE_POSE_ANGLE_QUANTUM) помнить
+# вместе с их положением относительно полосы, 0 - не запоминать и не округлять. Округлённое положение может
+# оказаться по другую сторону от точки, где симулятор выбирает другую кривую или другую половину кривой,
+# тогда результат заметно отличается от симулятора (примерно в 0.5% положений при шаге 1e-4)
+LANE_POSE_CACHE_SIZE = 0
+
+# Шаг округления координат бота для запоминания положения относительно полосы
+LANE_POSE_POSITION_QUANTUM = 1e-4
+
+# Шаг округления угла бота (в радианах) для запоминания положения относительно полосы
+LANE_POSE_ANGLE_QUANTUM = 1e-4
+
+# Допустимое расхождение с симулятором (расстояние до полосы и угол в радианах) при проверке в src/benchmark.py
+LANE_GEOMETRY_TOLERANCE = 1e-3
+
 # Минимальное расстояние между узлами в графе
 MIN_DISTANCE_IN_GRAPH = 0.01
 
-# Клавиша, нужная, чтобы показать окно с графом
-KEY_TO_SHOW_GRAPH = key.Q
+# Как считается ближайшая точка дороги: "lines" - через уравнения прямых y = kx + b (с особыми случаями для
+# вертикальных прямых и округлением), "vectors" - через направление дороги и нормаль к нему, без особых случаев.
+# "vectors" включается отдельно, после сверки с "lines" через src/benchmark.py --engines
+CALCULATOR_ENGINE = 'lines'
+
+# Тип пространственного индекса для поиска ближайшего узла в графе, "grid" - равномерная сетка, "kd_tree" - k-d дерево
+SPATIAL_INDEX_TYPE = 'grid'
+
+# Хранить ли длины участков дорог между узлами графа
+WEIGHTED_STRETCHES = True
+
+# Расстояние, на котором новая точка притягивается к уже существующим узлам и участкам дорог графа, чтобы повторные
+# проезды по той же дороге не создавали параллельные цепочки узлов. None - притягивание выключено
+MERGE_TOLERANCE = None
+
+# Через сколько проверок точек граф объединяет почти совпадающие узлы (только если задан MERGE_TOLERANCE)
+CONSOLIDATION_PERIOD = 1000
+
+# Как расставляются узлы графа: "fixed" - новый узел через каждые MIN_DISTANCE_IN_GRAPH, "adaptive" - новый узел
+# только там, где дорога перестаёт быть прямой: пропущенные точки траектории отстоят от участков графа не дальше
+# SAMPLING_TOLERANCE, поэтому на прямых узлов в десятки раз меньше, а на поворотах - столько, сколько нужно
+GRAPH_SAMPLING = 'fixed'
+
+# Максимальное отклонение пропущенных точек траектории от участка дороги в режиме "adaptive"
+SAMPLING_TOLERANCE = 0.01
+
+# Максимальный поворот (в радианах) очередного шага траектории относительно участка дороги в режиме "adaptive",
+# при большем повороте (например, развороте) участок заканчивается
+SAMPLING_HEADING_TOLERANCE = 0.5
+
+# Максимальная длина участка дороги между соседними узлами в режиме "adaptive"
+MAX_NODE_SPACING = 0.3
+
+# Сколько последних точек запросов маршрутов помнить вместе с ближайшими к ним узлами графа
+ROUTING_CACHE_SIZE = 4096
+
+# Максимальное количество ключевых узлов (перекрёстков и тупиков), для которых заранее считаются расстояния
+# между всеми парами. Если ключевых узлов больше, маршруты ищутся алгоритмом A* по всему графу
+ROUTING_TABLE_MAX_KEY_NODES = 2000
 
-# Клавиша, нужная, чтобы закрыть окно с графом
-KEY_TO_CLOSE_GRAPH = key.E
+# Клавиша, нужная, чтобы показать окно с графом (имя константы из pyglet.window.key)
+KEY_NAME_TO_SHOW_GRAPH = 'Q'
+
+# Клавиша, нужная, чтобы закрыть окно с графом (имя константы из pyglet.window.key)
+KEY_NAME_TO_CLOSE_GRAPH = 'E'
+
+# Показывать граф, не останавливая симуляцию: окно открывается по KEY_TO_SHOW_GRAPH и обновляется само,
+# пока его не закроют по KEY_TO_CLOSE_GRAPH. Граф рисуется в отдельном потоке, а само окно OpenCV
+# обновляется из главного потока на каждом шаге (HighGUI на macOS и в части сборок Qt/GTK работает только в нём)
+LIVE_GRAPH_VIEWER = False
+
+# Частота обновления окна с графом в режиме LIVE_GRAPH_VIEWER (кадров в секунду)
+LIVE_GRAPH_FRAME_RATE = 5
 
 # Сид карты, влияет на начальное положение бота
 MAP_SEED = 1
@@ -46,6 +257,18 @@ MAP_SEED = 1
 # Название карты. Все возможные карты лежат в ./src/maps (указывать без '.yaml')
 MAP_NAME = 'udem1'
 
+# Сохранять ли построенный граф в файл после завершения работы
+SAVE_MAP = False
+
+# Путь к файлу, в который сохраняется граф (бинарный формат, см. src/MapFile)
+MAP_FILE_PATH = 'map.waim'
+
+# Упрощать ли граф перед сохранением: цепочки узлов степени 2 сворачиваются в дороги, узлы степени 3 и больше - перекрёстки
+SIMPLIFY_SAVED_MAP = True
+
+# Допустимое отклонение упрощённой ломаной дороги от исходной (алгоритм Дугласа-Пекера), None - хранить все точки дороги
+SIMPLIFICATION_TOLERANCE = 0.02
+
 # Отступ от края в графическом представлении графа
 MARGIN = 10
 
@@ -75,3 +298,24 @@ GRAPH_MIN_Y = None
 
 # Максимальное значание "y" в графе
 GRAPH_MAX_Y = None
+
+# Запас вокруг границ графа (в долях от размера графа) при масштабировании: пока новые узлы
+# попадают в эти границы, окно с графом дорисовывается, а не перерисовывается целиком
+GRAPH_BOUNDS_SLACK = 0.1
+
+
+# Коды клавиш KEY_TO_SHOW_GRAPH и KEY_TO_CLOSE_GRAPH берутся из pyglet только при обращении к ним,
+# чтобы импорт настроек не требовал pyglet и дисплея
+_KEY_NAMES = {
+    'KEY_TO_SHOW_GRAPH': KEY_NAME_TO_SHOW_GRAPH,
+    'KEY_TO_CLOSE_GRAPH': KEY_NAME_TO_CLOSE_GRAPH,
+}
+
+
+def __getattr__(name: str) -> int:
+    if name in _KEY_NAMES:
+        from pyglet.window import key
+
+        return getattr(key, _KEY_NAMES[name])
+
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
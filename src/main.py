@@ -1,45 +1,86 @@
-from math import inf
+from __future__ import annotations
 
-from pyglet.window import key
-from pyglet import clock, app
+from typing import Optional, TYPE_CHECKING
+
+from time import perf_counter
 
-from src.Point import *
 from src.Graph import *
 from config import *
 from src.Drivers import *
+from src.Mapper import *
+from src.Metrics import *
+from src.Trajectory import *
+from src.GraphSimplifier import *
 from src.GraphDrawer import *
 from src.ClosestPointsCalculator import *
-from gym_duckietown.envs.duckietown_env import DuckietownEnv
 
-global prev_pos, environment, key_handler, graph, drawer, calculator, driver
+if TYPE_CHECKING:
+    from pyglet.window import key
+    from src.Exploration import ExplorationTracker
+    from gym_duckietown.envs.duckietown_env import DuckietownEnv
+
+global environment, key_handler, key_to_show_graph, graph, drawer, viewer, calculator, driver, mapper, recorder, metrics
 
 graph: Graph
 environment: DuckietownEnv
 key_handler: key.KeyStateHandler
+key_to_show_graph: int
 graph: Graph
 drawer: GraphDrawer
+viewer: GraphViewer
 calculator: ClosestPointsCalculator
 driver: Driver
+mapper: Mapper
+recorder: Optional[TrajectoryRecorder]
+metrics: Optional[Metrics]
 
 
-def init_global_vars():
-    global prev_pos, environment, key_handler, graph, drawer, calculator, driver
+def create_recorder() -> Optional[TrajectoryRecorder]:
+    return TrajectoryRecorder(directory=TRAJECTORY_DIRECTORY) if RECORD_TRAJECTORY else None
+
+
+def create_metrics() -> Optional[Metrics]:
+    return Metrics(window=METRICS_WINDOW, period=METRICS_PERIOD, path=METRICS_FILE_PATH) if METRICS_ENABLED else None
+
 
-    prev_pos = None
+def create_exploration(exploration_environment: DuckietownEnv) -> Optional[ExplorationTracker]:
+    if not STOP_WHEN_EXPLORED:
+        return None
 
-    environment = DuckietownEnv(
-        seed=MAP_SEED,
-        map_name=MAP_NAME,
-        domain_rand=False,
-        max_steps=inf,
+    from src.Exploration import ExplorationTracker
+
+    return ExplorationTracker(environment=exploration_environment)
+
+
+def save_map(graph_to_save: Graph) -> None:
+    save_graph(
+        graph=graph_to_save,
+        path=MAP_FILE_PATH,
+        simplify=SIMPLIFY_SAVED_MAP,
+        tolerance=SIMPLIFICATION_TOLERANCE,
+        min_distance=MIN_DISTANCE_IN_GRAPH,
     )
-    environment.reset()
+
+
+def init_global_vars():
+    global environment, key_handler, key_to_show_graph, graph, drawer, viewer, calculator, driver, mapper, recorder, \
+        metrics
+
+    from pyglet.window import key
+
+    recorder = create_recorder()
+
+    environment = create_environment(map_name=MAP_NAME, seed=MAP_SEED)
     environment.render()
 
+    key_to_show_graph = getattr(key, KEY_NAME_TO_SHOW_GRAPH)
     key_handler = key.KeyStateHandler()
     environment.unwrapped.window.push_handlers(key_handler)
 
+    exploration = None
+
     if DRIVING_TYPE == 'auto':
+        exploration = create_exploration(environment)
         driver = AutoDriver(environment=environment)
     if DRIVING_TYPE == 'manual':
         driver = ManualDriver(key_handler=key_handler, environment=environment)
@@ -48,9 +89,20 @@ def init_global_vars():
 
     calculator = ClosestPointsCalculator()
 
-    key_to_close = key.symbol_string(KEY_TO_CLOSE_GRAPH).lower()
+    metrics = create_metrics()
+
+    mapper = Mapper(
+        environment=environment,
+        driver=driver,
+        graph=graph,
+        calculator=calculator,
+        recorder=recorder,
+        exploration=exploration,
+        metrics=metrics,
+    )
+
     drawer_settings = GraphDrawerSettings(
-        key_to_close=key_to_close,
+        key_to_close=KEY_NAME_TO_CLOSE_GRAPH.lower(),
         width=IMAGE_WIDTH,
         height=IMAGE_HEIGHT,
         min_x=GRAPH_MIN_X,
@@ -65,62 +117,116 @@ def init_global_vars():
         nodes_color=NODES_COLOR,
     )
     drawer = GraphDrawer(drawer_settings)
+    viewer = GraphViewer(settings=drawer_settings, frame_rate=LIVE_GRAPH_FRAME_RATE)
 
 
-def get_data_for_calculator() -> CalculatorInputData:
-    global prev_pos
+def update(dt):
+    if mapper.is_exploration_complete:
+        from pyglet import app
 
-    lane_pose = environment.get_lane_pos2(environment.cur_pos, environment.cur_angle)
+        app.exit()
 
-    cur_x = environment.cur_pos[0]
-    cur_y = environment.cur_pos[2]
-    cur_pos = Point(cur_x, cur_y)
+        return
 
-    absolute_angle = environment.cur_angle
-    angle_to_road = lane_pose.angle_rad
-    distance_to_road = lane_pose.dist
+    snapshot = mapper.take_snapshot()
 
-    result = CalculatorInputData(
-        cur_pos=cur_pos,
-        prev_pos=prev_pos,
-        abs_angle=absolute_angle,
-        angle_to_road=angle_to_road,
-        dist=distance_to_road
-    )
+    mapper.update_graph(snapshot)
 
-    prev_pos = cur_pos
+    if key_handler[key_to_show_graph]:
+        key_handler[key_to_show_graph] = False
 
-    return result
+        if LIVE_GRAPH_VIEWER:
+            viewer.start()
+        else:
+            drawer.upload_graph(graph)
 
+            drawer.show_graph()
 
-init_global_vars()
+    if viewer.is_running:
+        viewer.publish(graph.snapshot())
+        viewer.pump()
 
+    done = mapper.step_environment(snapshot)
 
-def update(dt):
-    input_data = get_data_for_calculator()
+    start = perf_counter() if metrics is not None else 0
+
+    if done:
+        environment.render()
 
-    closest_point = calculator.get_closest_point(input_data)
+    environment.render()
 
-    graph.check(closest_point)
+    if metrics is not None:
+        metrics.add_time('render', perf_counter() - start)
+        metrics.tick()
 
-    if key_handler[KEY_TO_SHOW_GRAPH]:
-        key_handler[KEY_TO_SHOW_GRAPH] = False
 
-        drawer.upload_graph(graph)
+def run_window() -> None:
+    from pyglet import clock, app
 
-        drawer.show_graph()
+    init_global_vars()
 
-    _, _, done, _ = environment.step(driver.action)
+    clock.schedule_interval(update, 1.0 / environment.unwrapped.frame_rate)
 
-    if done:
-        environment.reset()
-        environment.render()
+    app.run()
 
-    environment.render()
+    viewer.stop()
+
+    if SAVE_MAP:
+        save_map(graph)
+
+    if recorder is not None:
+        recorder.close()
+
+    if metrics is not None:
+        metrics.close()
+
+    environment.close()
+
+
+def run_headless() -> None:
+    if DRIVING_TYPE != 'auto':
+        raise ValueError('Headless mode supports only "auto" driving type')
+
+    headless_recorder = create_recorder()
+    headless_environment = create_environment(map_name=MAP_NAME, seed=MAP_SEED, headless=True)
+    headless_metrics = create_metrics()
+
+    headless_exploration = create_exploration(headless_environment)
+
+    headless_graph = Graph(min_distance=MIN_DISTANCE_IN_GRAPH)
+
+    headless_mapper = Mapper(
+        environment=headless_environment,
+        driver=AutoDriver(environment=headless_environment),
+        graph=headless_graph,
+        calculator=ClosestPointsCalculator(),
+        recorder=headless_recorder,
+        exploration=headless_exploration,
+        metrics=headless_metrics,
+    )
+
+    statistics = headless_mapper.run(steps=HEADLESS_STEPS)
+
+    if headless_recorder is not None:
+        headless_recorder.close()
+
+    if headless_metrics is not None:
+        headless_metrics.close()
+
+    headless_environment.close()
+
+    if SAVE_MAP:
+        save_map(headless_graph)
+
+    print(statistics)
 
 
-clock.schedule_interval(update, 1.0 / environment.unwrapped.frame_rate)
+def main() -> None:
+    if HEADLESS:
+        run_headless()
+    else:
+        run_window()
 
-app.run()
 
-environment.close()
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,20 @@
+from src.Graph import Graph
+from src.Trajectory import replay_trajectory
+from src.ClosestPointsCalculator import ClosestPointsCalculator
+from src.config import *
+
+
+def main() -> None:
+    graph = Graph(min_distance=MIN_DISTANCE_IN_GRAPH)
+
+    statistics = replay_trajectory(
+        directory=TRAJECTORY_DIRECTORY,
+        graph=graph,
+        calculator=ClosestPointsCalculator(),
+    )
+
+    print(statistics)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,24 @@
+from src.Graph import Graph
+from src.Screenshots import build_map_from_screenshots
+from src.ClosestPointsCalculator import ClosestPointsCalculator
+from src.config import *
+
+
+def main() -> None:
+    graph = Graph(min_distance=MIN_DISTANCE_IN_GRAPH)
+
+    statistics = build_map_from_screenshots(
+        directory=SCREENSHOTS_DIRECTORY,
+        graph=graph,
+        calculator=ClosestPointsCalculator(),
+        workers=SCREENSHOTS_WORKERS,
+        prefetch=SCREENSHOTS_PREFETCH,
+        batch_size=SCREENSHOTS_BATCH_SIZE,
+        decode_images=SCREENSHOTS_DECODE_IMAGES,
+    )
+
+    print(statistics)
+
+
+if __name__ == '__main__':
+    main()
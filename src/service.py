@@ -0,0 +1,38 @@
+import asyncio
+
+from src.Graph import Graph
+from src.GraphSimplifier import save_graph
+from src.MapService import MapService, serve
+from src.ClosestPointsCalculator import ClosestPointsCalculator
+from src.config import *
+
+
+def main() -> None:
+    graph = Graph(min_distance=MIN_DISTANCE_IN_GRAPH)
+
+    service = MapService(graph=graph, calculator=ClosestPointsCalculator())
+
+    try:
+        asyncio.run(serve(
+            service=service,
+            host=MAP_SERVICE_HOST,
+            port=MAP_SERVICE_PORT,
+            socket_path=MAP_SERVICE_SOCKET_PATH,
+        ))
+    except KeyboardInterrupt:
+        pass
+
+    if SAVE_MAP:
+        save_graph(
+            graph=graph,
+            path=MAP_FILE_PATH,
+            simplify=SIMPLIFY_SAVED_MAP,
+            tolerance=SIMPLIFICATION_TOLERANCE,
+            min_distance=MIN_DISTANCE_IN_GRAPH,
+        )
+
+    print(f'Nodes: {graph.number_of_nodes}, stretches: {graph.number_of_stretches}')
+
+
+if __name__ == '__main__':
+    main()